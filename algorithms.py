@@ -1,26 +1,221 @@
 """
 algorithms.py - Core drawing algorithms for the car dashboard
-Contains: DDA Line, Midpoint Circle algorithms
+Contains: DDA Line, Midpoint Circle algorithms, scanline rings and disks,
+anti-aliased thick strokes
 """
 
 from OpenGL.GL import *
 import math
+import functools
+import numpy as np
+
+# Raster modes: the immediate path issues one glVertex2f per pixel and is kept
+# as the reference implementation; the batched path collects NumPy pixel
+# arrays and draws each run of same color/size pixels with one glDrawArrays.
+RASTER_IMMEDIATE = "immediate"
+RASTER_BATCHED = "batched"
+
+_raster_mode = RASTER_IMMEDIATE
+_current_color = (1.0, 1.0, 1.0)
+_point_size = 1
+_point_batches = []
+# When set, every primitive rasterizes into this software framebuffer
+# (see softraster.py) instead of calling OpenGL.
+_framebuffer = None
+
+
+def set_raster_mode(mode):
+    """Select RASTER_IMMEDIATE or RASTER_BATCHED for the point algorithms"""
+    global _raster_mode
+    if mode not in (RASTER_IMMEDIATE, RASTER_BATCHED):
+        raise ValueError(f"unknown raster mode: {mode!r}")
+    flush_points()
+    _raster_mode = mode
+
+
+def get_raster_mode():
+    return _raster_mode
+
+
+def set_framebuffer(framebuffer):
+    """Route drawing into a software framebuffer; None restores OpenGL.
+
+    Returns the previously active framebuffer.
+    """
+    global _framebuffer
+    flush_points()
+    previous = _framebuffer
+    _framebuffer = framebuffer
+    return previous
+
+
+def get_framebuffer():
+    return _framebuffer
+
+
+def set_color(r, g, b):
+    """Set the current drawing color (tracked so batches can be grouped)"""
+    global _current_color
+    _current_color = (r, g, b)
+    if _framebuffer is None:
+        glColor3f(r, g, b)
+
+
+def get_color():
+    return _current_color
+
+
+def set_line_width(width):
+    """Set the GL line width (no effect on the software framebuffer)"""
+    if _framebuffer is None:
+        glLineWidth(width)
+
+
+def _queue_points(points, size):
+    """Append pixels to the pending batch, merging with the previous run
+    when color and size match so the painter's order is preserved"""
+    key = (_current_color, size)
+    if _point_batches and _point_batches[-1][0] == key:
+        _point_batches[-1][1].append(points)
+    else:
+        _point_batches.append((key, [points]))
+
+
+def _emit_points(points, size):
+    """Send pixels to the software framebuffer or the pending GL batch"""
+    if _framebuffer is not None:
+        _framebuffer.plot_points(points, size, _current_color)
+    else:
+        _queue_points(points, size)
+
+
+def draw_point_buffer(points, size):
+    """Draw an (N, 2) array of pixel coordinates with a single glDrawArrays"""
+    if len(points) == 0:
+        return
+    if points.dtype.kind in "iu":
+        points = np.ascontiguousarray(points, dtype=np.int32)
+        gl_type = GL_INT
+    else:
+        points = np.ascontiguousarray(points, dtype=np.float32)
+        gl_type = GL_FLOAT
+    glPointSize(size)
+    glEnableClientState(GL_VERTEX_ARRAY)
+    glVertexPointer(2, gl_type, 0, points)
+    glDrawArrays(GL_POINTS, 0, len(points))
+    glDisableClientState(GL_VERTEX_ARRAY)
+
+
+def flush_points():
+    """Draw every queued batch: one draw call per color/size run of pixels,
+    per color run of spans and per run of consecutive strokes"""
+    if not _point_batches:
+        return
+    for key, chunks in _point_batches:
+        points = chunks[0] if len(chunks) == 1 else np.concatenate(chunks)
+        if key == STROKE_BATCH:
+            draw_stroke_buffer(points)
+            continue
+        color, size = key
+        glColor3f(*color)
+        if size == SPAN_BATCH:
+            draw_span_buffer(points)
+        else:
+            draw_point_buffer(points, size)
+    _point_batches.clear()
+    glColor3f(*_current_color)
+    glPointSize(_point_size)
+
 
 def draw_point(x, y, size=2):
     """Draw a single point at (x, y)"""
+    global _point_size
+    _point_size = size
+    if _raster_mode == RASTER_BATCHED or _framebuffer is not None:
+        _emit_points(np.array([[x, y]]), size)
+        return
     glPointSize(size)
     glBegin(GL_POINTS)
     glVertex2f(x, y)
     glEnd()
 
+
+def rasterize_lines(x1, y1, x2, y2):
+    """Rasterize many DDA lines at once into one packed int32 (N, 2) buffer.
+
+    Endpoints are arrays (or scalars, broadcast). Each line is laid out in a
+    row of a padded table and its increments are accumulated with
+    np.cumsum along the row, which adds sequentially exactly like the
+    scalar loop; np.rint rounds half to even like round(). The pixels are
+    therefore identical to dda_line, line by line, in input order.
+    (Evaluating x1 + i * dx / steps, as np.linspace does, can round the
+    other way on exact half-pixel ties.)
+    """
+    x1, y1, x2, y2 = np.broadcast_arrays(*(np.atleast_1d(np.asarray(v, dtype=np.float64))
+                                           for v in (x1, y1, x2, y2)))
+    dx = x2 - x1
+    dy = y2 - y1
+    steps = np.maximum(np.abs(dx), np.abs(dy))
+    counts = steps.astype(np.int64) + 1
+    if len(counts) == 0:
+        return np.empty((0, 2), dtype=np.int32)
+
+    safe_steps = np.where(steps == 0, 1.0, steps)
+    width = int(counts.max())
+    xs = np.repeat((dx / safe_steps)[:, None], width, axis=1)
+    ys = np.repeat((dy / safe_steps)[:, None], width, axis=1)
+    xs[:, 0] = x1
+    ys[:, 0] = y1
+    np.cumsum(xs, axis=1, out=xs)
+    np.cumsum(ys, axis=1, out=ys)
+
+    mask = np.arange(width) < counts[:, None]
+    points = np.empty((int(counts.sum()), 2), dtype=np.int32)
+    points[:, 0] = np.rint(xs[mask])
+    points[:, 1] = np.rint(ys[mask])
+    return points
+
+
+def dda_line_points(x1, y1, x2, y2):
+    """Return the DDA pixels of a single line as an (N, 2) array.
+
+    Same accumulation as rasterize_lines without the padded table, which
+    keeps the per-call overhead low for the common one-line case.
+    """
+    dx = x2 - x1
+    dy = y2 - y1
+    steps = max(abs(dx), abs(dy))
+    if steps == 0:
+        return np.rint([[x1, y1]]).astype(np.int32)
+
+    count = int(steps) + 1
+    xs = np.full(count, dx / steps)
+    ys = np.full(count, dy / steps)
+    xs[0] = x1
+    ys[0] = y1
+    np.cumsum(xs, out=xs)
+    np.cumsum(ys, out=ys)
+    points = np.empty((count, 2), dtype=np.int32)
+    points[:, 0] = np.rint(xs)
+    points[:, 1] = np.rint(ys)
+    return points
+
+
 def dda_line(x1, y1, x2, y2):
     """Draw a line from (x1, y1) to (x2, y2) using DDA algorithm"""
+    if _raster_mode == RASTER_BATCHED or _framebuffer is not None:
+        if x1 == x2 and y1 == y2:
+            draw_point(round(x1), round(y1))
+        else:
+            _emit_points(dda_line_points(x1, y1, x2, y2), _point_size)
+        return
+
     dx = x2 - x1
     dy = y2 - y1
     steps = max(abs(dx), abs(dy))
     
     if steps == 0:
-        draw_point(x1, y1)
+        draw_point(round(x1), round(y1))
         return
     
     x_increment = dx / steps
@@ -37,6 +232,137 @@ def dda_line(x1, y1, x2, y2):
         y += y_increment
     glEnd()
 
+# Anti-aliased thick strokes: each stroke is three GL_QUADS (a full-coverage
+# core and two one-pixel feather bands whose alpha ramps to zero across the
+# edge), carrying per-vertex RGBA so any run of strokes is one draw call.
+STROKE_BATCH = "stroke"          # _point_batches key of queued stroke vertices
+STROKE_FEATHER = 1.0             # pixels over which a stroke edge fades out
+# Per vertex of the three quads: segment end (0 start, 1 end) and band edge
+_STROKE_LAYOUT = tuple(zip((0, 1, 1, 0) * 3, (0, 0, 1, 1, 1, 1, 2, 2, 2, 2, 3, 3)))
+_STROKE_CORNERS, _STROKE_SIDES = (np.array(column) for column in zip(*_STROKE_LAYOUT))
+
+
+def stroke_vertices(x1, y1, x2, y2, width, colors):
+    """Build anti-aliased strokes as a (N * 12, 6) float32 GL_QUADS buffer.
+
+    Rows are x, y, r, g, b, a. Arguments broadcast over N strokes; colors
+    is an RGB triple or an (N, 3) array. Each stroke is extended half a
+    pixel past both endpoints (like the end pixels of dda_line) and its
+    coverage falls off linearly over STROKE_FEATHER pixels centered on
+    the nominal edge; strokes thinner than a pixel are drawn one pixel
+    wide with their alpha scaled by the width.
+    """
+    x1, y1, x2, y2, width = np.broadcast_arrays(*(np.atleast_1d(np.asarray(v, dtype=np.float64))
+                                                  for v in (x1, y1, x2, y2, width)))
+    dx = x2 - x1
+    dy = y2 - y1
+    length = np.hypot(dx, dy)
+    degenerate = length == 0
+    safe_length = np.where(degenerate, 1.0, length)
+    ux = np.where(degenerate, 1.0, dx / safe_length)
+    uy = np.where(degenerate, 0.0, dy / safe_length)
+
+    half = np.maximum(width, 1.0) / 2
+    inner = np.maximum(half - STROKE_FEATHER / 2, 0.0)
+    outer = half + STROKE_FEATHER / 2
+    alpha = np.minimum(width, 1.0)
+    edges = np.stack((-outer, -inner, inner, outer), axis=1)
+    edge_alpha = np.stack((np.zeros_like(alpha), alpha, alpha, np.zeros_like(alpha)), axis=1)
+
+    along_x = np.stack((x1 - ux / 2, x2 + ux / 2), axis=1)[:, _STROKE_CORNERS]
+    along_y = np.stack((y1 - uy / 2, y2 + uy / 2), axis=1)[:, _STROKE_CORNERS]
+    side = edges[:, _STROKE_SIDES]
+    vertices = np.empty((len(x1), 12, 6), dtype=np.float32)
+    vertices[:, :, 0] = along_x - uy[:, None] * side
+    vertices[:, :, 1] = along_y + ux[:, None] * side
+    vertices[:, :, 2:5] = np.broadcast_to(np.asarray(colors, dtype=np.float64).reshape(-1, 1, 3),
+                                          (len(x1), 12, 3))
+    vertices[:, :, 5] = edge_alpha[:, _STROKE_SIDES]
+    return vertices.reshape(-1, 6)
+
+
+def _begin_stroke_blending():
+    """Alpha-blend the color channels but keep the destination alpha,
+    which the overlay composite uses as its coverage mask"""
+    glPushAttrib(GL_COLOR_BUFFER_BIT | GL_ENABLE_BIT)
+    glEnable(GL_BLEND)
+    if bool(glBlendFuncSeparate):
+        glBlendFuncSeparate(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA, GL_ZERO, GL_ONE)
+    else:
+        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+
+
+def draw_stroke_buffer(vertices):
+    """Draw a stroke_vertices() buffer with a single glDrawArrays"""
+    if len(vertices) == 0:
+        return
+    positions = np.ascontiguousarray(vertices[:, :2])
+    colors = np.ascontiguousarray(vertices[:, 2:])
+    _begin_stroke_blending()
+    glEnableClientState(GL_VERTEX_ARRAY)
+    glEnableClientState(GL_COLOR_ARRAY)
+    glVertexPointer(2, GL_FLOAT, 0, positions)
+    glColorPointer(4, GL_FLOAT, 0, colors)
+    glDrawArrays(GL_QUADS, 0, len(vertices))
+    glDisableClientState(GL_COLOR_ARRAY)
+    glDisableClientState(GL_VERTEX_ARRAY)
+    glPopAttrib()
+    glColor3f(*_current_color)
+
+
+def thick_line_vertices(x1, y1, x2, y2, width, color):
+    """stroke_vertices for a single stroke, built without per-array NumPy
+    overhead for the common one-stroke case (same rows, same order)"""
+    dx = x2 - x1
+    dy = y2 - y1
+    length = math.hypot(dx, dy)
+    ux, uy = (dx / length, dy / length) if length else (1.0, 0.0)
+    half = max(width, 1.0) / 2
+    inner = max(half - STROKE_FEATHER / 2, 0.0)
+    outer = half + STROKE_FEATHER / 2
+    alpha = min(width, 1.0)
+    r, g, b = color
+    ends = ((x1 - ux / 2, y1 - uy / 2), (x2 + ux / 2, y2 + uy / 2))
+    edges = ((-outer, 0.0), (-inner, alpha), (inner, alpha), (outer, 0.0))
+    rows = []
+    for corner, side in _STROKE_LAYOUT:
+        x, y = ends[corner]
+        offset, edge_alpha = edges[side]
+        rows.append((x - uy * offset, y + ux * offset, r, g, b, edge_alpha))
+    return np.array(rows, dtype=np.float32)
+
+
+def _emit_strokes(vertices):
+    """Send stroke quads to the pending batch or draw them immediately"""
+    if _raster_mode == RASTER_BATCHED:
+        if _point_batches and _point_batches[-1][0] == STROKE_BATCH:
+            _point_batches[-1][1].append(vertices)
+        else:
+            _point_batches.append((STROKE_BATCH, [vertices]))
+        return
+    _begin_stroke_blending()
+    glBegin(GL_QUADS)
+    for x, y, r, g, b, a in vertices.tolist():
+        glColor4f(r, g, b, a)
+        glVertex2f(x, y)
+    glEnd()
+    glPopAttrib()
+    glColor3f(*_current_color)
+
+
+def draw_thick_line(x1, y1, x2, y2, width):
+    """Draw an anti-aliased line from (x1, y1) to (x2, y2), width pixels wide.
+
+    Batched mode queues the stroke so consecutive strokes (of any color)
+    share one draw call; the immediate path sends the same quads with
+    glBegin/glEnd.
+    """
+    if _framebuffer is not None:
+        _framebuffer.draw_stroke(x1, y1, x2, y2, width, _current_color, STROKE_FEATHER)
+        return
+    _emit_strokes(thick_line_vertices(x1, y1, x2, y2, width, _current_color))
+
+
 def draw_circle_points(x, y, x0, y0):
     """Draw 8 symmetric points of a circle"""
     draw_point(x + x0, y + y0)
@@ -48,8 +374,142 @@ def draw_circle_points(x, y, x0, y0):
     draw_point(-y + x0, x + y0)
     draw_point(-x + x0, y + y0)
 
+def pixel_radius(radius):
+    """Integer radius used by the Midpoint routines: a float radius is
+    rounded to the nearest pixel (half to even, like DDA endpoints)"""
+    pixels = round(float(radius))
+    if pixels < 0:
+        raise ValueError(f"negative circle radius: {radius!r}")
+    return pixels
+
+
+@functools.lru_cache(maxsize=128)
+def midpoint_octant(radius):
+    """Midpoint Circle decision loop for one octant, as read-only (xs, ys).
+
+    Computed once per radius; every other octant is a mirror of this table.
+    """
+    radius = pixel_radius(radius)
+    xs = [0]
+    ys = [radius]
+    x = 0
+    y = radius
+    d = 1 - radius
+    while x < y:
+        if d < 0:
+            d = d + 2 * x + 3
+        else:
+            d = d + 2 * (x - y) + 5
+            y -= 1
+        x += 1
+        xs.append(x)
+        ys.append(y)
+
+    xs = np.array(xs)
+    ys = np.array(ys)
+    xs.flags.writeable = False
+    ys.flags.writeable = False
+    return xs, ys
+
+
+@functools.lru_cache(maxsize=128)
+def _circle_offsets(radius):
+    """Octant table mirrored into all 8 octants, in draw_circle_points order"""
+    xs, ys = midpoint_octant(radius)
+    offsets = np.empty((len(xs), 8, 2), dtype=np.int32)
+    offsets[:, 0] = np.stack((xs, ys), axis=1)
+    offsets[:, 1] = np.stack((ys, xs), axis=1)
+    offsets[:, 2] = np.stack((ys, -xs), axis=1)
+    offsets[:, 3] = np.stack((xs, -ys), axis=1)
+    offsets[:, 4] = np.stack((-xs, -ys), axis=1)
+    offsets[:, 5] = np.stack((-ys, -xs), axis=1)
+    offsets[:, 6] = np.stack((-ys, xs), axis=1)
+    offsets[:, 7] = np.stack((-xs, ys), axis=1)
+    offsets = offsets.reshape(-1, 2)
+    offsets.flags.writeable = False
+    return offsets
+
+
+def draw_points(points, size=2):
+    """Draw a precomputed (N, 2) pixel buffer in the current color"""
+    global _point_size
+    _point_size = size
+    if _raster_mode == RASTER_BATCHED or _framebuffer is not None:
+        _emit_points(points, size)
+    else:
+        draw_point_buffer(points, size)
+
+
+def midpoint_circle_points(radius, x0, y0):
+    """Return the Midpoint Circle pixels centered at (x0, y0) as an int32 (N, 2) array.
+
+    The radius and the center are rounded to whole pixels.
+    """
+    return _circle_offsets(pixel_radius(radius)) + np.rint([x0, y0]).astype(np.int32)
+
+
+def rasterize_circles(radii, x0, y0):
+    """Rasterize many Midpoint circles at once into one packed int32 (N, 2) buffer.
+
+    Circles sharing a radius reuse one cached octant table, mirrored and
+    offset to every center with a single broadcast; the output keeps input
+    order and matches midpoint_circle pixel for pixel. Radii and centers
+    are rounded to whole pixels like midpoint_circle_points.
+    """
+    radii, x0, y0 = np.broadcast_arrays(np.atleast_1d(radii), np.atleast_1d(x0),
+                                        np.atleast_1d(y0))
+    centers = np.rint(np.stack((x0, y0), axis=1)).astype(np.int32)
+    unique_radii, inverse = np.unique(np.rint(radii), return_inverse=True)
+    tables = [_circle_offsets(pixel_radius(r)) for r in unique_radii]
+
+    sizes = np.array([len(table) for table in tables], dtype=np.int64)[inverse]
+    starts = np.cumsum(sizes) - sizes
+    points = np.empty((int(sizes.sum()), 2), dtype=np.int32)
+    for index, table in enumerate(tables):
+        members = np.flatnonzero(inverse == index)
+        rows = starts[members][:, None] + np.arange(len(table))
+        points[rows] = table[None, :, :] + centers[members][:, None, :]
+    return points
+
+
+def dda_lines(x1, y1, x2, y2):
+    """Draw many DDA lines; batched mode queues them as one buffer.
+
+    Zero-length segments go through draw_point as in dda_line, which also
+    sets the point size back to 2 for the lines after the first of them.
+    """
+    if _raster_mode == RASTER_BATCHED or _framebuffer is not None:
+        x1, y1, x2, y2 = np.broadcast_arrays(*(np.atleast_1d(np.asarray(v, dtype=np.float64))
+                                               for v in (x1, y1, x2, y2)))
+        degenerate = (x1 == x2) & (y1 == y2)
+        if not degenerate.any():
+            _emit_points(rasterize_lines(x1, y1, x2, y2), _point_size)
+            return
+        first = int(np.argmax(degenerate))
+        if first:
+            _emit_points(rasterize_lines(x1[:first], y1[:first], x2[:first], y2[:first]), _point_size)
+        for x, y in zip(x1[degenerate].tolist(), y1[degenerate].tolist()):
+            draw_point(round(x), round(y))
+        rest = ~degenerate
+        rest[:first] = False
+        if rest.any():
+            _emit_points(rasterize_lines(x1[rest], y1[rest], x2[rest], y2[rest]), _point_size)
+        return
+    for line in zip(*np.broadcast_arrays(x1, y1, x2, y2)):
+        dda_line(*(v.item() for v in line))
+
+
 def midpoint_circle(radius, x0, y0):
     """Draw a circle using Midpoint Circle algorithm"""
+    global _point_size
+    if _raster_mode == RASTER_BATCHED or _framebuffer is not None:
+        _point_size = 2
+        _emit_points(midpoint_circle_points(radius, x0, y0), 2)
+        return
+
+    radius = pixel_radius(radius)
+    x0 = round(x0)
+    y0 = round(y0)
     x = 0
     y = radius
     d = 1 - radius
@@ -66,23 +526,144 @@ def midpoint_circle(radius, x0, y0):
         draw_circle_points(x, y, x0, y0)
 
 
+# Scanline spans: rings and disks are emitted as horizontal pixel runs
+# (y, x_start, x_end) with x_end exclusive, each drawn as one 1-pixel-tall
+# quad; pixel (x, y) covers [x, x + 1] x [y, y + 1] like a size-1 point.
+SPAN_BATCH = "spans"             # size slot of the _point_batches key for span runs
+# Quad corners of a span as (x, y) columns of its (y, x_start, x_end) row, and
+# the row offsets lifting the top two corners
+_SPAN_QUAD_COLUMNS = np.array([1, 0, 2, 0, 2, 0, 1, 0])
+_SPAN_QUAD_ROWS = np.array([0, 0, 0, 0, 0, 1, 0, 1], dtype=np.int32)
+
+
+@functools.lru_cache(maxsize=128)
+def midpoint_row_extents(radius):
+    """Innermost and outermost |x| of the Midpoint circle pixels on each row.
+
+    Returns read-only (low, high) arrays indexed by |y| from 0 to radius,
+    read off the cached octant table and its diagonal mirror.
+    """
+    xs, ys = midpoint_octant(radius)
+    low = np.full(radius + 1, radius, dtype=np.int64)
+    high = np.zeros(radius + 1, dtype=np.int64)
+    for rows, columns in ((ys, xs), (xs, ys)):
+        np.minimum.at(low, rows, columns)
+        np.maximum.at(high, rows, columns)
+    low.flags.writeable = False
+    high.flags.writeable = False
+    return low, high
+
+
+@functools.lru_cache(maxsize=64)
+def _ring_offsets(inner_radius, outer_radius):
+    """Spans of a ring relative to its center (a disk when inner_radius is 0)"""
+    outer_high = midpoint_row_extents(outer_radius)[1]
+    inner_low = midpoint_row_extents(inner_radius)[0]
+    dy = np.arange(-outer_radius, outer_radius + 1)
+    rows = np.abs(dy)
+    high = outer_high[rows]
+    hole = np.where(rows <= inner_radius, inner_low[np.minimum(rows, inner_radius)], 0)
+    split = hole > 0
+    left = np.stack((dy, -high, np.where(split, 1 - hole, high + 1)), axis=1)
+    right = np.stack((dy, hole, high + 1), axis=1)[split]
+    spans = np.concatenate((left, right)).astype(np.int32)
+    spans = spans[np.lexsort((spans[:, 1], spans[:, 0]))]
+    spans.flags.writeable = False
+    return spans
+
+
+def ring_spans(inner_radius, outer_radius, x0, y0):
+    """Horizontal runs covering every Midpoint circle of radius inner_radius
+    to outer_radius around (x0, y0), with no gaps between the radii, as an
+    int32 (N, 3) array of (y, x_start, x_end). Radii and center are rounded
+    like midpoint_circle's; an inner radius below 0 gives a disk."""
+    inner_radius = max(0, round(float(inner_radius)))
+    offsets = _ring_offsets(inner_radius, pixel_radius(outer_radius))
+    return offsets + np.rint([y0, x0, x0]).astype(np.int32)
+
+
+def draw_span_buffer(spans):
+    """Draw an (N, 3) span array as 1-pixel-tall quads with a single glDrawArrays"""
+    if len(spans) == 0:
+        return
+    quads = np.ascontiguousarray(spans[:, _SPAN_QUAD_COLUMNS], dtype=np.int32) + _SPAN_QUAD_ROWS
+    glEnableClientState(GL_VERTEX_ARRAY)
+    glVertexPointer(2, GL_INT, 0, quads)
+    glDrawArrays(GL_QUADS, 0, len(spans) * 4)
+    glDisableClientState(GL_VERTEX_ARRAY)
+
+
+def draw_spans(spans):
+    """Draw precomputed (y, x_start, x_end) runs in the current color"""
+    if _framebuffer is not None:
+        _framebuffer.fill_spans(spans, _current_color)
+    elif _raster_mode == RASTER_BATCHED:
+        _queue_points(spans, SPAN_BATCH)
+    else:
+        glBegin(GL_QUADS)
+        for y, x_start, x_end in spans.tolist():
+            glVertex2f(x_start, y)
+            glVertex2f(x_end, y)
+            glVertex2f(x_end, y + 1)
+            glVertex2f(x_start, y + 1)
+        glEnd()
+
+
+def draw_ring(inner_radius, outer_radius, x0, y0):
+    """Fill the annulus between two Midpoint circles (both included) by scanline spans"""
+    draw_spans(ring_spans(inner_radius, outer_radius, x0, y0))
+
+
+def draw_disk(radius, x0, y0):
+    """Fill a Midpoint circle and its interior by scanline spans"""
+    draw_spans(ring_spans(0, radius, x0, y0))
+
+
 def draw_filled_circle(radius, x0, y0):
     """Draw a filled circle"""
+    flush_points()
     # Use a triangle fan for a smooth filled circle (faster than repeated midpoint circles)
     segments = max(16, int(radius * 0.5))
+    # cached unit circle for this segment count, scaled by radius
+    xs, ys = unit_circle(segments)
+    rim = np.stack((x0 + radius * xs, y0 + radius * ys), axis=1)
+
+    if _framebuffer is not None:
+        _framebuffer.fill_polygon(rim, _current_color)
+        return
     glBegin(GL_TRIANGLE_FAN)
     # center
     glVertex2f(x0, y0)
-    for i in range(segments + 1):
-        theta = 2.0 * math.pi * i / segments
-        # use rotate helper for unit x vector then scale by radius
-        ux, uy = rotate_point(1.0, 0.0, theta)
-        cx = x0 + radius * ux
-        cy = y0 + radius * uy
+    for cx, cy in rim.tolist():
         glVertex2f(cx, cy)
     glEnd()
 
 
+def fill_rect(x1, y1, x2, y2):
+    """Fill the axis-aligned rectangle (x1, y1)-(x2, y2) with the current color"""
+    flush_points()
+    if _framebuffer is not None:
+        _framebuffer.fill_rect(x1, y1, x2, y2, _current_color)
+        return
+    glBegin(GL_QUADS)
+    glVertex2f(x1, y1)
+    glVertex2f(x2, y1)
+    glVertex2f(x2, y2)
+    glVertex2f(x1, y2)
+    glEnd()
+
+
+@functools.lru_cache(maxsize=16)
+def unit_circle(segments):
+    """Closed unit circle with segments + 1 points, as read-only (xs, ys)"""
+    theta = 2.0 * math.pi * np.arange(segments + 1) / segments
+    xs = np.cos(theta)
+    ys = np.sin(theta)
+    xs.flags.writeable = False
+    ys.flags.writeable = False
+    return xs, ys
+
+
 def rotate_point(x, y, theta):
     """Rotate point (x,y) by angle theta (radians). Returns (xr, yr)."""
     c = math.cos(theta)
@@ -0,0 +1,170 @@
+"""
+angle_table.py - Precomputed trig tables and cached gauge geometry
+A fixed-resolution sine table answers sin/cos lookups (nearest entry or
+linearly interpolated) for scalars and arrays, with documented error
+bounds; the needles are placed with lookup_polar. The gauge faces use
+the cached endpoint arrays below instead of calling math.radians and
+rotate_point for the same tick and arc angles on every draw; those
+caches are built with rotate_point itself, so the rasterized pixels are
+unchanged.
+
+Run this module to print the table error against rotate_point and time it.
+"""
+
+import functools
+import math
+import numpy as np
+from algorithms import rotate_point
+
+ANGLE_STEPS = 3600                 # table entries per full turn (0.1 degree)
+DEGREES_PER_STEP = 360.0 / ANGLE_STEPS
+QUARTER_TURN = ANGLE_STEPS // 4
+
+# Maximum |error| of a unit-radius lookup: half a step of angle for the
+# nearest entry, step^2 / 8 for linear interpolation (plus float rounding).
+NEAREST_MAX_ERROR = math.radians(DEGREES_PER_STEP) / 2 + 1e-12
+INTERPOLATED_MAX_ERROR = math.radians(DEGREES_PER_STEP) ** 2 / 8 + 1e-10
+
+# Gauge dial: minimum value at 225 degrees, sweeping 270 degrees clockwise
+GAUGE_START_ANGLE = 225.0
+GAUGE_SWEEP = 270.0
+ARC_STEPS = 20
+
+# One turn of sine plus a quarter turn (for cosine) and one interpolation guard
+SIN_TABLE = np.sin(2.0 * np.pi * np.arange(ANGLE_STEPS + QUARTER_TURN + 1) / ANGLE_STEPS)
+SIN_TABLE.flags.writeable = False
+_SIN_LIST = SIN_TABLE.tolist()     # scalar lookups avoid NumPy call overhead
+
+
+def _lookup(angle, offset, interpolate):
+    # angle % 360.0 can round up to exactly 360.0 for tiny negative angles,
+    # so the entry index is wrapped back into the first turn
+    if isinstance(angle, (int, float)):
+        position = (angle % 360.0) / DEGREES_PER_STEP
+        if not interpolate:
+            return _SIN_LIST[round(position) % ANGLE_STEPS + offset]
+        index = int(position)
+        fraction = position - index
+        index = index % ANGLE_STEPS + offset
+        low = _SIN_LIST[index]
+        return low + (_SIN_LIST[index + 1] - low) * fraction
+
+    position = np.mod(angle, 360.0) / DEGREES_PER_STEP
+    if not interpolate:
+        return SIN_TABLE[np.rint(position).astype(np.intp) % ANGLE_STEPS + offset]
+    index = position.astype(np.intp)
+    fraction = position - index
+    index = index % ANGLE_STEPS + offset
+    low = SIN_TABLE[index]
+    return low + (SIN_TABLE[index + 1] - low) * fraction
+
+
+def lookup_sin(angle, interpolate=True):
+    """sin of angle in degrees (scalar or array) from the table"""
+    return _lookup(angle, 0, interpolate)
+
+
+def lookup_cos(angle, interpolate=True):
+    """cos of angle in degrees (scalar or array) from the table"""
+    return _lookup(angle, QUARTER_TURN, interpolate)
+
+
+def lookup_polar(radius, angle, interpolate=True):
+    """Table-based equivalent of rotate_point(radius, 0.0, math.radians(angle))"""
+    return (radius * lookup_cos(angle, interpolate),
+            radius * lookup_sin(angle, interpolate))
+
+
+def gauge_angle(value, min_val, max_val):
+    """Dial angle in degrees of value, clamped to the gauge range"""
+    normalized = (value - min_val) / (max_val - min_val)
+    normalized = max(0, min(1, normalized))
+    return GAUGE_START_ANGLE - normalized * GAUGE_SWEEP
+
+
+def _read_only(values, dtype):
+    array = np.array(values, dtype=dtype)
+    array.flags.writeable = False
+    return array
+
+
+@functools.lru_cache(maxsize=64)
+def polar_offsets(radius, angles):
+    """(N, 2) float offsets of rotate_point(radius, 0, angle) for a tuple of degrees"""
+    return _read_only([rotate_point(radius, 0.0, math.radians(angle)) for angle in angles],
+                      np.float64).reshape(-1, 2)
+
+
+@functools.lru_cache(maxsize=64)
+def tick_segments(cx, cy, outer, inner, angles):
+    """(N, 4) int endpoints (x1, y1, x2, y2) of radial ticks from outer to inner"""
+    start = polar_offsets(outer, angles)
+    end = polar_offsets(inner, angles)
+    return _read_only([(int(cx + x1), int(cy + y1), int(cx + x2), int(cy + y2))
+                       for (x1, y1), (x2, y2) in zip(start, end)], np.int64).reshape(-1, 4)
+
+
+@functools.lru_cache(maxsize=64)
+def label_positions(cx, cy, radius, angles):
+    """(N, 2) int anchor points of tick labels at radius"""
+    return _read_only([(int(cx + x), int(cy + y)) for x, y in polar_offsets(radius, angles)],
+                      np.int64).reshape(-1, 2)
+
+
+@functools.lru_cache(maxsize=64)
+def arc_segments(cx, cy, radius, angle_start, angle_end, steps=ARC_STEPS):
+    """(steps, 4) int chord endpoints approximating an arc between two angles"""
+    angles = tuple(angle_start + (angle_end - angle_start) * (i / steps) for i in range(steps + 1))
+    points = [(int(cx + x), int(cy + y)) for x, y in polar_offsets(radius, angles)]
+    return _read_only([points[i] + points[i + 1] for i in range(steps)], np.int64).reshape(-1, 4)
+
+
+def measure_error(samples=100000, interpolate=True, seed=0):
+    """Largest |table - rotate_point| over random angles, per unit radius"""
+    rng = np.random.default_rng(seed)
+    angles = rng.uniform(-720.0, 720.0, samples)
+    exact = np.array([rotate_point(1.0, 0.0, math.radians(angle)) for angle in angles.tolist()])
+    x, y = lookup_polar(1.0, angles, interpolate)
+    return float(max(np.abs(x - exact[:, 0]).max(), np.abs(y - exact[:, 1]).max()))
+
+
+def _benchmark():
+    import timeit
+
+    def best(statement, number):
+        return min(timeit.repeat(statement, number=number, repeat=5, globals=globals())) / number
+
+    def report(label, seconds):
+        print(f"  {label:<44}{seconds * 1e6:10.3f} us")
+
+    angles = tuple(225 - (i / 230.0) * 270 for i in range(0, 240, 20))
+    globals()["_angles"] = angles
+    globals()["_array"] = np.random.default_rng(1).uniform(-45.0, 225.0, 4096)
+    print("scalar needle tip:")
+    report("rotate_point(r, 0, math.radians(a))", best("rotate_point(95, 0.0, math.radians(123.4))", 100000))
+    report("lookup_polar(r, a, interpolate=False)", best("lookup_polar(95, 123.4, False)", 100000))
+    report("lookup_polar(r, a)", best("lookup_polar(95, 123.4)", 100000))
+    print("4096 angles:")
+    report("np.cos / np.sin", best("np.cos(np.radians(_array)), np.sin(np.radians(_array))", 1000))
+    report("lookup_polar(1, a)", best("lookup_polar(1.0, _array)", 1000))
+    print("speedometer major ticks (12 ticks, 3 radii):")
+    report("rotate_point loop", best(
+        "[(int(770 + rotate_point(r, 0.0, math.radians(a))[0]),"
+        " int(210 + rotate_point(r, 0.0, math.radians(a))[1]))"
+        " for a in _angles for r in (107, 93, 75)]", 10000))
+    report("cached tick_segments + label_positions",
+           best("tick_segments(770, 210, 107, 93, _angles), label_positions(770, 210, 75, _angles)", 10000))
+    print("warning arc (20 chords):")
+    report("rotate_point loop", best(
+        "[(int(770 + rotate_point(113, 0.0, math.radians(-30 + (-5.8) * (i / 20)))[0]),"
+        " int(210 + rotate_point(113, 0.0, math.radians(-30 + (-5.8) * (i / 20)))[1]))"
+        " for i in range(21) for _ in (0, 1)]", 10000))
+    report("cached arc_segments", best("arc_segments(770, 210, 113, -30.0, -35.8)", 10000))
+
+
+if __name__ == "__main__":
+    for interpolate, bound in ((False, NEAREST_MAX_ERROR), (True, INTERPOLATED_MAX_ERROR)):
+        error = measure_error(interpolate=interpolate)
+        mode = "interpolated" if interpolate else "nearest"
+        print(f"{mode:>12}: max error {error:.3e} per unit radius (bound {bound:.3e})")
+    _benchmark()
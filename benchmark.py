@@ -0,0 +1,234 @@
+"""
+benchmark.py - Micro-benchmarks of the drawing primitives and gauge functions
+Times algorithms.py and components.py calls (DDA lines across lengths and
+slopes, anti-aliased thick lines, Midpoint circles across radii, filled
+circles, scanline disks and rings, the half-circle frame and fill, arc
+segments and every full gauge) with their OpenGL and GLUT functions
+replaced by no-ops, so only the Python-side cost is measured and no
+display or GPU is needed. Each case is flushed after every call, so
+batched mode includes the packing and draw_point_buffer work.
+
+Results are written as JSON; given a baseline JSON, cases slower by more
+than the threshold are reported and the exit status is 1.
+
+Usage:
+    python benchmark.py --json before.json
+    python benchmark.py --baseline before.json --threshold 10
+    python benchmark.py --filter dda_line --raster immediate
+"""
+
+import argparse
+import json
+import math
+import platform
+import statistics
+import sys
+import time
+
+import numpy as np
+
+import algorithms
+import components
+import text_atlas
+
+STUBBED_MODULES = (algorithms, components, text_atlas)
+LINE_LENGTHS = (1, 10, 100, 500)
+LINE_SLOPES = (0, 30, 45, 80, 90)        # degrees
+THICK_LINE_WIDTHS = (1, 4)
+CIRCLE_RADII = (5, 20, 80, 200)
+REPEATS = 5
+MIN_SAMPLE_TIME = 0.05                   # seconds per timed repeat
+DEFAULT_THRESHOLD = 10.0                 # percent slower than baseline
+
+
+def _noop(*args, **kwargs):
+    return None
+
+
+def stub_gl(modules=STUBBED_MODULES):
+    """Replace the OpenGL/GLUT functions bound in modules with no-ops.
+
+    Returns the (namespace, name, original) list that restore_gl() undoes.
+    """
+    replaced = []
+    for module in modules:
+        namespace = vars(module)
+        for name, value in list(namespace.items()):
+            if name.startswith("gl") and callable(value):
+                replaced.append((namespace, name, value))
+                namespace[name] = _noop
+    return replaced
+
+
+def restore_gl(replaced):
+    for namespace, name, original in reversed(replaced):
+        namespace[name] = original
+
+
+def _line_case(length, slope):
+    angle = math.radians(slope)
+    x2 = 100 + round(length * math.cos(angle))
+    y2 = 100 + round(length * math.sin(angle))
+    return lambda: algorithms.dda_line(100, 100, x2, y2)
+
+
+def _thick_line_case(length, width):
+    angle = math.radians(30)
+    x2 = 100 + length * math.cos(angle)
+    y2 = 100 + length * math.sin(angle)
+    return lambda: algorithms.draw_thick_line(100, 100, x2, y2, width)
+
+
+def benchmark_cases():
+    """{name: callable} of every benchmarked call, in report order"""
+    cases = {}
+    for length in LINE_LENGTHS:
+        for slope in LINE_SLOPES:
+            cases[f"dda_line[len={length},slope={slope}]"] = _line_case(length, slope)
+    for length in LINE_LENGTHS:
+        for width in THICK_LINE_WIDTHS:
+            cases[f"draw_thick_line[len={length},width={width}]"] = _thick_line_case(length, width)
+    for radius in CIRCLE_RADII:
+        cases[f"midpoint_circle[r={radius}]"] = (lambda r: lambda: algorithms.midpoint_circle(r, 400, 300))(radius)
+    for radius in CIRCLE_RADII:
+        cases[f"draw_filled_circle[r={radius}]"] = (lambda r: lambda: algorithms.draw_filled_circle(r, 400, 300))(radius)
+    for radius in CIRCLE_RADII:
+        cases[f"draw_disk[r={radius}]"] = (lambda r: lambda: algorithms.draw_disk(r, 400, 300))(radius)
+    for radius in CIRCLE_RADII:
+        cases[f"draw_ring[r={radius},width=8]"] = (lambda r: lambda: algorithms.draw_ring(r - 7, r, 400, 300))(radius)
+
+    def cold(function, *caches):
+        def call():
+            for cache in caches:
+                cache.cache_clear()
+            function()
+        return call
+
+    cases["draw_half_circle_frame"] = lambda: components.draw_half_circle_frame(750, 0, 350, thickness=10)
+    cases["draw_half_circle_frame[cold]"] = cold(
+        lambda: components.draw_half_circle_frame(750, 0, 350, thickness=10),
+        components.half_circle_frame_pixels, algorithms.midpoint_octant)
+    cases["fill_half_circle_fast"] = lambda: components.fill_half_circle_fast(750, 0, 340)
+    cases["fill_half_circle_fast[cold]"] = cold(
+        lambda: components.fill_half_circle_fast(750, 0, 340),
+        components.half_circle_fill_pixels, algorithms.midpoint_octant)
+    cases["draw_arc_segment"] = lambda: components.draw_arc_segment(770, 210, 113, -30.0, -35.8)
+    cases["draw_speedometer"] = lambda: components.draw_speedometer(770, 210, 120, 137.0)
+    cases["draw_rpm_meter"] = lambda: components.draw_rpm_meter(560, 140, 80, 4.2)
+    cases["draw_fuel_meter"] = lambda: components.draw_fuel_meter(980, 130, 70, 42.0)
+    cases["draw_digital_display"] = lambda: components.draw_digital_display(695, 30, 140, 40, 137, "km/h")
+    cases["draw_turn_arrow[on]"] = lambda: components.draw_turn_arrow(515, 280, "left", True)
+    cases["draw_indicator_light[on]"] = lambda: components.draw_indicator_light(1050, 50, 10, True, (1.0, 0.0, 0.0))
+    return cases
+
+
+def time_case(function, repeats=REPEATS, min_time=MIN_SAMPLE_TIME):
+    """Best and median seconds per call over repeats, after calibrating the loop count"""
+    def run(number):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+            algorithms.flush_points()
+        return time.perf_counter() - start
+
+    run(1)
+    number = 1
+    while True:
+        elapsed = run(number)
+        if elapsed >= min_time / 10:
+            break
+        number *= 10
+    number = max(1, int(number * min_time / elapsed))
+    samples = [run(number) / number for _ in range(repeats)]
+    return {"min_us": min(samples) * 1e6, "median_us": statistics.median(samples) * 1e6,
+            "iterations": number}
+
+
+def run_benchmarks(raster="batched", pattern=None, repeats=REPEATS, min_time=MIN_SAMPLE_TIME):
+    """Time every case (optionally only names containing pattern) against the no-op GL"""
+    replaced = stub_gl()
+    previous_mode = algorithms.get_raster_mode()
+    previous_cache = components._gauge_face_cache_enabled
+    previous_text = text_atlas._glut_text_enabled
+    try:
+        components.set_gauge_face_cache(False)   # display lists need a real context
+        text_atlas.set_glut_text(True)            # time the glutBitmapCharacter fallback
+        algorithms.set_raster_mode(raster)
+        results = {}
+        for name, function in benchmark_cases().items():
+            if pattern and pattern not in name:
+                continue
+            results[name] = time_case(function, repeats, min_time)
+    finally:
+        algorithms.set_raster_mode(previous_mode)
+        components.set_gauge_face_cache(previous_cache)
+        text_atlas.set_glut_text(previous_text)
+        restore_gl(replaced)
+    return {
+        "meta": {"raster": raster, "python": platform.python_version(), "numpy": np.__version__,
+                 "machine": platform.machine(), "repeats": repeats},
+        "results": results,
+    }
+
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """[(name, baseline us, current us, percent change)] for cases in both runs, and the regressions"""
+    rows = []
+    regressions = []
+    for name, result in current["results"].items():
+        previous = baseline["results"].get(name)
+        if previous is None:
+            continue
+        change = (result["min_us"] / previous["min_us"] - 1) * 100
+        rows.append((name, previous["min_us"], result["min_us"], change))
+        if change > threshold:
+            regressions.append(name)
+    return rows, regressions
+
+
+def format_results(result, rows=None):
+    lines = [f"raster={result['meta']['raster']}  (us per call, no-op GL)",
+             f"{'case':<36}{'min':>11}{'median':>11}" + (f"{'baseline':>11}{'change':>9}" if rows else "")]
+    changes = {name: (before, change) for name, before, _, change in rows or ()}
+    for name, stats in result["results"].items():
+        line = f"{name:<36}{stats['min_us']:11.2f}{stats['median_us']:11.2f}"
+        if name in changes:
+            before, change = changes[name]
+            line += f"{before:11.2f}{change:+8.1f}%"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the drawing primitives against a no-op GL")
+    parser.add_argument("--raster", choices=("batched", "immediate"), default="batched")
+    parser.add_argument("--filter", help="only run cases whose name contains this text")
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument("--min-time", type=float, default=MIN_SAMPLE_TIME,
+                        help="seconds per timed repeat")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="compare against a previous --json file")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="percent slowdown (min time) counted as a regression")
+    args = parser.parse_args(argv)
+
+    result = run_benchmarks(args.raster, args.filter, args.repeats, args.min_time)
+    rows = regressions = None
+    if args.baseline:
+        with open(args.baseline) as handle:
+            baseline = json.load(handle)
+        if baseline["meta"]["raster"] != result["meta"]["raster"]:
+            parser.error(f"baseline was run with raster={baseline['meta']['raster']}")
+        rows, regressions = compare(result, baseline, args.threshold)
+    print(format_results(result, rows))
+    if args.json:
+        with open(args.json, "w") as handle:
+            json.dump(result, handle, indent=2)
+    if regressions:
+        print(f"{len(regressions)} regression(s) over {args.threshold:g}%: " + ", ".join(regressions))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
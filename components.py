@@ -2,345 +2,383 @@
 from OpenGL.GL import *
 from OpenGL.GLUT import *
 import math
+import functools
 from algorithms import *
-def draw_half_circle_frame(cx, cy, radius, thickness=12):
-    for r in range(radius, radius - thickness, -1):
-        x = 0
-        y = r
-        d = 1 - r
-
-        while x <= y:
-            draw_point(cx + x, cy + y)
-            draw_point(cx + y, cy + x)
-
-            draw_point(cx - x, cy + y)
-            draw_point(cx - y, cy + x)
-
-            if d < 0:
-                d = d + 2 * x + 3
-            else:
-                d = d + 2 * (x - y) + 5
-                y -= 1
-            x += 1
-def fill_half_circle_fast(cx, cy, radius, layers=40):
+from angle_table import gauge_angle, lookup_polar, tick_segments, label_positions, arc_segments
+from text_atlas import draw_string
+
+def _upper_half_circle_pixels(radius):
+    """Pixels of the upper half of a Midpoint circle of the given radius.
+
+    Uses the same four reflections of the first octant (x <= y) as the
+    original per-radius loop.
+    """
+    xs, ys = midpoint_octant(radius)
+    keep = xs <= ys
+    xs = xs[keep]
+    ys = ys[keep]
+    return np.concatenate((np.stack((xs, ys), axis=1),
+                           np.stack((ys, xs), axis=1),
+                           np.stack((-xs, ys), axis=1),
+                           np.stack((-ys, xs), axis=1)))
+
+
+def _packed_half_circles(cx, cy, radii):
+    """Union of the upper half circles for radii, deduplicated, as int32 (N, 2)"""
+    pixels = np.concatenate([_upper_half_circle_pixels(r) for r in radii])
+    pixels = np.unique(pixels, axis=0) + np.array([cx, cy])
+    pixels = pixels.astype(np.int32)
+    pixels.flags.writeable = False
+    return pixels
+
+
+@functools.lru_cache(maxsize=8)
+def half_circle_frame_pixels(cx, cy, radius, thickness=12):
+    """Cached pixel set of draw_half_circle_frame"""
+    return _packed_half_circles(cx, cy, range(radius, radius - thickness, -1))
+
+
+@functools.lru_cache(maxsize=8)
+def half_circle_fill_pixels(cx, cy, radius, layers=40):
+    """Cached pixel set of fill_half_circle_fast"""
     step = radius // layers
     if step < 1:
         step = 1
+    return _packed_half_circles(cx, cy, range(radius, 0, -step))
 
-    for r in range(radius, 0, -step):
-        x = 0
-        y = r
-        d = 1 - r
 
-        while x <= y:
-            draw_point(cx + x, cy + y)
-            draw_point(cx + y, cy + x)
+def draw_half_circle_frame(cx, cy, radius, thickness=12):
+    draw_points(half_circle_frame_pixels(cx, cy, radius, thickness))
 
-            draw_point(cx - x, cy + y)
-            draw_point(cx - y, cy + x)
+def fill_half_circle_fast(cx, cy, radius, layers=40):
+    draw_points(half_circle_fill_pixels(cx, cy, radius, layers))
 
-            if d < 0:
-                d += 2 * x + 3
-            else:
-                d += 2 * (x - y) + 5
-                y -= 1
-            x += 1
 
-    
+# Static gauge layers (bezel, warning arcs, ticks, numerals, hub and labels)
+# are compiled once into display lists keyed by (layer, center, radius) and
+# replayed every frame; only the needle is rasterized per frame.
+# On the software framebuffer the same layers are cached as cropped sprites.
+_gauge_face_cache_enabled = True
+_gauge_face_lists = {}
+_gauge_face_sprites = {}
+
+
+def set_gauge_face_cache(enabled):
+    """Enable or disable display-list caching of static gauge layers"""
+    global _gauge_face_cache_enabled
+    _gauge_face_cache_enabled = enabled
+    invalidate_gauge_faces()
+
+
+def invalidate_gauge_faces():
+    """Drop every cached gauge layer (call when geometry or window size changes)"""
+    for display_list in _gauge_face_lists.values():
+        glDeleteLists(display_list, 1)
+    _gauge_face_lists.clear()
+    _gauge_face_sprites.clear()
+
+
+def draw_cached_layer(key, draw_fn, *args):
+    """Replay the display list for key, compiling it from draw_fn on first use"""
+    if not _gauge_face_cache_enabled:
+        draw_fn(*args)
+        return
+
+    framebuffer = get_framebuffer()
+    if framebuffer is not None:
+        _draw_cached_sprite(framebuffer, key, draw_fn, *args)
+        return
+
+    flush_points()
+    display_list = _gauge_face_lists.get(key)
+    if display_list is None:
+        display_list = glGenLists(1)
+        glNewList(display_list, GL_COMPILE)
+        draw_fn(*args)
+        flush_points()
+        glEndList()
+        _gauge_face_lists[key] = display_list
+    glCallList(display_list)
+
+
+def _draw_cached_sprite(framebuffer, key, draw_fn, *args):
+    """Software counterpart of draw_cached_layer: record once, then blit"""
+    sprite_key = key + (framebuffer.width, framebuffer.height)
+    sprite = _gauge_face_sprites.get(sprite_key)
+    if sprite is None:
+        recorder = framebuffer.__class__(framebuffer.width, framebuffer.height, track_coverage=True)
+        set_framebuffer(recorder)
+        try:
+            draw_fn(*args)
+        finally:
+            set_framebuffer(framebuffer)
+        sprite = recorder.to_layer()
+        _gauge_face_sprites[sprite_key] = sprite
+    framebuffer.blit(sprite)
+
 
 def draw_speedometer(center_x, center_y, radius, speed):
-    glColor3f(0.1, 0.1, 0.1)
-    glLineWidth(3)
+    draw_cached_layer(("speedometer_face", center_x, center_y, radius),
+                      _draw_speedometer_face, center_x, center_y, radius)
+    draw_needle_smooth(center_x, center_y, radius - 30, speed, 0, 230)
+    draw_cached_layer(("speedometer_cap", center_x, center_y, radius),
+                      _draw_speedometer_cap, center_x, center_y, radius)
+
+def _draw_speedometer_face(center_x, center_y, radius):
+    set_color(0.1, 0.1, 0.1)
+    set_line_width(3)
     midpoint_circle(radius, center_x, center_y)
     
-    glColor3f(0.22, 0.22, 0.25)
-    for r in range(radius - 3, radius - 10, -1):
-        midpoint_circle(r, center_x, center_y)
+    set_color(0.22, 0.22, 0.25)
+    draw_ring(radius - 10, radius - 3, center_x, center_y)
     
-    glColor3f(0.45, 0.08, 0.08)  
+    set_color(0.45, 0.08, 0.08)  
     for warning_speed in range(200, 240, 5):
         angle_start = 225 - (warning_speed / 230.0) * 270
         angle_end = 225 - ((warning_speed + 5) / 230.0) * 270
         draw_arc_segment(center_x, center_y, radius - 12, angle_start, angle_end)
     
-    glLineWidth(2)
-    for i in range(0, 240, 20):
-        angle = 225 - (i / 230.0) * 270  
-        angle_rad = math.radians(angle)
+    set_line_width(2)
+    values = range(0, 240, 20)
+    angles = tuple(225 - (i / 230.0) * 270 for i in values)
+    ticks = tick_segments(center_x, center_y, radius - 18, radius - 32, angles).tolist()
+    labels = label_positions(center_x, center_y, radius - 50, angles).tolist()
+    for i, tick, (x_text, y_text) in zip(values, ticks, labels):
+        set_color(0.88, 0.88, 0.90) if i < 200 else set_color(0.75, 0.25, 0.25)
+        set_line_width(3)
+        dda_line(*tick)
         
-        glColor3f(0.88, 0.88, 0.90) if i < 200 else glColor3f(0.75, 0.25, 0.25)
-        glLineWidth(3)
-        ux, uy = rotate_point(radius - 18, 0.0, angle_rad)
-        x1 = center_x + ux
-        y1 = center_y + uy
-        ux2, uy2 = rotate_point(radius - 32, 0.0, angle_rad)
-        x2 = center_x + ux2
-        y2 = center_y + uy2
-        dda_line(int(x1), int(y1), int(x2), int(y2))
-        
-        glColor3f(0.82, 0.82, 0.85)
-        ux_t, uy_t = rotate_point(radius - 50, 0.0, angle_rad)
-        x_text = center_x + ux_t
-        y_text = center_y + uy_t
-        draw_number(int(x_text), int(y_text), i)
-    
-    glLineWidth(1)
-    for i in range(10, 240, 20):  
-        angle = 225 - (i / 230.0) * 270
-        angle_rad = math.radians(angle)
-        
-        glColor3f(0.72, 0.72, 0.75)
-        ux, uy = rotate_point(radius - 20, 0.0, angle_rad)
-        x1 = center_x + ux
-        y1 = center_y + uy
-        ux2, uy2 = rotate_point(radius - 27, 0.0, angle_rad)
-        x2 = center_x + ux2
-        y2 = center_y + uy2
-        dda_line(int(x1), int(y1), int(x2), int(y2))
-    
-    draw_needle_smooth(center_x, center_y, radius - 30, speed, 0, 230)
+        set_color(0.82, 0.82, 0.85)
+        draw_number(x_text, y_text, i)
     
-    glColor3f(0.6, 0.15, 0.1)  
+    set_line_width(1)
+    angles = tuple(225 - (i / 230.0) * 270 for i in range(10, 240, 20))
+    set_color(0.72, 0.72, 0.75)
+    for tick in tick_segments(center_x, center_y, radius - 20, radius - 27, angles).tolist():
+        dda_line(*tick)
+
+def _draw_speedometer_cap(center_x, center_y, radius):
+    set_color(0.6, 0.15, 0.1)  
     draw_filled_circle(9, center_x, center_y)
-    glColor3f(0.75, 0.1, 0.1)  
+    set_color(0.75, 0.1, 0.1)  
     draw_filled_circle(5, center_x, center_y)
     
-    glColor3f(0.78, 0.78, 0.80)
+    set_color(0.78, 0.78, 0.80)
     draw_text(center_x - 25, center_y - 85, "SPEED")
-    glColor3f(0.82, 0.82, 0.85)
+    set_color(0.82, 0.82, 0.85)
     draw_text(center_x - 15, center_y - 98, "km/h")
 
 def draw_rpm_meter(center_x, center_y, radius, rpm):
-    glColor3f(0.1, 0.1, 0.1)
-    glLineWidth(3)
+    draw_cached_layer(("rpm_face", center_x, center_y, radius),
+                      _draw_rpm_face, center_x, center_y, radius)
+    draw_needle_smooth(center_x, center_y, radius - 30, rpm, 0, 8)
+    draw_cached_layer(("rpm_cap", center_x, center_y, radius),
+                      _draw_rpm_cap, center_x, center_y, radius)
+
+def _draw_rpm_face(center_x, center_y, radius):
+    set_color(0.1, 0.1, 0.1)
+    set_line_width(3)
     midpoint_circle(radius, center_x, center_y)
     
-    glColor3f(0.22, 0.20, 0.20)
-    for r in range(radius - 3, radius - 10, -1):
-        midpoint_circle(r, center_x, center_y)
+    set_color(0.22, 0.20, 0.20)
+    draw_ring(radius - 10, radius - 3, center_x, center_y)
     
-    glColor3f(0.45, 0.08, 0.08)  
+    set_color(0.45, 0.08, 0.08)  
     for rpm_val in range(7, 9):
         angle_start = 225 - (rpm_val / 8.0) * 270
         angle_end = 225 - ((rpm_val + 0.5) / 8.0) * 270
         draw_arc_segment(center_x, center_y, radius - 12, angle_start, angle_end)
     
-    glLineWidth(2)
-    for i in range(0, 9):
-        angle = 225 - (i / 8.0) * 270
-        angle_rad = math.radians(angle)
+    set_line_width(2)
+    values = range(0, 9)
+    angles = tuple(225 - (i / 8.0) * 270 for i in values)
+    ticks = tick_segments(center_x, center_y, radius - 15, radius - 25, angles).tolist()
+    labels = label_positions(center_x, center_y, radius - 40, angles).tolist()
+    for i, tick, (x_text, y_text) in zip(values, ticks, labels):
+        set_color(0.88, 0.88, 0.90) if i < 7 else set_color(0.75, 0.25, 0.25)
+        set_line_width(2.5)
+        dda_line(*tick)
         
-        glColor3f(0.88, 0.88, 0.90) if i < 7 else glColor3f(0.75, 0.25, 0.25)
-        glLineWidth(2.5)
-        
-        ux, uy = rotate_point(radius - 15, 0.0, angle_rad)
-        x1 = center_x + ux
-        y1 = center_y + uy
-        ux2, uy2 = rotate_point(radius - 25, 0.0, angle_rad)
-        x2 = center_x + ux2
-        y2 = center_y + uy2
-        dda_line(int(x1), int(y1), int(x2), int(y2))
-        
-        glColor3f(0.82, 0.82, 0.85)
-        ux_t, uy_t = rotate_point(radius - 40, 0.0, angle_rad)
-        x_text = center_x + ux_t
-        y_text = center_y + uy_t
-        draw_number(int(x_text), int(y_text), i)
-    
-    draw_needle_smooth(center_x, center_y, radius - 30, rpm, 0, 8)
-    
-    glColor3f(0.6, 0.15, 0.1)
+        set_color(0.82, 0.82, 0.85)
+        draw_number(x_text, y_text, i)
+
+def _draw_rpm_cap(center_x, center_y, radius):
+    set_color(0.6, 0.15, 0.1)
     draw_filled_circle(7, center_x, center_y)
-    glColor3f(0.75, 0.1, 0.1)
+    set_color(0.75, 0.1, 0.1)
     draw_filled_circle(4, center_x, center_y)
     
-    glColor3f(0.78, 0.78, 0.80)
-    glColor3f(0.82, 0.82, 0.85)
+    set_color(0.78, 0.78, 0.80)
+    set_color(0.82, 0.82, 0.85)
     draw_text(center_x - 35, center_y - 54, "RPM x1000")
 
 def draw_fuel_meter(center_x, center_y, radius, fuel_level):
-    glColor3f(0.1, 0.1, 0.1)
-    glLineWidth(3)
+    draw_cached_layer(("fuel_face", center_x, center_y, radius),
+                      _draw_fuel_face, center_x, center_y, radius)
+    draw_needle_smooth(center_x, center_y, radius - 30, fuel_level, 0, 100)
+    draw_cached_layer(("fuel_cap", center_x, center_y, radius),
+                      _draw_fuel_cap, center_x, center_y, radius)
+
+def _draw_fuel_face(center_x, center_y, radius):
+    set_color(0.1, 0.1, 0.1)
+    set_line_width(3)
     midpoint_circle(radius, center_x, center_y)
     
-    glColor3f(0.22, 0.24, 0.20)
-    for r in range(radius - 3, radius - 10, -1):
-        midpoint_circle(r, center_x, center_y)
+    set_color(0.22, 0.24, 0.20)
+    draw_ring(radius - 10, radius - 3, center_x, center_y)
     
-    glColor3f(0.45, 0.08, 0.08)  
+    set_color(0.45, 0.08, 0.08)  
     for fuel in range(0, 30, 5):
         angle_start = 225 - (fuel / 100.0) * 270
         angle_end = 225 - ((fuel + 5) / 100.0) * 270
         draw_arc_segment(center_x, center_y, radius - 12, angle_start, angle_end)
     
-    glLineWidth(2)
-    for i in range(0, 110, 25):
-        angle = 225 - (i / 100.0) * 270
-        angle_rad = math.radians(angle)
-        
-        glColor3f(0.75, 0.25, 0.25) if i < 25 else glColor3f(0.88, 0.88, 0.90)
-        glLineWidth(2.5)
-        
-        ux, uy = rotate_point(radius - 15, 0.0, angle_rad)
-        x1 = center_x + ux
-        y1 = center_y + uy
-        ux2, uy2 = rotate_point(radius - 25, 0.0, angle_rad)
-        x2 = center_x + ux2
-        y2 = center_y + uy2
-        dda_line(int(x1), int(y1), int(x2), int(y2))
+    set_line_width(2)
+    values = range(0, 110, 25)
+    angles = tuple(225 - (i / 100.0) * 270 for i in values)
+    ticks = tick_segments(center_x, center_y, radius - 15, radius - 25, angles).tolist()
+    for i, tick in zip(values, ticks):
+        set_color(0.75, 0.25, 0.25) if i < 25 else set_color(0.88, 0.88, 0.90)
+        set_line_width(2.5)
+        dda_line(*tick)
     
-    glColor3f(0.75, 0.25, 0.25)
+    set_color(0.75, 0.25, 0.25)
     draw_text(center_x - radius + 25, center_y - 10, "E")
-    glColor3f(0.15, 0.60, 0.30)  
+    set_color(0.15, 0.60, 0.30)  
     draw_text(center_x + radius - 40, center_y - 10, "F")
-    
-    draw_needle_smooth(center_x, center_y, radius - 30, fuel_level, 0, 100)
-    
-    glColor3f(0.6, 0.15, 0.1)
+
+def _draw_fuel_cap(center_x, center_y, radius):
+    set_color(0.6, 0.15, 0.1)
     draw_filled_circle(7, center_x, center_y)
-    glColor3f(0.75, 0.1, 0.1)
+    set_color(0.75, 0.1, 0.1)
     draw_filled_circle(4, center_x, center_y)
     
-    glColor3f(0.78, 0.78, 0.80)
+    set_color(0.78, 0.78, 0.80)
     draw_text(center_x - 20, center_y -40, "FUEL %")
-    glColor3f(0.82, 0.82, 0.85)
+    set_color(0.82, 0.82, 0.85)
+
+# Static layers of each gauge kind: (face under the needle, cap over it)
+GAUGE_LAYERS = {
+    "speedometer": (_draw_speedometer_face, _draw_speedometer_cap),
+    "rpm": (_draw_rpm_face, _draw_rpm_cap),
+    "fuel": (_draw_fuel_face, _draw_fuel_cap),
+}
 
 def draw_needle_smooth(cx, cy, length, value, min_val, max_val):
-    normalized = (value - min_val) / (max_val - min_val)
-    normalized = max(0, min(1, normalized))  # Clamp between 0 and 1
-    angle = 225 - normalized * 270  # 225° to -45°
-    angle_rad = math.radians(angle)
-    
-    ux_end, uy_end = rotate_point(length, 0.0, angle_rad)
+    angle = gauge_angle(value, min_val, max_val)  # 225° to -45°
+    ux_end, uy_end = lookup_polar(length, angle)
     x_end = cx + ux_end
     y_end = cy + uy_end
     
-    glColor3f(0.12, 0.08, 0.08)
-    glLineWidth(5)
-    dda_line(int(cx + 1), int(cy - 1), int(x_end + 1), int(y_end - 1))
+    # Shadow, body and highlight as anti-aliased strokes of real width
+    set_color(0.12, 0.08, 0.08)
+    draw_thick_line(cx + 1, cy - 1, x_end + 1, y_end - 1, 5)
     
-    glColor3f(0.85, 0.25, 0.0)
-    glLineWidth(4)
-    dda_line(int(cx), int(cy), int(x_end), int(y_end))
+    set_color(0.85, 0.25, 0.0)
+    draw_thick_line(cx, cy, x_end, y_end, 4)
     
     # Needle highlight (yellow)
-    glColor3f(1.0, 1.0, 0.0)
-    glLineWidth(2)
-    dda_line(int(cx), int(cy), int(x_end * 0.7 + cx * 0.3), int(y_end * 0.7 + cy * 0.3))
+    set_color(1.0, 1.0, 0.0)
+    draw_thick_line(cx, cy, x_end * 0.7 + cx * 0.3, y_end * 0.7 + cy * 0.3, 2)
 
 def draw_arc_segment(cx, cy, radius, angle_start, angle_end):
-    """Draw an arc segment (used for warning zones)"""
-    steps = 20
-    for i in range(steps):
-        t = i / steps
-        angle1 = angle_start + (angle_end - angle_start) * t
-        angle2 = angle_start + (angle_end - angle_start) * ((i + 1) / steps)
-        
-        angle1_rad = math.radians(angle1)
-        angle2_rad = math.radians(angle2)
-        
-        ux1, uy1 = rotate_point(radius, 0.0, angle1_rad)
-        x1 = cx + ux1
-        y1 = cy + uy1
-        ux2, uy2 = rotate_point(radius, 0.0, angle2_rad)
-        x2 = cx + ux2
-        y2 = cy + uy2
-        
-        dda_line(int(x1), int(y1), int(x2), int(y2))
+    """Draw an arc segment (used for warning zones); chords are cached per arc"""
+    dda_lines(*arc_segments(cx, cy, radius, angle_start, angle_end).T)
 
 def draw_digital_display(x, y, width, height, value, label=""):
     """Draw digital display box with enhanced styling"""
+    draw_digital_display_frame(x, y, width, height)
+    
+    # Value text (bright and large)
+    set_color(0.15, 0.30, 0.35)  # Dark blue-green
+    text = f"{int(value)}"
+    draw_text(x + 15, y + height // 2 - 8, text)
+    
+    # Label text (smaller)
+    set_color(0.50, 0.85, 0.90)  # Light cyan metallic
+    draw_text(x + width - 40, y + height // 2 - 8, label)
+
+def draw_digital_display_frame(x, y, width, height):
+    """Outer and inner border of a digital display box"""
     # Outer border
-    glColor3f(.42, .40, .35)
-    glLineWidth(3)
+    set_color(.42, .40, .35)
+    set_line_width(3)
     dda_line(x, y, x + width, y)
     dda_line(x + width, y, x + width, y + height)
     dda_line(x + width, y + height, x, y + height)
     dda_line(x, y + height, x, y)
     
     # Inner border for depth
-    glColor3f(.25, .30, .65)
-    glLineWidth(2)
+    set_color(.25, .30, .65)
+    set_line_width(2)
     dda_line(x + 2, y + 2, x + width - 2, y + 2)
     dda_line(x + width - 2, y + 2, x + width - 2, y + height - 2)
     dda_line(x + width - 2, y + height - 2, x + 2, y + height - 2)
     dda_line(x + 2, y + height - 2, x + 2, y + 2)
-    
-    # Value text (bright and large)
-    glColor3f(0.15, 0.30, 0.35)  # Dark blue-green
-    text = f"{int(value)}"
-    draw_text(x + 15, y + height // 2 - 8, text)
-    
-    # Label text (smaller)
-    glColor3f(0.50, 0.85, 0.90)  # Light cyan metallic
-    draw_text(x + width - 40, y + height // 2 - 8, label)
 
 def draw_indicator_light(x, y, radius, is_on, color):
     """Draw indicator LED light with glow effect"""
     if is_on:
         # Glow effect (larger, dimmer circle)
-        glColor3f(color[0] * 0.4, color[1] * 0.4, color[2] * 0.4)
-        draw_filled_circle(radius + 3, x, y)
+        set_color(color[0] * 0.4, color[1] * 0.4, color[2] * 0.4)
+        draw_disk(radius + 3, x, y)
         
         # Main LED
-        glColor3f(color[0], color[1], color[2])
-        draw_filled_circle(radius, x, y)
+        set_color(color[0], color[1], color[2])
+        draw_disk(radius, x, y)
         
         # Bright spot
-        glColor3f(1.0, 1.0, 1.0)
-        draw_filled_circle(radius // 3, x - 2, y + 2)
+        set_color(1.0, 1.0, 1.0)
+        draw_disk(radius // 3, x - 2, y + 2)
     else:
         # Off state - darker
-        glColor3f(0.15, 0.15, 0.15)
-        draw_filled_circle(radius, x, y)
+        set_color(0.15, 0.15, 0.15)
+        draw_disk(radius, x, y)
     
     # Outline
-    glColor3f(0.5, 0.5, 0.5) if is_on else glColor3f(0.18, 0.18, 0.20)
-    glLineWidth(2)
-    midpoint_circle(radius, x, y)
+    set_color(0.5, 0.5, 0.5) if is_on else set_color(0.18, 0.18, 0.20)
+    draw_ring(radius - 1, radius, x, y)
 
 def draw_turn_arrow(x, y, direction, is_on):
     """Draw turn signal arrow with enhanced styling (direction: 'left' or 'right')"""
     if is_on:
-        glColor3f(0.90, 0.15, 0.15)  # Metallic red
-        glLineWidth(4)
+        set_color(0.90, 0.15, 0.15)  # Metallic red
+        width = 4
     else:
-        glColor3f(0.15, 0.08, 0.08)  # Very dark red metallic
-        glLineWidth(2)
+        set_color(0.15, 0.08, 0.08)  # Very dark red metallic
+        width = 2
     
     if direction == 'left':
-        # Left arrow (thicker lines)
-        dda_line(x + 20, y, x, y + 10)
-        dda_line(x, y + 10, x + 20, y + 20)
-        dda_line(x, y + 10, x + 30, y + 10)
+        # Left arrow (thick strokes)
+        strokes = ((x + 20, y, x, y + 10), (x, y + 10, x + 20, y + 20), (x, y + 10, x + 30, y + 10))
     else:
-        # Right arrow (thicker lines)
-        dda_line(x, y, x + 20, y + 10)
-        dda_line(x + 20, y + 10, x, y + 20)
-        dda_line(x + 20, y + 10, x - 10, y + 10)
+        # Right arrow (thick strokes)
+        strokes = ((x, y, x + 20, y + 10), (x + 20, y + 10, x, y + 20), (x + 20, y + 10, x - 10, y + 10))
+    for stroke in strokes:
+        draw_thick_line(*stroke, width)
     
     # Add outline for better visibility when on
     if is_on:
-        glColor3f(0.70, 0.65, 0.15)  # Dark yellow metallic outline
-        glLineWidth(1)
+        set_color(0.70, 0.65, 0.15)  # Dark yellow metallic outline
         if direction == 'left':
-            dda_line(x + 22, y - 2, x - 2, y + 10)
-            dda_line(x - 2, y + 10, x + 22, y + 22)
-            dda_line(x - 2, y + 10, x + 32, y + 10)
+            outline = ((x + 22, y - 2, x - 2, y + 10), (x - 2, y + 10, x + 22, y + 22),
+                       (x - 2, y + 10, x + 32, y + 10))
         else:
-            dda_line(x + 2, y - 2, x + 22, y + 10)
-            dda_line(x + 22, y + 10, x + 2, y + 22)
-            dda_line(x + 22, y + 10, x - 8, y + 10)
+            outline = ((x + 2, y - 2, x + 22, y + 10), (x + 22, y + 10, x + 2, y + 22),
+                       (x + 22, y + 10, x - 8, y + 10))
+        for stroke in outline:
+            draw_thick_line(*stroke, 1)
 
 def draw_text(x, y, text):
     """Draw text at position (x, y)"""
-    glRasterPos2f(x, y)
-    for char in text:
-        glutBitmapCharacter(GLUT_BITMAP_HELVETICA_12, ord(char))
+    framebuffer = get_framebuffer()
+    if framebuffer is not None:
+        framebuffer.draw_text(x, y, text, get_color())
+        return
+    flush_points()
+    draw_string(x, y, text)
 
 def draw_number(x, y, number):
     """Draw number at position (x, y)"""
     text = str(number)
-    glRasterPos2f(x - len(text) * 3, y)
-    for char in text:
-        glutBitmapCharacter(GLUT_BITMAP_HELVETICA_12, ord(char))
\ No newline at end of file
+    draw_text(x - len(text) * 3, y, text)
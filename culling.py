@@ -0,0 +1,106 @@
+"""
+culling.py - View-frustum, distance and level-of-detail culling for the 3D scene
+Sits between the entity stores and the scene draw calls: every frame each
+entity type is tested as a bounding sphere against the gluPerspective
+camera, split into near (full detail) and far (reduced detail) index sets,
+and the drawn/culled counts are recorded for reporting.
+"""
+
+import math
+import numpy as np
+
+FOV_Y = 60.0
+NEAR_PLANE = 0.1
+VIEW_DISTANCE = 500.0
+TREE_LOD_DISTANCE = 300.0
+CLOUD_LOD_DISTANCE = 250.0
+CLOUD_LOD_SEGMENTS = 10
+
+_view_distance = VIEW_DISTANCE
+_lod_enabled = True
+_stats = {}
+
+
+def set_view_distance(distance):
+    """How far ahead of the camera the scene is populated and drawn"""
+    global _view_distance
+    if distance <= NEAR_PLANE:
+        raise ValueError(f"view distance must exceed the near plane: {distance!r}")
+    _view_distance = float(distance)
+
+
+def get_view_distance():
+    return _view_distance
+
+
+def set_lod(enabled):
+    """Draw everything at full detail (False) or switch far objects to LOD meshes"""
+    global _lod_enabled
+    _lod_enabled = enabled
+
+
+def lod_enabled():
+    return _lod_enabled
+
+
+class Frustum:
+    """Symmetric perspective frustum of a camera looking down +z.
+
+    Matches gluPerspective(fov_y, aspect, near, far) combined with
+    gluLookAt(eye_x, eye_y, eye_z, eye_x, eye_y, eye_z + 100, 0, 1, 0).
+    """
+
+    def __init__(self, eye_x, eye_y, eye_z, aspect, fov_y=FOV_Y, near=NEAR_PLANE, far=VIEW_DISTANCE):
+        self.eye_x = eye_x
+        self.eye_y = eye_y
+        self.eye_z = eye_z
+        self.near = near
+        self.far = far
+        self.tan_y = math.tan(math.radians(fov_y) / 2)
+        self.tan_x = self.tan_y * aspect
+        # Side planes tested as |offset| - depth * tan <= radius * |plane normal|
+        self.secant_x = math.sqrt(1 + self.tan_x * self.tan_x)
+        self.secant_y = math.sqrt(1 + self.tan_y * self.tan_y)
+
+    def depth(self, z):
+        return z - self.eye_z
+
+    def sphere_mask(self, x, y, z, radius):
+        """Boolean mask of spheres that intersect the frustum"""
+        depth = z - self.eye_z
+        mask = (depth + radius > self.near) & (depth - radius < self.far)
+        mask &= np.abs(x - self.eye_x) - depth * self.tan_x <= radius * self.secant_x
+        mask &= np.abs(y - self.eye_y) - depth * self.tan_y <= radius * self.secant_y
+        return mask
+
+
+def cull(frustum, name, x, y, z, radius, lod_distance=None):
+    """Split entities into (near, far) index arrays of visible spheres.
+
+    far is empty when lod_distance is None or LOD is disabled. The counts
+    are recorded under name for cull_stats().
+    """
+    mask = frustum.sphere_mask(x, y, z, radius)
+    visible = np.flatnonzero(mask)
+    if lod_distance is None or not _lod_enabled:
+        near, far = visible, visible[:0]
+    else:
+        is_far = frustum.depth(np.broadcast_to(z, mask.shape)[visible]) > lod_distance
+        near, far = visible[~is_far], visible[is_far]
+    _stats[name] = {"drawn": len(near), "lod": len(far), "culled": mask.size - len(visible)}
+    return near, far
+
+
+def reset_cull_stats():
+    _stats.clear()
+
+
+def cull_stats():
+    """Per-type {'drawn', 'lod', 'culled'} counts from the most recent frame"""
+    return {name: dict(counts) for name, counts in _stats.items()}
+
+
+def format_cull_stats(stats=None):
+    stats = cull_stats() if stats is None else stats
+    return "  ".join(f"{name}: {c['drawn']}+{c['lod']} drawn, {c['culled']} culled"
+                     for name, c in stats.items())
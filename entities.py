@@ -0,0 +1,213 @@
+"""
+entities.py - Structure-of-arrays storage for trees, clouds and oncoming cars
+Each EntityStore keeps one NumPy column per attribute plus an alive mask, so
+the per-step world update (move, spawn, despawn) is a handful of vectorized
+operations on preallocated arrays instead of rebuilding lists of dicts.
+"""
+
+import itertools
+import math
+import numpy as np
+
+TREE_TYPES = ("pine", "round")
+
+TREE_COLUMNS = {"x": np.float64, "z": np.float64, "height": np.float64, "type": np.int8}
+CLOUD_COLUMNS = {"x": np.float64, "y": np.float64, "z": np.float64,
+                 "size": np.float64, "speed": np.float64}
+CAR_COLUMNS = {"x": np.float64, "z": np.float64, "color": (np.float64, 3)}
+HOUSE_COLUMNS = {"x": np.float64, "z": np.float64}
+
+SEGMENT_LENGTH = 50.0   # road segment covered by one ZIndex bucket
+
+
+class EntityStore:
+    """Fixed-capacity pool of entities stored column by column.
+
+    columns maps a name to a dtype, or to (dtype, width) for vector columns
+    such as colors. Dead slots are recycled through a free-slot stack, and
+    the pool doubles in size when it runs out. Entities are removed by
+    slot through release(), which ZIndex.despawn_behind() drives.
+    """
+
+    def __init__(self, columns, capacity=64):
+        self.column_specs = dict(columns)
+        self.capacity = 0
+        self.count = 0
+        self.alive = np.zeros(0, dtype=bool)
+        self.columns = {}
+        self._free = np.zeros(0, dtype=np.intp)
+        self._free_top = 0
+        self._mask = np.zeros(0, dtype=bool)
+        self._scratch = np.zeros(0, dtype=np.float64)
+        self._indices = None
+        self._grow(max(1, capacity))
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __len__(self):
+        return self.count
+
+    def _grow(self, capacity):
+        old = self.capacity
+        for name, spec in self.column_specs.items():
+            dtype, shape = (spec[0], (capacity, spec[1])) if isinstance(spec, tuple) else (spec, capacity)
+            column = np.zeros(shape, dtype=dtype)
+            if old:
+                column[:old] = self.columns[name]
+            self.columns[name] = column
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:old] = self.alive
+        self.alive = alive
+
+        # New slots go under the existing free ones, lowest index on top
+        free = np.empty(capacity, dtype=np.intp)
+        free[:capacity - old] = np.arange(capacity - 1, old - 1, -1)
+        free[capacity - old:capacity - old + self._free_top] = self._free[:self._free_top]
+        self._free = free
+        self._free_top += capacity - old
+
+        self._mask = np.zeros(capacity, dtype=bool)
+        self._scratch = np.zeros(capacity, dtype=np.float64)
+        self.capacity = capacity
+
+    def spawn(self, **values):
+        """Add one entity, or several if the values are equal-length arrays.
+
+        Returns the slot index (or array of slot indices) used.
+        """
+        many = any(np.ndim(value) > (1 if isinstance(self.column_specs[name], tuple) else 0)
+                   for name, value in values.items())
+        n = len(next(iter(values.values()))) if many else 1
+        if self._free_top < n:
+            capacity = self.capacity
+            while capacity - self.count < n:
+                capacity *= 2
+            self._grow(capacity)
+
+        self._free_top -= n
+        slots = self._free[self._free_top:self._free_top + n][::-1].copy() if many \
+            else self._free[self._free_top]
+        for name, value in values.items():
+            self.columns[name][slots] = value
+        self.alive[slots] = True
+        self.count += n
+        self._indices = None
+        return slots
+
+    def release(self, slots):
+        """Remove the live entities in slots (an index array); returns how many"""
+        if len(slots) == 0:
+            return 0
+        self.alive[slots] = False
+        self._free[self._free_top:self._free_top + len(slots)] = slots[::-1]
+        self._free_top += len(slots)
+        self.count -= len(slots)
+        self._indices = None
+        return len(slots)
+
+    def indices(self):
+        """Live slot indices in slot order; cached until the next spawn/despawn"""
+        if self._indices is None:
+            self._indices = np.flatnonzero(self.alive)
+        return self._indices
+
+    def clear(self):
+        self.alive[:] = False
+        self._free[:self.capacity] = np.arange(self.capacity - 1, -1, -1)
+        self._free_top = self.capacity
+        self.count = 0
+        self._indices = None
+
+
+def advance_column(store, name, rate, dt):
+    """column += rate * dt in place; rate is a scalar or a column name"""
+    column = store.columns[name]
+    if isinstance(rate, str):
+        np.multiply(store.columns[rate], dt, out=store._scratch)
+        column += store._scratch
+    else:
+        column += rate * dt
+
+
+def wrap_column(store, name, high, low):
+    """Send every value above high back to low, in place"""
+    column = store.columns[name]
+    np.greater(column, high, out=store._mask)
+    np.copyto(column, low, where=store._mask)
+
+
+class ZIndex:
+    """Spatial index over an EntityStore, bucketed by z into road segments.
+
+    Window queries touch only the segments they overlap, so they cost
+    O(visible), and despawning behind the camera drops whole segments from
+    the front, O(1) amortized per entity. Stores whose entities all move
+    along z at the same rate (oncoming cars) call drift() instead of
+    re-bucketing: buckets are keyed on z minus the accumulated drift.
+    Only entities added through insert() are indexed, and they must be
+    removed through despawn_behind() so no bucket holds a recycled slot.
+    """
+
+    def __init__(self, store, segment_length=SEGMENT_LENGTH):
+        self.store = store
+        self.segment_length = segment_length
+        self.offset = 0.0
+        self.buckets = {}
+        self.first = 0
+        self.last = -1
+
+    def __len__(self):
+        return sum(len(bucket) for bucket in self.buckets.values())
+
+    def _segment(self, z):
+        return math.floor((z - self.offset) / self.segment_length)
+
+    def insert(self, slots):
+        """Index freshly spawned slots (one index or an array) by their z"""
+        slots = np.atleast_1d(slots)
+        for slot, z in zip(slots.tolist(), self.store.columns["z"][slots].tolist()):
+            segment = self._segment(z)
+            if not self.buckets:
+                self.first = self.last = segment
+            self.first = min(self.first, segment)
+            self.last = max(self.last, segment)
+            self.buckets.setdefault(segment, []).append(slot)
+        return slots
+
+    def spawn(self, **values):
+        """EntityStore.spawn followed by insert"""
+        return self.insert(self.store.spawn(**values))
+
+    def drift(self, dz):
+        """Record that every indexed entity moved by dz along z"""
+        self.offset += dz
+
+    def query(self, z_min, z_max):
+        """Live slots with z_min <= z < z_max, in ascending segment order"""
+        first = max(self._segment(z_min), self.first)
+        last = min(self._segment(z_max), self.last)
+        candidates = itertools.chain.from_iterable(
+            self.buckets.get(segment, ()) for segment in range(first, last + 1))
+        slots = np.fromiter(candidates, dtype=np.intp)
+        z = self.store.columns["z"][slots]
+        return slots[(z >= z_min) & (z < z_max)]
+
+    def despawn_behind(self, limit):
+        """Despawn every segment lying entirely below limit; returns how many entities"""
+        removed = 0
+        end = self._segment(limit)
+        while self.buckets and self.first < end:
+            bucket = self.buckets.pop(self.first, None)
+            if bucket:
+                removed += self.store.release(np.array(bucket, dtype=np.intp))
+            self.first += 1
+        if not self.buckets:
+            self.first, self.last = 0, -1
+        return removed
+
+    def clear(self):
+        for bucket in self.buckets.values():
+            self.store.release(np.array(bucket, dtype=np.intp))
+        self.buckets.clear()
+        self.first, self.last = 0, -1
@@ -0,0 +1,430 @@
+"""
+glrecord.py - Recording stand-in for PyOpenGL's GL, GLU and GLUT modules
+install() puts shim modules in sys.modules under OpenGL.GL, OpenGL.GLU and
+OpenGL.GLUT, so the drawing modules imported afterwards run without any
+display or GPU. Every gl*/glu*/glut* call is appended to a CallLog: one
+name id per call in an array, numeric arguments in a flat float array
+(arrays, buffers and strings are recorded by length). Calls that must
+return something (object names, framebuffer status, pixels) get
+plausible values.
+
+A log has per-function counts and a vertex total, and saves as one call per
+line, so two recordings can be compared with diff or with diff_logs().
+
+Usage:
+    python glrecord.py record overlay overlay.glog --max-vertices 40000
+    python glrecord.py record frame frame.glog
+    python glrecord.py summary overlay.glog
+    python glrecord.py diff before.glog after.glog
+"""
+
+import array
+import collections
+import difflib
+import os
+import re
+import sys
+import types
+import zlib
+
+LOG_HEADER = "# glrecord 1"
+SHIM_MODULES = ("GL", "GLU", "GLUT")
+PREFIXES = {"GL": ("gl", "GL_"), "GLU": ("glu", "GLU_"), "GLUT": ("glut", "GLUT_")}
+ARG_NUMBER, ARG_SIZED, ARG_OTHER = 0, 1, 2
+DRAW_CALLS = ("glBegin", "glDrawArrays", "glDrawArraysInstanced", "glDrawElements",
+              "glDrawElementsInstanced", "glCallList", "glBitmap", "glutBitmapCharacter")
+_GL_NAME = re.compile(r"\b(?:glut|glu|gl)[A-Z]\w*|\bGL(?:UT|U)?_[A-Z0-9_]+")
+
+_installed = None          # (previous sys.modules entries, log) while installed
+
+
+class CallLog:
+    """Array-backed stream of recorded calls"""
+
+    def __init__(self):
+        self.names = []                      # name table; calls store indexes into it
+        self._ids = {}
+        self.calls = array.array("H")
+        self.starts = array.array("I", [0])  # args of call i: args[starts[i]:starts[i + 1]]
+        self.args = array.array("d")
+        self.kinds = array.array("B")        # ARG_NUMBER, ARG_SIZED (value = length) or ARG_OTHER
+
+    def __len__(self):
+        return len(self.calls)
+
+    def name_id(self, name):
+        index = self._ids.get(name)
+        if index is None:
+            index = self._ids[name] = len(self.names)
+            self.names.append(name)
+        return index
+
+    def record(self, index, arguments):
+        self.calls.append(index)
+        args = self.args
+        kinds = self.kinds
+        for value in arguments:
+            if isinstance(value, (int, float)):
+                args.append(value)
+                kinds.append(ARG_NUMBER)
+            elif hasattr(value, "__len__"):
+                args.append(len(value))
+                kinds.append(ARG_SIZED)
+            else:
+                value = getattr(value, "value", value)   # ctypes scalars and pointers
+                try:
+                    args.append(float(value))
+                    kinds.append(ARG_NUMBER)
+                except (TypeError, ValueError):
+                    args.append(0)
+                    kinds.append(ARG_OTHER)
+        self.starts.append(len(args))
+
+    def clear(self):
+        del self.calls[:]
+        del self.args[:]
+        del self.kinds[:]
+        del self.starts[1:]
+
+    def entries(self):
+        """Yield (name, args, kinds) per call"""
+        for i, index in enumerate(self.calls):
+            start, end = self.starts[i], self.starts[i + 1]
+            yield self.names[index], self.args[start:end], self.kinds[start:end]
+
+    def counts(self):
+        """Calls per function name, most frequent first"""
+        tally = collections.Counter()
+        for index, count in collections.Counter(self.calls).items():
+            tally[self.names[index]] = count
+        return dict(tally.most_common())
+
+    def vertex_count(self):
+        """Vertices submitted: one per glVertex*, plus glDraw* counts (times instances)"""
+        total = 0
+        for name, args, _ in self.entries():
+            if name.startswith("glVertex") and not name.startswith("glVertexA") and name != "glVertexPointer":
+                total += 1
+            elif name == "glDrawArrays":
+                total += int(args[2])
+            elif name == "glDrawArraysInstanced":
+                total += int(args[2]) * int(args[3])
+            elif name == "glDrawElements":
+                total += int(args[1])
+            elif name == "glDrawElementsInstanced":
+                total += int(args[1]) * int(args[4])
+        return total
+
+    def draw_calls(self):
+        """glBegin blocks, glDraw*, display lists and bitmap glyphs"""
+        counts = self.counts()
+        return sum(counts.get(name, 0) for name in DRAW_CALLS)
+
+    def summary(self):
+        return {"calls": len(self), "draw_calls": self.draw_calls(),
+                "vertices": self.vertex_count(), "counts": self.counts()}
+
+    def lines(self):
+        """One text line per call: name then arguments (<n> = sized, ? = opaque)"""
+        for name, args, kinds in self.entries():
+            words = [name]
+            for value, kind in zip(args, kinds):
+                if kind == ARG_SIZED:
+                    words.append(f"<{int(value)}>")
+                elif kind == ARG_OTHER:
+                    words.append("?")
+                else:
+                    words.append(_format_number(value))
+            yield " ".join(words)
+
+    def save(self, path):
+        with open(path, "w") as handle:
+            handle.write(LOG_HEADER + "\n")
+            for line in self.lines():
+                handle.write(line + "\n")
+
+    @classmethod
+    def load(cls, path):
+        log = cls()
+        with open(path) as handle:
+            if handle.readline().rstrip("\n") != LOG_HEADER:
+                raise ValueError(f"not a glrecord log: {path}")
+            for line in handle:
+                name, *words = line.split()
+                log.calls.append(log.name_id(name))
+                for word in words:
+                    if word == "?":
+                        log.args.append(0)
+                        log.kinds.append(ARG_OTHER)
+                    elif word.startswith("<"):
+                        log.args.append(int(word[1:-1]))
+                        log.kinds.append(ARG_SIZED)
+                    else:
+                        log.args.append(float(word))
+                        log.kinds.append(ARG_NUMBER)
+                log.starts.append(len(log.args))
+        return log
+
+
+def _format_number(value):
+    if value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return format(value, ".9g")
+
+
+def diff_logs(before, after, context=3):
+    """Count changes per function, then a unified diff of the call streams"""
+    old, new = before.counts(), after.counts()
+    lines = [f"calls {len(before)} -> {len(after)}, vertices {before.vertex_count()} -> "
+             f"{after.vertex_count()}, draw calls {before.draw_calls()} -> {after.draw_calls()}"]
+    for name in sorted(set(old) | set(new)):
+        if old.get(name, 0) != new.get(name, 0):
+            lines.append(f"  {name}: {old.get(name, 0)} -> {new.get(name, 0)}")
+    lines.extend(line.rstrip("\n") for line in difflib.unified_diff(
+        list(before.lines()), list(after.lines()), "before", "after", n=context, lineterm=""))
+    return lines
+
+
+def _harvest_names():
+    """{module: (function names, {constant: value})} from PyOpenGL, else from the project sources"""
+    harvested = {}
+    try:
+        import OpenGL.GL, OpenGL.GLU, OpenGL.GLUT
+        real = {"GL": OpenGL.GL, "GLU": OpenGL.GLU, "GLUT": OpenGL.GLUT}
+    except ImportError:
+        real = None
+    if real is not None:
+        for key, module in real.items():
+            function_prefix, constant_prefix = PREFIXES[key]
+            names = [name for name in dir(module) if _module_of(name) == key]
+            functions = [name for name in names
+                         if name.startswith(function_prefix) and callable(getattr(module, name))]
+            constants = {}
+            for name in names:
+                if name.startswith(constant_prefix):
+                    value = getattr(module, name)
+                    constants[name] = int(value) if isinstance(value, int) else _stable_value(name)
+            harvested[key] = (functions, constants)
+        return harvested
+
+    directory = os.path.dirname(os.path.abspath(__file__))
+    found = set()
+    for filename in os.listdir(directory):
+        if filename.endswith(".py"):
+            with open(os.path.join(directory, filename), encoding="utf-8") as handle:
+                found.update(_GL_NAME.findall(handle.read()))
+    for key in SHIM_MODULES:
+        function_prefix, constant_prefix = PREFIXES[key]
+        functions = [name for name in found if name.startswith(function_prefix)
+                     and _module_of(name) == key]
+        constants = {name: _stable_value(name) for name in found
+                     if name.startswith(constant_prefix) and _module_of(name) == key}
+        harvested[key] = (functions, constants)
+    return harvested
+
+
+def _module_of(name):
+    if name.startswith(("glut", "GLUT_")):
+        return "GLUT"
+    if name.startswith(("glu", "GLU_")):
+        return "GLU"
+    return "GL"
+
+
+def _stable_value(name):
+    return 0x40000 + zlib.crc32(name.encode()) % 0x100000
+
+
+def _results(constants):
+    """Return-value makers for the calls whose results the project uses"""
+    counter = [0]
+
+    def new_names(*args):
+        count = int(args[0]) if args else 1
+        names = list(range(counter[0] + 1, counter[0] + count + 1))
+        counter[0] += count
+        return names[0] if count == 1 else names
+
+    def new_name(*args):
+        counter[0] += 1
+        return counter[0]
+
+    channels = {constants.get("GL_RGB"): 3, constants.get("GL_RGBA"): 4}
+
+    def read_pixels(x, y, width, height, pixel_format, *rest):
+        return bytes(int(width) * int(height) * channels.get(pixel_format, 1))
+
+    complete = constants.get("GL_FRAMEBUFFER_COMPLETE", 1)
+    return {
+        "glGenLists": new_names, "glGenTextures": new_names, "glGenFramebuffers": new_names,
+        "glGenRenderbuffers": new_names, "glGenBuffers": new_names,
+        "glCreateShader": new_name, "glCreateProgram": new_name, "glutCreateWindow": new_name,
+        "glCheckFramebufferStatus": lambda *args: complete,
+        "glGetIntegerv": lambda *args: 0,
+        "glGetFloatv": lambda *args: (0.0, 0.0, 0.0, 0.0),
+        "glGetShaderiv": lambda *args: 1,
+        "glGetProgramiv": lambda *args: 1,
+        "glGetUniformLocation": lambda *args: 0,
+        "glGetAttribLocation": lambda *args: 0,
+        "glGetError": lambda *args: 0,
+        "glGetString": lambda *args: b"glrecord",
+        "glIsList": lambda *args: True,
+        "glReadPixels": read_pixels,
+        "glutBitmapWidth": lambda *args: 7,
+        "glutGet": lambda *args: 0,
+    }
+
+
+def _recorder(log, name, result):
+    index = log.name_id(name)
+    record = log.record
+    if result is None:
+        def recorded(*args):
+            record(index, args)
+    else:
+        def recorded(*args):
+            record(index, args)
+            return result(*args)
+    recorded.__name__ = name
+    return recorded
+
+
+def make_modules(log):
+    """{"GL": module, "GLU": module, "GLUT": module} recording into log"""
+    harvested = _harvest_names()
+    all_constants = {}
+    for _, constants in harvested.values():
+        all_constants.update(constants)
+    results = _results(all_constants)
+    modules = {}
+    for key in SHIM_MODULES:
+        functions, constants = harvested[key]
+        module = types.ModuleType(f"OpenGL.{key}", f"glrecord shim for OpenGL.{key}")
+        for name, value in constants.items():
+            setattr(module, name, value)
+        for name in functions:
+            setattr(module, name, _recorder(log, name, results.get(name)))
+        module.__all__ = sorted(constants) + sorted(functions)
+        modules[key] = module
+    return modules
+
+
+def install(log=None):
+    """Swap the shim in for OpenGL.GL/GLU/GLUT; returns the CallLog being recorded.
+
+    Must run before the drawing modules are imported (they bind the GL
+    functions at import time).
+    """
+    global _installed
+    if _installed is not None:
+        return _installed[1]
+    drawing = [name for name in ("algorithms", "components", "scene", "main") if name in sys.modules]
+    if drawing:
+        raise RuntimeError(f"install() must run before importing {', '.join(drawing)}")
+    log = CallLog() if log is None else log
+    modules = make_modules(log)
+    names = ["OpenGL"] + [f"OpenGL.{key}" for key in SHIM_MODULES]
+    previous = {name: sys.modules.get(name) for name in names}
+    package = types.ModuleType("OpenGL", "glrecord shim package")
+    package.__path__ = []
+    for key, module in modules.items():
+        setattr(package, key, module)
+        sys.modules[f"OpenGL.{key}"] = module
+    sys.modules["OpenGL"] = package
+    _installed = (previous, log)
+    return log
+
+
+def uninstall():
+    """Restore the real OpenGL modules (already imported drawing modules keep the shim)"""
+    global _installed
+    if _installed is None:
+        return
+    previous, _ = _installed
+    for name, module in previous.items():
+        if module is None:
+            sys.modules.pop(name, None)
+        else:
+            sys.modules[name] = module
+    _installed = None
+
+
+def record_dashboard(target="overlay", frames=2):
+    """Record the last of frames dashboard frames; returns the CallLog.
+
+    target "overlay" records a full overlay redraw (panel, frame, gauges,
+    readouts); "frame" records main.render_frame() with the default caches.
+    """
+    log = install()
+    import random
+    import text_atlas
+    import main as dashboard
+
+    text_atlas.set_glut_text(False)
+    random.seed(0)
+    dashboard.world.reset(0)
+    dashboard.clock = lambda: 0.0
+    dashboard.initialize()
+    dashboard.keys_pressed["up"] = True
+    draw = dashboard.draw_overlay_widgets if target == "overlay" else dashboard.render_frame
+    for _ in range(frames):
+        dashboard.advance_simulation(0.016)
+        dashboard.update_gauges()
+        log.clear()
+        draw()
+    return log
+
+
+def format_summary(summary, limit=15):
+    lines = [f"{summary['calls']} calls, {summary['draw_calls']} draw calls, "
+             f"{summary['vertices']} vertices"]
+    for name, count in list(summary["counts"].items())[:limit]:
+        lines.append(f"  {name:<28}{count:8d}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Record and compare dashboard GL call streams")
+    commands = parser.add_subparsers(dest="command", required=True)
+    record = commands.add_parser("record", help="record one frame without a display")
+    record.add_argument("target", choices=("overlay", "frame"))
+    record.add_argument("output", nargs="?", help="save the call log here")
+    record.add_argument("--frames", type=int, default=2,
+                        help="simulated frames; the last is recorded (the first also compiles caches)")
+    record.add_argument("--max-vertices", type=int, help="fail if the frame submits more vertices")
+    record.add_argument("--max-draw-calls", type=int, help="fail if the frame issues more draw calls")
+    summary = commands.add_parser("summary", help="counts of a saved log")
+    summary.add_argument("log")
+    compare = commands.add_parser("diff", help="compare two saved logs")
+    compare.add_argument("before")
+    compare.add_argument("after")
+    compare.add_argument("--context", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    if args.command == "summary":
+        print(format_summary(CallLog.load(args.log).summary()))
+        return 0
+    if args.command == "diff":
+        lines = diff_logs(CallLog.load(args.before), CallLog.load(args.after), args.context)
+        print("\n".join(lines))
+        return 0 if len(lines) == 1 else 1
+
+    log = record_dashboard(args.target, args.frames)
+    result = log.summary()
+    print(format_summary(result))
+    if args.output:
+        log.save(args.output)
+    failed = []
+    if args.max_vertices is not None and result["vertices"] > args.max_vertices:
+        failed.append(f"{result['vertices']} vertices > {args.max_vertices}")
+    if args.max_draw_calls is not None and result["draw_calls"] > args.max_draw_calls:
+        failed.append(f"{result['draw_calls']} draw calls > {args.max_draw_calls}")
+    if failed:
+        print("budget exceeded: " + ", ".join(failed))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
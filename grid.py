@@ -0,0 +1,524 @@
+"""
+grid.py - Multi-dashboard grid mode: N instrument clusters per frame
+Each Dashboard owns one vehicle's telemetry state; GridRenderer lays N of
+them out in a grid. The static parts of a cluster (panel, bezels, ticks,
+caps, labels and the lit turn/fuel sprites) are rendered once into one
+shared texture, so every frame is a batch of textured quads for all the
+faces, one anti-aliased stroke draw for all the needles and one
+glyph batch for all the digital readouts, whatever the number of clusters.
+
+Usage:
+    python grid.py --count 64
+    python headless.py --grid 64          # offscreen frame-time benchmark
+"""
+
+import math
+import random
+import time
+import numpy as np
+from OpenGL.GL import *
+from OpenGL.GLUT import *
+from components import *
+from angle_table import GAUGE_START_ANGLE, GAUGE_SWEEP, lookup_polar
+from layout import *
+from simulation import VehicleState, FixedTimestep, SIM_DT, MAX_FRAME_TIME
+from text_atlas import build_glyph_atlas, draw_atlas_text_batch
+
+GAUGE_DRAW = {"speedometer": draw_speedometer, "rpm": draw_rpm_meter, "fuel": draw_fuel_meter}
+
+# Needle strokes: (color, offset from the hub, fraction of the needle length, width)
+NEEDLE_STROKES = (
+    ((0.12, 0.08, 0.08), (1, -1), 1.0, 5),
+    ((0.85, 0.25, 0.0), (0, 0), 1.0, 4),
+    ((1.0, 1.0, 0.0), (0, 0), 0.7, 2),
+)
+
+# Shared texture layers, stacked vertically with a gap so mipmaps do not bleed
+FACE, CAPS, LIT = range(3)
+LAYER_GAP = 16
+
+
+def gauge_values(vehicle):
+    return vehicle.speed, vehicle.rpm, vehicle.fuel_level
+
+
+class Dashboard:
+    """One instrument cluster: a vehicle's state plus its lit turn signals"""
+
+    def __init__(self, vehicle=None):
+        self.vehicle = VehicleState() if vehicle is None else vehicle
+        self.previous = self.vehicle.copy()
+        self.left_signal = False
+        self.right_signal = False
+
+    def view(self, alpha=1.0):
+        """The displayed state, alpha of the way from the previous step to the current one"""
+        if alpha >= 1.0:
+            return self.vehicle
+        return self.previous.interpolate(self.vehicle, alpha)
+
+    def draw(self, alpha=1.0):
+        """The whole cluster at its native coordinates through the component functions"""
+        vehicle = self.view(alpha)
+        draw_cluster_background()
+        for (kind, cx, cy, radius, _), value in zip(GAUGES, gauge_values(vehicle)):
+            GAUGE_DRAW[kind](cx, cy, radius, value)
+        draw_digital_display(*SPEED_DISPLAY[:4], vehicle.speed, SPEED_DISPLAY[4])
+        draw_digital_display(*TEMP_DISPLAY[:4], vehicle.engine_temp, TEMP_DISPLAY[4])
+        draw_turn_arrow(*LEFT_ARROW, 'left', self.left_signal)
+        draw_turn_arrow(*RIGHT_ARROW, 'right', self.right_signal)
+        draw_indicator_light(*FUEL_LIGHT, vehicle.fuel_warning, (1.0, 0.0, 0.0))
+        flush_points()
+
+
+def draw_cluster_background():
+    x0, _, x1, _ = CLUSTER_RECT
+    set_color(0.1, 0.1, 0.1)
+    fill_rect(x0, 0, x1, PANEL_HEIGHT)
+    set_color(0.75, 0.75, 0.78)
+    draw_half_circle_frame(*FRAME, thickness=FRAME_THICKNESS)
+
+
+def _draw_face_layer():
+    """Everything under the needles that does not depend on the vehicle"""
+    draw_cluster_background()
+    for kind, cx, cy, radius, _ in GAUGES:
+        GAUGE_LAYERS[kind][0](cx, cy, radius)
+    for x, y, width, height, label in (SPEED_DISPLAY, TEMP_DISPLAY):
+        draw_digital_display_frame(x, y, width, height)
+        set_color(0.50, 0.85, 0.90)
+        draw_text(x + width - 40, y + height // 2 - 8, label)
+    draw_turn_arrow(*LEFT_ARROW, 'left', False)
+    draw_turn_arrow(*RIGHT_ARROW, 'right', False)
+    draw_indicator_light(*FUEL_LIGHT, False, (1.0, 0.0, 0.0))
+
+
+def _draw_cap_layer():
+    for kind, cx, cy, radius, _ in GAUGES:
+        GAUGE_LAYERS[kind][1](cx, cy, radius)
+
+
+def _draw_lit_layer():
+    draw_turn_arrow(*LEFT_ARROW, 'left', True)
+    draw_turn_arrow(*RIGHT_ARROW, 'right', True)
+    draw_indicator_light(*FUEL_LIGHT, True, (1.0, 0.0, 0.0))
+
+
+def grid_shape(count, width, height):
+    """(columns, rows) for count clusters that gives the largest cells"""
+    cluster_w = CLUSTER_RECT[2] - CLUSTER_RECT[0]
+    cluster_h = CLUSTER_RECT[3] - CLUSTER_RECT[1]
+    best = None
+    for columns in range(1, max(1, count) + 1):
+        rows = math.ceil(count / columns)
+        scale = min(width / (columns * cluster_w), height / (rows * cluster_h))
+        if best is None or scale > best[0]:
+            best = (scale, columns, rows)
+    return best[1], best[2]
+
+
+def _create_render_texture(width, height, min_filter):
+    """(framebuffer, texture) of an RGBA8 render target, or None without FBOs"""
+    try:
+        framebuffer = glGenFramebuffers(1)
+    except Exception:
+        return None
+    texture = glGenTextures(1)
+    glBindTexture(GL_TEXTURE_2D, texture)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, min_filter)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
+    glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA8, width, height, 0, GL_RGBA, GL_UNSIGNED_BYTE, None)
+    glBindTexture(GL_TEXTURE_2D, 0)
+
+    previous = glGetIntegerv(GL_FRAMEBUFFER_BINDING)
+    glBindFramebuffer(GL_FRAMEBUFFER, framebuffer)
+    glFramebufferTexture2D(GL_FRAMEBUFFER, GL_COLOR_ATTACHMENT0, GL_TEXTURE_2D, texture, 0)
+    complete = glCheckFramebufferStatus(GL_FRAMEBUFFER) == GL_FRAMEBUFFER_COMPLETE
+    glBindFramebuffer(GL_FRAMEBUFFER, previous)
+    if not complete:
+        glDeleteFramebuffers(1, [framebuffer])
+        glDeleteTextures([texture])
+        return None
+    return framebuffer, texture
+
+
+class GridRenderer:
+    """Draws a list of Dashboards as a grid filling a width x height target.
+
+    The shared cluster texture is built on the first draw. Faces do not
+    change, so all of them are composited once per layout into a
+    background the size of the target, which each frame starts by
+    blitting; only needles, hub caps, lit sprites and readouts are drawn
+    per frame. Without framebuffer objects every cluster is drawn through
+    Dashboard.draw instead.
+    """
+
+    def __init__(self, dashboards, width, height, columns=None):
+        self.dashboards = dashboards
+        self.columns = columns
+        self.texture = None
+        self.cap_rects = ()
+        self.background = None
+        self.available = True
+        self.layout(width, height)
+
+    def layout(self, width, height):
+        """Place the clusters in a grid of equal cells, top row first"""
+        self.width = width
+        self.height = height
+        count = len(self.dashboards)
+        cluster_w = CLUSTER_RECT[2] - CLUSTER_RECT[0]
+        cluster_h = CLUSTER_RECT[3] - CLUSTER_RECT[1]
+        if self.columns:
+            columns, rows = self.columns, max(1, math.ceil(count / self.columns))
+        else:
+            columns, rows = grid_shape(count, width, height)
+        cell_w = width / columns
+        cell_h = height / rows
+        self.scale = min(cell_w / cluster_w, cell_h / cluster_h)
+        index = np.arange(count)
+        # Centre each cluster in its cell
+        self.origins = np.stack((
+            (index % columns) * cell_w + (cell_w - cluster_w * self.scale) / 2,
+            height - (index // columns + 1) * cell_h + (cell_h - cluster_h * self.scale) / 2,
+        ), axis=1)
+        self._quads = {}
+        self._release_background()
+
+    def _release_background(self):
+        if self.background is not None:
+            framebuffer, texture = self.background
+            glDeleteFramebuffers(1, [framebuffer])
+            glDeleteTextures([texture])
+        self.background = None
+
+    def release(self):
+        self._release_background()
+        if self.texture is not None:
+            glDeleteTextures([self.texture])
+        self.texture = None
+
+    def _layer_offset(self, layer):
+        return layer * (CLUSTER_RECT[3] - CLUSTER_RECT[1] + LAYER_GAP)
+
+    def _build_texture(self):
+        """Render the face, cap and lit layers once into a mipmapped texture"""
+        x0, y0, x1, y1 = CLUSTER_RECT
+        width = x1 - x0
+        height = self._layer_offset(LIT) + (y1 - y0)
+        target = _create_render_texture(width, height, GL_LINEAR_MIPMAP_LINEAR)
+        if target is None:
+            self.available = False
+            return
+        framebuffer, self.texture = target
+        self._texture_height = height
+
+        flush_points()
+        previous = glGetIntegerv(GL_FRAMEBUFFER_BINDING)
+        glBindFramebuffer(GL_FRAMEBUFFER, framebuffer)
+        glPushAttrib(GL_ALL_ATTRIB_BITS)
+        glMatrixMode(GL_PROJECTION)
+        glPushMatrix()
+        glLoadIdentity()
+        glOrtho(0, width, 0, height, -1, 1)
+        glMatrixMode(GL_MODELVIEW)
+        glPushMatrix()
+        glViewport(0, 0, width, height)
+        glDisable(GL_DEPTH_TEST)
+        glClearColor(0.0, 0.0, 0.0, 0.0)
+        glClear(GL_COLOR_BUFFER_BIT)
+        glEnable(GL_SCISSOR_TEST)
+        for layer, draw in ((FACE, _draw_face_layer), (CAPS, _draw_cap_layer), (LIT, _draw_lit_layer)):
+            offset = self._layer_offset(layer)
+            glScissor(0, offset, width, y1 - y0)
+            glLoadIdentity()
+            glTranslatef(-x0, offset - y0, 0)
+            draw()
+            flush_points()
+        self.cap_rects = self._measure_caps(width, y1 - y0)
+        glMatrixMode(GL_PROJECTION)
+        glPopMatrix()
+        glMatrixMode(GL_MODELVIEW)
+        glPopMatrix()
+        glPopAttrib()
+        glBindFramebuffer(GL_FRAMEBUFFER, previous)
+        glDeleteFramebuffers(1, [framebuffer])
+
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glGenerateMipmap(GL_TEXTURE_2D)
+        glBindTexture(GL_TEXTURE_2D, 0)
+
+    def _measure_caps(self, width, height, pad=2):
+        """Bounding rects of each gauge's cap and labels, read back from the cap layer"""
+        glPixelStorei(GL_PACK_ALIGNMENT, 1)
+        pixels = glReadPixels(0, self._layer_offset(CAPS), width, height, GL_ALPHA, GL_UNSIGNED_BYTE)
+        covered = np.frombuffer(pixels, dtype=np.uint8).reshape(height, width) > 0
+        x0, y0 = CLUSTER_RECT[:2]
+        rects = []
+        for _, cx, cy, radius, _ in GAUGES:
+            left, bottom = max(cx - radius - x0, 0), max(cy - radius - y0, 0)
+            region = covered[bottom:cy + radius - y0, left:cx + radius - x0]
+            rows = np.flatnonzero(region.any(axis=1))
+            columns = np.flatnonzero(region.any(axis=0))
+            if len(rows):
+                rects.append((x0 + left + int(columns[0]) - pad, y0 + bottom + int(rows[0]) - pad,
+                              x0 + left + int(columns[-1]) + 1 + pad, y0 + bottom + int(rows[-1]) + 1 + pad))
+        return tuple(rects)
+
+    def _build_background(self):
+        """Composite every cluster face once into a target-sized background"""
+        target = _create_render_texture(self.width, self.height, GL_LINEAR)
+        if target is None:
+            return
+        self.background = target
+        clear_color = glGetFloatv(GL_COLOR_CLEAR_VALUE)
+        previous = glGetIntegerv(GL_FRAMEBUFFER_BINDING)
+        glBindFramebuffer(GL_FRAMEBUFFER, target[0])
+        glPushAttrib(GL_VIEWPORT_BIT)
+        glViewport(0, 0, self.width, self.height)
+        glClearColor(*clear_color)
+        glClear(GL_COLOR_BUFFER_BIT)
+        self._begin_sprites()
+        self._draw_sprites(FACE, CLUSTER_RECT)
+        self._end_sprites()
+        glPopAttrib()
+        glBindFramebuffer(GL_FRAMEBUFFER, previous)
+
+    def _sprite_quads(self, layer, rect):
+        """(N, 4, 2) positions and (4, 2) texcoords of rect of a layer for every cluster"""
+        key = (layer, rect)
+        quads = self._quads.get(key)
+        if quads is None:
+            x0, y0, x1, y1 = rect
+            corners = np.array([[x0, y0], [x1, y0], [x1, y1], [x0, y1]], dtype=np.float64)
+            local = (corners - CLUSTER_RECT[:2]) * self.scale
+            positions = (self.origins[:, None, :] + local[None, :, :]).astype(np.float32)
+            texture_width = CLUSTER_RECT[2] - CLUSTER_RECT[0]
+            texcoords = (corners - CLUSTER_RECT[:2] + (0, self._layer_offset(layer)))
+            texcoords = (texcoords / (texture_width, self._texture_height)).astype(np.float32)
+            quads = (positions, texcoords)
+            self._quads[key] = quads
+        return quads
+
+    def _draw_sprites(self, layer, rect, mask=None):
+        positions, texcoords = self._sprite_quads(layer, rect)
+        if mask is not None:
+            positions = positions[mask]
+        count = len(positions)
+        if count == 0:
+            return
+        texcoords = np.broadcast_to(texcoords, (count, 4, 2))
+        glVertexPointer(2, GL_FLOAT, 0, np.ascontiguousarray(positions))
+        glTexCoordPointer(2, GL_FLOAT, 0, np.ascontiguousarray(texcoords))
+        glDrawArrays(GL_QUADS, 0, count * 4)
+
+    def _begin_sprites(self):
+        glPushAttrib(GL_ENABLE_BIT | GL_TEXTURE_BIT | GL_COLOR_BUFFER_BIT)
+        glEnable(GL_TEXTURE_2D)
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glTexEnvi(GL_TEXTURE_ENV, GL_TEXTURE_ENV_MODE, GL_REPLACE)
+        glEnable(GL_BLEND)
+        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_TEXTURE_COORD_ARRAY)
+
+    def _end_sprites(self):
+        glDisableClientState(GL_TEXTURE_COORD_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glPopAttrib()
+
+    def _blit_background(self):
+        previous = glGetIntegerv(GL_READ_FRAMEBUFFER_BINDING)
+        glBindFramebuffer(GL_READ_FRAMEBUFFER, self.background[0])
+        glBlitFramebuffer(0, 0, self.width, self.height, 0, 0, self.width, self.height,
+                          GL_COLOR_BUFFER_BIT, GL_NEAREST)
+        glBindFramebuffer(GL_READ_FRAMEBUFFER, previous)
+
+    def _draw_needles(self, values):
+        """All needles as one anti-aliased stroke buffer and draw; values is (N, 3)"""
+        full_scale = np.array([gauge[4] for gauge in GAUGES])
+        centers = np.array([gauge[1:3] for gauge in GAUGES], dtype=np.float64)
+        lengths = np.array([gauge[3] - NEEDLE_INSET for gauge in GAUGES], dtype=np.float64)
+        angles = GAUGE_START_ANGLE - np.clip(values / full_scale, 0, 1) * GAUGE_SWEEP
+        tips = np.stack(lookup_polar(lengths, angles), axis=-1)
+
+        base = self.origins[:, None, :] + (centers - CLUSTER_RECT[:2]) * self.scale
+        strokes = []
+        for color, offset, fraction, width in NEEDLE_STROKES:
+            start = (base + np.array(offset) * self.scale).reshape(-1, 2)
+            end = start + (tips * (fraction * self.scale)).reshape(-1, 2)
+            strokes.append(stroke_vertices(start[:, 0], start[:, 1], end[:, 0], end[:, 1],
+                                           width * self.scale, color))
+        draw_stroke_buffer(np.concatenate(strokes))
+
+    def _draw_readouts(self, speed, temp):
+        runs = []
+        for values, (x, y, width, height, _) in ((speed, SPEED_DISPLAY), (temp, TEMP_DISPLAY)):
+            pen = (np.array([x + 15, y + height // 2 - 8]) - CLUSTER_RECT[:2]) * self.scale
+            for (ox, oy), value in zip(self.origins.tolist(), values.tolist()):
+                runs.append((ox + pen[0], oy + pen[1], self.scale, f"{int(value)}"))
+        glColor3f(0.15, 0.30, 0.35)
+        draw_atlas_text_batch(runs)
+
+    def _draw_each(self, alpha):
+        """Fallback without a shared texture: every cluster through Dashboard.draw"""
+        for dashboard, (ox, oy) in zip(self.dashboards, self.origins.tolist()):
+            glPushMatrix()
+            glTranslatef(ox, oy, 0)
+            glScalef(self.scale, self.scale, 1)
+            glTranslatef(-CLUSTER_RECT[0], -CLUSTER_RECT[1], 0)
+            dashboard.draw(alpha)
+            glPopMatrix()
+
+    def draw(self, alpha=1.0):
+        """Draw every dashboard into the current target (2D, no depth test).
+
+        alpha interpolates each vehicle between its last two simulation
+        steps, as FixedTimestep.alpha does for the single dashboard.
+
+        With the shared texture the whole target is overwritten by the
+        background (cleared to the clear color when it was built), so no
+        glClear is needed first.
+        """
+        if self.texture is None and self.available:
+            self._build_texture()
+
+        glMatrixMode(GL_PROJECTION)
+        glPushMatrix()
+        glLoadIdentity()
+        glOrtho(0, self.width, 0, self.height, -1, 1)
+        glMatrixMode(GL_MODELVIEW)
+        glPushMatrix()
+        glLoadIdentity()
+        glPushAttrib(GL_ENABLE_BIT)
+        glDisable(GL_DEPTH_TEST)
+
+        if not self.available:
+            self._draw_each(alpha)
+        elif self.dashboards:
+            vehicles = [dashboard.view(alpha) for dashboard in self.dashboards]
+            values = np.array([gauge_values(vehicle) for vehicle in vehicles])
+
+            if self.background is None:
+                self._build_background()
+            if self.background is not None:
+                self._blit_background()
+            else:
+                self._begin_sprites()
+                self._draw_sprites(FACE, CLUSTER_RECT)
+                self._end_sprites()
+
+            self._draw_needles(values)
+
+            self._begin_sprites()
+            for rect in self.cap_rects:
+                self._draw_sprites(CAPS, rect)
+            self._draw_sprites(LIT, WIDGET_RECTS["left_arrow"],
+                               np.array([dashboard.left_signal for dashboard in self.dashboards]))
+            self._draw_sprites(LIT, WIDGET_RECTS["right_arrow"],
+                               np.array([dashboard.right_signal for dashboard in self.dashboards]))
+            self._draw_sprites(LIT, WIDGET_RECTS["fuel_warning"],
+                               np.array([vehicle.fuel_warning for vehicle in vehicles]))
+            self._end_sprites()
+
+            self._draw_readouts(values[:, 0], np.array([vehicle.engine_temp for vehicle in vehicles]))
+
+        glPopAttrib()
+        glMatrixMode(GL_PROJECTION)
+        glPopMatrix()
+        glMatrixMode(GL_MODELVIEW)
+        glPopMatrix()
+
+
+class FleetDriver:
+    """Scripted stand-in for live telemetry: random throttle and signals per vehicle"""
+
+    def __init__(self, dashboards, seed=0):
+        self.dashboards = dashboards
+        self.random = random.Random(seed)
+        self.signals = [None] * len(dashboards)
+        self.time = 0.0
+
+    def step(self, dt=SIM_DT):
+        self.time += dt
+        blink = int(self.time / 0.25) % 2 == 0
+        for index, dashboard in enumerate(self.dashboards):
+            vehicle = dashboard.vehicle
+            if self.random.random() < 0.01:
+                vehicle.accelerating = self.random.random() < 0.6
+                vehicle.decelerating = not vehicle.accelerating
+            if self.random.random() < 0.002:
+                vehicle.refuel()
+            if self.random.random() < 0.005:
+                self.signals[index] = self.random.choice((None, 'left', 'right'))
+            signal = self.signals[index]
+            dashboard.left_signal = blink and signal == 'left'
+            dashboard.right_signal = blink and signal == 'right'
+            dashboard.previous = vehicle.copy()
+            vehicle.step(dt)
+
+
+def make_fleet(count):
+    return [Dashboard() for _ in range(count)]
+
+
+renderer = None
+driver = None
+timestep = None
+last_tick_time = None
+
+
+def display():
+    glClear(GL_COLOR_BUFFER_BIT)
+    renderer.draw(timestep.alpha)
+    glutSwapBuffers()
+
+
+def reshape(width, height):
+    glViewport(0, 0, max(1, width), max(1, height))
+    renderer.layout(max(1, width), max(1, height))
+
+
+def animate(value):
+    global last_tick_time
+    now = time.perf_counter()
+    if last_tick_time is not None:
+        timestep.advance(min(now - last_tick_time, MAX_FRAME_TIME))
+    last_tick_time = now
+    glutPostRedisplay()
+    glutTimerFunc(16, animate, 0)
+
+
+def main(argv=None):
+    import argparse
+    global renderer, driver, timestep
+    parser = argparse.ArgumentParser(description="Show N instrument clusters in one window")
+    parser.add_argument("--count", type=int, default=64)
+    parser.add_argument("--columns", type=int)
+    parser.add_argument("--size", default="1500x1000", help="window size WxH")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    width, height = (int(v) for v in args.size.lower().split("x"))
+
+    dashboards = make_fleet(args.count)
+    renderer = GridRenderer(dashboards, width, height, args.columns)
+    driver = FleetDriver(dashboards, args.seed)
+    timestep = FixedTimestep(driver.step, SIM_DT)
+
+    glutInit()
+    glutInitDisplayMode(GLUT_RGBA | GLUT_DOUBLE)
+    glutInitWindowSize(width, height)
+    glutCreateWindow(b"Dashboard Grid")
+    glClearColor(0.05, 0.05, 0.06, 1.0)
+    set_raster_mode(RASTER_BATCHED)
+    build_glyph_atlas()
+    glutDisplayFunc(display)
+    glutReshapeFunc(reshape)
+    glutTimerFunc(0, animate, 0)
+    glutMainLoop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,412 @@
+"""
+headless.py - Offscreen rendering and frame-time benchmark for the dashboard
+Drives main.render_frame() phase by phase into an offscreen framebuffer and
+reports per-phase frame time percentiles (3D scene, overlay gauges, text).
+The text phase is the instruction text; gauge numerals and readouts are
+part of the cached overlay and are timed under "overlay".
+
+Backends:
+    egl  - EGL surfaceless context (Mesa llvmpipe works on a GPU-less box);
+           GLUT is never initialized, so text uses the built-in bitmap atlas
+    glut - hidden GLUT window, e.g. under Xvfb; text uses the Helvetica atlas
+
+Usage:
+    python headless.py --frames 600 --timeline ramp
+    python headless.py --backend glut --raster immediate --json before.json
+    python headless.py --grid 64
+    python headless.py --profile trace.json   # per-phase profile + Chrome trace
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+BACKENDS = ("egl", "glut")
+PHASES = ("scene", "overlay", "text")
+FRAME_DT = 0.016
+
+# Scripted input timelines: frame number -> actions applied before that frame
+TIMELINES = {
+    "idle": {},
+    "ramp": {0: ["press_up"]},
+    "drive": {
+        0: ["press_up"],
+        120: ["left"],
+        200: ["release_up"],
+        260: ["right", "brake"],
+        300: ["press_down"],
+        360: ["release_down", "refuel"],
+        420: ["press_up"],
+    },
+}
+
+
+def select_platform(backend):
+    """Pick the PyOpenGL platform; must run before OpenGL is first imported"""
+    if backend == "egl":
+        os.environ.setdefault("PYOPENGL_PLATFORM", "egl")
+        os.environ.setdefault("EGL_PLATFORM", "surfaceless")
+
+
+class OffscreenTarget:
+    """A current GL context with a bound width x height RGBA/depth framebuffer"""
+
+    def __init__(self, width, height, backend="egl"):
+        if backend not in BACKENDS:
+            raise ValueError(f"unknown backend: {backend!r}")
+        self.width = width
+        self.height = height
+        self.backend = backend
+        if backend == "egl":
+            self._create_egl_context()
+        else:
+            self._create_glut_context()
+        self._create_framebuffer()
+
+    def _create_egl_context(self):
+        import ctypes
+        from OpenGL import EGL
+
+        display = EGL.eglGetDisplay(EGL.EGL_DEFAULT_DISPLAY)
+        major, minor = EGL.EGLint(), EGL.EGLint()
+        if not EGL.eglInitialize(display, ctypes.pointer(major), ctypes.pointer(minor)):
+            raise RuntimeError("eglInitialize failed")
+        attributes = (EGL.EGLint * 11)(
+            EGL.EGL_SURFACE_TYPE, EGL.EGL_PBUFFER_BIT,
+            EGL.EGL_RED_SIZE, 8, EGL.EGL_GREEN_SIZE, 8, EGL.EGL_BLUE_SIZE, 8,
+            EGL.EGL_RENDERABLE_TYPE, EGL.EGL_OPENGL_BIT,
+            EGL.EGL_NONE,
+        )
+        config = EGL.EGLConfig()
+        count = EGL.EGLint()
+        EGL.eglChooseConfig(display, attributes, ctypes.pointer(config), 1, ctypes.pointer(count))
+        if count.value == 0:
+            raise RuntimeError("no EGL config with desktop OpenGL support")
+        # The pbuffer only makes the context current; drawing goes to the FBO
+        surface_attributes = (EGL.EGLint * 5)(EGL.EGL_WIDTH, 1, EGL.EGL_HEIGHT, 1, EGL.EGL_NONE)
+        surface = EGL.eglCreatePbufferSurface(display, config, surface_attributes)
+        EGL.eglBindAPI(EGL.EGL_OPENGL_API)
+        context = EGL.eglCreateContext(display, config, EGL.EGL_NO_CONTEXT, None)
+        if not EGL.eglMakeCurrent(display, surface, surface, context):
+            raise RuntimeError("eglMakeCurrent failed")
+
+    def _create_glut_context(self):
+        from OpenGL.GLUT import (glutInit, glutInitDisplayMode, glutInitWindowSize,
+                                 glutCreateWindow, glutHideWindow, GLUT_RGBA, GLUT_DEPTH)
+        if not os.environ.get("DISPLAY"):
+            raise RuntimeError("the glut backend needs an X display (run under Xvfb)")
+        glutInit()
+        glutInitDisplayMode(GLUT_RGBA | GLUT_DEPTH)
+        glutInitWindowSize(1, 1)
+        glutCreateWindow(b"headless dashboard")
+        glutHideWindow()
+
+    def _create_framebuffer(self):
+        from OpenGL.GL import (glGenFramebuffers, glBindFramebuffer, glGenRenderbuffers,
+                               glBindRenderbuffer, glRenderbufferStorage,
+                               glFramebufferRenderbuffer, glCheckFramebufferStatus,
+                               GL_FRAMEBUFFER, GL_RENDERBUFFER, GL_RGBA8, GL_DEPTH_COMPONENT24,
+                               GL_COLOR_ATTACHMENT0, GL_DEPTH_ATTACHMENT,
+                               GL_FRAMEBUFFER_COMPLETE)
+        self.framebuffer = glGenFramebuffers(1)
+        glBindFramebuffer(GL_FRAMEBUFFER, self.framebuffer)
+        color, depth = glGenRenderbuffers(2)
+        glBindRenderbuffer(GL_RENDERBUFFER, color)
+        glRenderbufferStorage(GL_RENDERBUFFER, GL_RGBA8, self.width, self.height)
+        glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_COLOR_ATTACHMENT0, GL_RENDERBUFFER, color)
+        glBindRenderbuffer(GL_RENDERBUFFER, depth)
+        glRenderbufferStorage(GL_RENDERBUFFER, GL_DEPTH_COMPONENT24, self.width, self.height)
+        glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_DEPTH_ATTACHMENT, GL_RENDERBUFFER, depth)
+        if glCheckFramebufferStatus(GL_FRAMEBUFFER) != GL_FRAMEBUFFER_COMPLETE:
+            raise RuntimeError("offscreen framebuffer is incomplete")
+
+    def read_rgb(self):
+        """Return the framebuffer as a top-down (height, width, 3) uint8 array"""
+        import numpy as np
+        from OpenGL.GL import glReadPixels, glPixelStorei, GL_PACK_ALIGNMENT, GL_RGB, GL_UNSIGNED_BYTE
+        glPixelStorei(GL_PACK_ALIGNMENT, 1)
+        pixels = glReadPixels(0, 0, self.width, self.height, GL_RGB, GL_UNSIGNED_BYTE)
+        image = np.frombuffer(pixels, dtype=np.uint8).reshape(self.height, self.width, 3)
+        return image[::-1]
+
+
+def load_timeline(name_or_path):
+    """Return a {frame: [actions]} timeline from a built-in name or a JSON file.
+
+    The JSON form is a list of [frame, action] pairs.
+    """
+    if name_or_path in TIMELINES:
+        return TIMELINES[name_or_path]
+    with open(name_or_path) as handle:
+        events = json.load(handle)
+    timeline = {}
+    for frame, action in events:
+        timeline.setdefault(int(frame), []).append(action)
+    return timeline
+
+
+def apply_action(dashboard, action):
+    """Apply one scripted input action to the dashboard module"""
+    if action in ("press_up", "release_up", "press_down", "release_down"):
+        state, key = action.split("_")
+        dashboard.keys_pressed[key] = state == "press"
+    elif action == "left":
+        dashboard.signal_left()
+    elif action == "right":
+        dashboard.signal_right()
+    elif action == "brake":
+        dashboard.brake()
+    elif action == "refuel":
+        dashboard.refuel()
+    else:
+        raise ValueError(f"unknown timeline action: {action!r}")
+
+
+def percentiles(samples_ms):
+    import numpy as np
+    samples = np.asarray(samples_ms)
+    return {
+        "p50": float(np.percentile(samples, 50)),
+        "p90": float(np.percentile(samples, 90)),
+        "p99": float(np.percentile(samples, 99)),
+        "max": float(samples.max()),
+    }
+
+
+def run_benchmark(frames=600, timeline="ramp", backend="egl", width=1500, height=1000,
+                  raster="batched", face_cache=True, instancing=True, lod=True,
+                  view_distance=500.0, overlay_cache=True, warmup=10, seed=0, profile=None):
+    """Render frames headless and return per-phase timing statistics in ms.
+
+    With profile set to a path, the profiler instruments every frame, its
+    rolling summary is added to the result and a Chrome trace is written.
+    """
+    select_platform(backend)
+    OffscreenTarget(width, height, backend)
+
+    from OpenGL.GL import glFinish
+    import algorithms
+    import components
+    import instancing as scene_instancing
+    import culling
+    import text_atlas
+    import profiler
+    import main as dashboard
+
+    if backend == "egl":
+        text_atlas.set_glut_text(False)
+    random.seed(seed)
+    dashboard.world.reset(seed)
+    dashboard.WINDOW_WIDTH = width
+    dashboard.WINDOW_HEIGHT = height
+    sim_time = [0.0]
+    dashboard.clock = lambda: sim_time[0]
+    dashboard.initialize()
+    if backend == "egl":
+        text_atlas.build_bitmap_atlas()
+    algorithms.set_raster_mode(raster)
+    components.set_gauge_face_cache(face_cache)
+    scene_instancing.set_instancing(instancing)
+    culling.set_lod(lod)
+    dashboard.set_overlay_cache(overlay_cache)
+    culling.set_view_distance(view_distance)
+
+    events = load_timeline(timeline)
+    samples = {phase: [] for phase in PHASES + ("total",)}
+    drawn = {}
+    redrawn = []
+    if profile:
+        profiler.set_profiling(True, dashboard)
+    for frame in range(warmup + frames):
+        if frame == warmup:
+            profiler.reset_profile()
+        for action in events.get(frame - warmup, ()):
+            apply_action(dashboard, action)
+        dashboard.advance_simulation(FRAME_DT)
+        sim_time[0] += FRAME_DT
+
+        with profiler.phase("frame"):
+            # Publish the interpolated vehicle state before the scene reads camera_z
+            dashboard.update_gauges()
+            start = time.perf_counter()
+            dashboard.draw_scene_3d()
+            glFinish()
+            scene_done = time.perf_counter()
+            dashboard.draw_dashboard()
+            glFinish()
+            overlay_done = time.perf_counter()
+            dashboard.draw_instructions()
+            glFinish()
+            text_done = time.perf_counter()
+
+        if frame >= warmup:
+            samples["scene"].append((scene_done - start) * 1000)
+            samples["overlay"].append((overlay_done - scene_done) * 1000)
+            samples["text"].append((text_done - overlay_done) * 1000)
+            samples["total"].append((text_done - start) * 1000)
+            redrawn.append(len(dashboard.dashboard_overlay.redrawn) if overlay_cache else len(dashboard.overlay_widgets))
+            for name, counts in culling.cull_stats().items():
+                for key, count in counts.items():
+                    drawn.setdefault(name, {}).setdefault(key, []).append(count)
+    # The next run gets a new context; release this one's buffers while it is current
+    dashboard.release_scene()
+
+    profile_summary = None
+    if profile:
+        profile_summary = profiler.profile_summary()
+        profiler.write_chrome_trace(profile)
+        profiler.set_profiling(False)
+
+    return {
+        "frames": frames,
+        "timeline": timeline,
+        "backend": backend,
+        "raster": raster,
+        "face_cache": face_cache,
+        "instancing": instancing,
+        "lod": lod,
+        "view_distance": view_distance,
+        "overlay_cache": overlay_cache,
+        "overlay_redraws": sum(redrawn) / len(redrawn),
+        "final_speed": dashboard.speed,
+        "phases": {phase: percentiles(values) for phase, values in samples.items()},
+        "culling": {name: {key: sum(values) / len(values) for key, values in counts.items()}
+                    for name, counts in drawn.items()},
+        "profile": profile_summary,
+    }
+
+
+def run_grid_benchmark(count=64, frames=300, backend="egl", width=1500, height=1000,
+                       warmup=10, seed=0):
+    """Render count clusters per frame with grid.GridRenderer; timings in ms"""
+    select_platform(backend)
+    OffscreenTarget(width, height, backend)
+
+    from OpenGL.GL import glClear, glClearColor, glFinish, glViewport, GL_COLOR_BUFFER_BIT
+    import algorithms
+    import text_atlas
+    import grid
+
+    if backend == "egl":
+        text_atlas.set_glut_text(False)
+        text_atlas.build_bitmap_atlas()
+    else:
+        text_atlas.build_glyph_atlas()
+    algorithms.set_raster_mode(algorithms.RASTER_BATCHED)
+    dashboards = grid.make_fleet(count)
+    renderer = grid.GridRenderer(dashboards, width, height)
+    driver = grid.FleetDriver(dashboards, seed)
+    glViewport(0, 0, width, height)
+    glClearColor(0.05, 0.05, 0.06, 1.0)
+
+    samples = {"simulate": [], "draw": [], "total": []}
+    for frame in range(warmup + frames):
+        start = time.perf_counter()
+        driver.step(FRAME_DT)
+        simulated = time.perf_counter()
+        glClear(GL_COLOR_BUFFER_BIT)
+        renderer.draw()
+        glFinish()
+        drawn = time.perf_counter()
+        if frame >= warmup:
+            samples["simulate"].append((simulated - start) * 1000)
+            samples["draw"].append((drawn - simulated) * 1000)
+            samples["total"].append((drawn - start) * 1000)
+
+    return {
+        "frames": frames,
+        "backend": backend,
+        "grid": count,
+        "shared_texture": renderer.available,
+        "phases": {phase: percentiles(values) for phase, values in samples.items()},
+    }
+
+
+def format_grid_report(result):
+    lines = [
+        f"{result['frames']} frames, {result['grid']} clusters, backend={result['backend']}, "
+        f"shared_texture={result['shared_texture']}",
+        f"{'phase':<10}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}   (ms)",
+    ]
+    for phase, stats in result["phases"].items():
+        lines.append(f"{phase:<10}" + "".join(f"{stats[key]:9.3f}" for key in ("p50", "p90", "p99", "max")))
+    return "\n".join(lines)
+
+
+def format_report(result):
+    lines = [
+        f"{result['frames']} frames, timeline={result['timeline']}, backend={result['backend']}, "
+        f"raster={result['raster']}, face_cache={result['face_cache']}, "
+        f"instancing={result['instancing']}, lod={result['lod']}, view_distance={result['view_distance']:g}, "
+        f"overlay_cache={result['overlay_cache']}",
+        f"{'phase':<10}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}   (ms)",
+    ]
+    for phase, stats in result["phases"].items():
+        lines.append(f"{phase:<10}" + "".join(f"{stats[key]:9.3f}" for key in ("p50", "p90", "p99", "max")))
+    lines.append(f"overlay regions redrawn per frame: {result['overlay_redraws']:.2f}")
+    if result["culling"]:
+        lines.append("mean per frame: " + "  ".join(
+            f"{name} {c['drawn']:.0f}+{c['lod']:.0f} drawn/{c['culled']:.0f} culled"
+            for name, c in result["culling"].items()))
+    lines.append("(text = instruction text; gauge numerals and readouts are timed under overlay)")
+    if result.get("profile"):
+        from profiler import format_profile, HUD_WINDOW
+        lines.append(f"profiled phases, mean of the last {HUD_WINDOW} frames:")
+        lines.append(format_profile(result["profile"]))
+    return "\n".join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Headless dashboard frame-time benchmark")
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--timeline", default="ramp",
+                        help="built-in timeline (%s) or a JSON file of [frame, action] pairs"
+                        % ", ".join(TIMELINES))
+    parser.add_argument("--backend", choices=BACKENDS,
+                        default="glut" if os.environ.get("DISPLAY") else "egl")
+    parser.add_argument("--size", default="1500x1000", help="framebuffer size WxH")
+    parser.add_argument("--raster", choices=("immediate", "batched"), default="batched")
+    parser.add_argument("--no-face-cache", action="store_true")
+    parser.add_argument("--no-instancing", action="store_true")
+    parser.add_argument("--no-lod", action="store_true")
+    parser.add_argument("--view-distance", type=float, default=500.0)
+    parser.add_argument("--no-overlay-cache", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--grid", type=int, metavar="N",
+                        help="benchmark grid mode with N clusters instead of the single dashboard")
+    parser.add_argument("--profile", metavar="TRACE",
+                        help="profile every phase and write a Chrome trace JSON to TRACE")
+    parser.add_argument("--json", help="also write the results to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    if args.grid:
+        result = run_grid_benchmark(count=args.grid, frames=args.frames, backend=args.backend,
+                                    width=width, height=height, warmup=args.warmup, seed=args.seed)
+        print(format_grid_report(result))
+        if args.json:
+            with open(args.json, "w") as handle:
+                json.dump(result, handle, indent=2)
+        return
+    result = run_benchmark(frames=args.frames, timeline=args.timeline, backend=args.backend,
+                           width=width, height=height, raster=args.raster,
+                           face_cache=not args.no_face_cache,
+                           instancing=not args.no_instancing, lod=not args.no_lod,
+                           view_distance=args.view_distance,
+                           overlay_cache=not args.no_overlay_cache, warmup=args.warmup, seed=args.seed,
+                           profile=args.profile)
+    print(format_report(result))
+    if args.json:
+        with open(args.json, "w") as handle:
+            json.dump(result, handle, indent=2)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,321 @@
+"""
+instancing.py - Instanced rendering for trees, houses, cars and clouds
+Each mesh from scene.py is uploaded once into a vertex buffer, and every
+instance of a type is drawn with a single glDrawArraysInstanced call fed by
+a per-instance buffer of (x, y, z, scale) offsets and tint colors. Where
+shaders or instanced arrays are unavailable, instances are expanded on the
+CPU and still drawn with one glDrawArrays call per type.
+"""
+
+from OpenGL.GL import *
+import ctypes
+import numpy as np
+from algorithms import unit_circle
+
+# Per-vertex layout: position xyz, base color rgb, tint weight
+VERTEX_FLOATS = 7
+# Per-instance layout: offset xyz, scale, tint rgb
+INSTANCE_FLOATS = 7
+CLOUD_SEGMENTS = 28
+
+_VERTEX_SHADER = """
+#version 120
+attribute vec3 position;
+attribute vec3 base_color;
+attribute float tint_weight;
+attribute vec4 offset;
+attribute vec3 tint;
+uniform vec3 scale_axes;
+varying vec3 color;
+void main() {
+    vec3 world = position * mix(vec3(1.0), vec3(offset.w), scale_axes) + offset.xyz;
+    color = mix(base_color, tint, tint_weight);
+    gl_Position = gl_ModelViewProjectionMatrix * vec4(world, 1.0);
+}
+"""
+
+_FRAGMENT_SHADER = """
+#version 120
+varying vec3 color;
+void main() {
+    gl_FragColor = vec4(color, 1.0);
+}
+"""
+
+_ATTRIBUTES = ("position", "base_color", "tint_weight", "offset", "tint")
+
+_instancing_enabled = True
+_program = None
+_shader_failed = False
+_meshes = {}
+
+
+def set_instancing(enabled):
+    """Enable or disable the batched scene path (main falls back to scene.draw_*)"""
+    global _instancing_enabled
+    _instancing_enabled = enabled
+
+
+def instancing_enabled():
+    return _instancing_enabled
+
+
+def _triangles(color, *polygons, tint=0.0):
+    """Fan-triangulate convex polygons into (n, VERTEX_FLOATS) vertex rows"""
+    rows = []
+    for polygon in polygons:
+        for i in range(1, len(polygon) - 1):
+            for vertex in (polygon[0], polygon[i], polygon[i + 1]):
+                rows.append((*vertex, *color, tint))
+    return rows
+
+
+def _quads(color, *quads, tint=0.0):
+    return _triangles(color, *quads, tint=tint)
+
+
+def tree_mesh():
+    """draw_tree geometry with y in units of tree height (scaled per instance)"""
+    trunk_width = 0.5
+    trunk_height = 0.4
+    rows = _quads((0.4, 0.25, 0.1),
+                  [(-trunk_width, 0, 0), (trunk_width, 0, 0),
+                   (trunk_width, trunk_height, 0), (-trunk_width, trunk_height, 0)],
+                  [(-trunk_width, 0, 0.5), (trunk_width, 0, 0.5),
+                   (trunk_width, trunk_height, 0.5), (-trunk_width, trunk_height, 0.5)])
+    for i in range(3):
+        base_y = trunk_height + i * 0.15
+        top_y = base_y + 0.2
+        base_size = 2.5 - i * 0.6
+        rows += _triangles((0.1, 0.4, 0.1),
+                           [(0, top_y, 0.25), (-base_size, base_y, 0), (base_size, base_y, 0)],
+                           [(0, top_y, 0.5), (-base_size, base_y, 0.5), (base_size, base_y, 0.5)],
+                           [(0, top_y, 0.25), (-base_size, base_y, 0), (-base_size, base_y, 0.5)],
+                           [(0, top_y, 0.25), (base_size, base_y, 0), (base_size, base_y, 0.5)])
+    return np.array(rows, dtype=np.float32)
+
+
+def tree_impostor_mesh():
+    """draw_tree_impostor geometry: trunk quad and one canopy triangle"""
+    rows = _quads((0.4, 0.25, 0.1), [(-0.5, 0, 0), (0.5, 0, 0), (0.5, 0.4, 0), (-0.5, 0.4, 0)])
+    rows += _triangles((0.1, 0.4, 0.1), [(0, 0.9, 0), (-2.5, 0.4, 0), (2.5, 0.4, 0)])
+    return np.array(rows, dtype=np.float32)
+
+
+def house_mesh():
+    """draw_3d_house billboard geometry"""
+    w = 4.0
+    h = 6.0
+    depth = -0.2
+    rows = _quads((0.6, 0.4, 0.2), [(-w, 0, depth), (w, 0, depth), (w, h, depth), (-w, h, depth)])
+    rows += _triangles((0.5, 0.2, 0.1), [(-w - 0.5, h, depth), (w + 0.5, h, depth), (0, h + 3.0, depth)])
+    window = depth - 0.01
+    rows += _quads((0.2, 0.4, 0.6),
+                   [(-2.5, 3.5, window), (-1.2, 3.5, window), (-1.2, 5.0, window), (-2.5, 5.0, window)],
+                   [(1.2, 3.5, window), (2.5, 3.5, window), (2.5, 5.0, window), (1.2, 5.0, window)])
+    return np.array(rows, dtype=np.float32)
+
+
+def car_mesh():
+    """draw_3d_car sprite geometry; the body takes the per-instance tint"""
+    w = 0.9
+    h = 0.5
+    depth = -0.1
+    rows = _quads((0, 0, 0), [(-w, 0, depth), (w, 0, depth), (w, h, depth), (-w, h, depth)], tint=1.0)
+    window = depth - 0.01
+    rows += _quads((0.12, 0.22, 0.35),
+                   [(-0.35, 0.25, window), (0.35, 0.25, window), (0.42, 0.45, window), (-0.42, 0.45, window)])
+    light = depth - 0.02
+    rows += _quads((0.6, 0.15, 0.15),
+                   [(-w + 0.15, 0.05, light), (-w + 0.45, 0.05, light),
+                    (-w + 0.45, 0.18, light), (-w + 0.15, 0.18, light)],
+                   [(w - 0.45, 0.05, light), (w - 0.15, 0.05, light),
+                    (w - 0.15, 0.18, light), (w - 0.45, 0.18, light)])
+    return np.array(rows, dtype=np.float32)
+
+
+def cloud_mesh(segments=CLOUD_SEGMENTS):
+    """draw_cloud geometry for a cloud of size 1 (scaled uniformly per instance)"""
+    ux, uy = unit_circle(segments)
+    positions = [(0, 0), (-0.3, 0.1), (0.3, 0.1), (-0.15, -0.2), (0.15, -0.2)]
+    rows = []
+    for px, py in positions:
+        for layer in range(3, 0, -1):
+            scale_x = 0.4 * (1.0 + (3 - layer) * 0.15)
+            scale_y = 0.25 * (1.0 + (3 - layer) * 0.12)
+            rim = [(px + scale_x * x, py + scale_y * y, 0.0) for x, y in zip(ux, uy)]
+            rows += _triangles((1.0, 1.0, 1.0), [(px, py, 0.0)] + rim)
+    return np.array(rows, dtype=np.float32)
+
+
+class InstancedMesh:
+    """A triangle mesh uploaded once, drawn for many instances per call.
+
+    scale_axes selects which axes the per-instance scale stretches, e.g.
+    (0, 1, 0) for tree height or (1, 1, 1) for uniformly sized clouds.
+    """
+
+    def __init__(self, vertices, scale_axes=(1.0, 1.0, 1.0)):
+        self.vertices = np.ascontiguousarray(vertices, dtype=np.float32)
+        self.scale_axes = np.array(scale_axes, dtype=np.float32)
+        self.vertex_count = len(self.vertices)
+        self.vertex_buffer = None
+        self.instance_buffer = None
+        self.instance_data = np.zeros((0, INSTANCE_FLOATS), dtype=np.float32)
+
+    def _upload(self):
+        self.vertex_buffer, self.instance_buffer = glGenBuffers(2)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vertex_buffer)
+        glBufferData(GL_ARRAY_BUFFER, self.vertices.nbytes, self.vertices, GL_STATIC_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def release(self):
+        """Delete the GL buffers (their context must be current)"""
+        if self.vertex_buffer is not None:
+            glDeleteBuffers(2, [self.vertex_buffer, self.instance_buffer])
+        self.vertex_buffer = None
+        self.instance_buffer = None
+
+    def _pack(self, x, y, z, scale, tint):
+        """Fill the reusable per-instance array; returns the instance count"""
+        n = len(x)
+        if len(self.instance_data) < n:
+            self.instance_data = np.zeros((max(n, 2 * len(self.instance_data)), INSTANCE_FLOATS),
+                                          dtype=np.float32)
+        data = self.instance_data[:n]
+        data[:, 0] = x
+        data[:, 1] = y
+        data[:, 2] = z
+        data[:, 3] = scale
+        data[:, 4:7] = tint
+        return n
+
+    def draw(self, x, z, y=0.0, scale=1.0, tint=(1.0, 1.0, 1.0)):
+        """Draw one instance per entry of x/z; y, scale and tint broadcast"""
+        n = self._pack(x, y, z, scale, tint)
+        if n == 0:
+            return
+        if _shader_program() is not None:
+            self._draw_instanced(n)
+        else:
+            self._draw_expanded(n)
+
+    def _draw_instanced(self, n):
+        if self.vertex_buffer is None:
+            self._upload()
+        float_size = 4
+        glUseProgram(_program)
+        glUniform3f(glGetUniformLocation(_program, "scale_axes"), *self.scale_axes)
+
+        glBindBuffer(GL_ARRAY_BUFFER, self.vertex_buffer)
+        stride = VERTEX_FLOATS * float_size
+        for location, (size, start) in enumerate(((3, 0), (3, 3), (1, 6))):
+            glEnableVertexAttribArray(location)
+            glVertexAttribPointer(location, size, GL_FLOAT, GL_FALSE, stride,
+                                  ctypes.c_void_p(start * float_size))
+
+        glBindBuffer(GL_ARRAY_BUFFER, self.instance_buffer)
+        glBufferData(GL_ARRAY_BUFFER, n * INSTANCE_FLOATS * float_size, self.instance_data[:n], GL_STREAM_DRAW)
+        stride = INSTANCE_FLOATS * float_size
+        for location, (size, start) in ((3, (4, 0)), (4, (3, 4))):
+            glEnableVertexAttribArray(location)
+            glVertexAttribPointer(location, size, GL_FLOAT, GL_FALSE, stride,
+                                  ctypes.c_void_p(start * float_size))
+            glVertexAttribDivisor(location, 1)
+
+        glDrawArraysInstanced(GL_TRIANGLES, 0, self.vertex_count, n)
+
+        for location in range(len(_ATTRIBUTES)):
+            glVertexAttribDivisor(location, 0)
+            glDisableVertexAttribArray(location)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glUseProgram(0)
+
+    def _draw_expanded(self, n):
+        instances = self.instance_data[:n]
+        positions = np.repeat(self.vertices[None, :, :3], n, axis=0)
+        positions *= 1 + (instances[:, None, 3:4] - 1) * self.scale_axes
+        positions += instances[:, None, :3]
+        weight = self.vertices[None, :, 6:7]
+        colors = self.vertices[None, :, 3:6] * (1 - weight) + instances[:, None, 4:7] * weight
+
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, np.ascontiguousarray(positions, dtype=np.float32))
+        glColorPointer(3, GL_FLOAT, 0, np.ascontiguousarray(colors, dtype=np.float32))
+        glDrawArrays(GL_TRIANGLES, 0, n * self.vertex_count)
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+
+
+def _compile(kind, source):
+    shader = glCreateShader(kind)
+    glShaderSource(shader, source)
+    glCompileShader(shader)
+    if not glGetShaderiv(shader, GL_COMPILE_STATUS):
+        raise RuntimeError(glGetShaderInfoLog(shader))
+    return shader
+
+
+def _shader_program():
+    """Build the instancing program on first use; None when unsupported"""
+    global _program, _shader_failed
+    if _program is not None or _shader_failed:
+        return _program
+    try:
+        if not (bool(glDrawArraysInstanced) and bool(glVertexAttribDivisor)):
+            raise RuntimeError("instanced arrays are not supported")
+        program = glCreateProgram()
+        glAttachShader(program, _compile(GL_VERTEX_SHADER, _VERTEX_SHADER))
+        glAttachShader(program, _compile(GL_FRAGMENT_SHADER, _FRAGMENT_SHADER))
+        for location, name in enumerate(_ATTRIBUTES):
+            glBindAttribLocation(program, location, name)
+        glLinkProgram(program)
+        if not glGetProgramiv(program, GL_LINK_STATUS):
+            raise RuntimeError(glGetProgramInfoLog(program))
+        _program = program
+    except Exception:
+        _shader_failed = True
+    return _program
+
+
+def use_shaders(enabled):
+    """Force the CPU-expanded fallback (False) or retry the shader path (True)"""
+    global _program, _shader_failed
+    _program = None
+    _shader_failed = not enabled
+
+
+def _mesh(name, build, scale_axes=(1.0, 1.0, 1.0)):
+    if name not in _meshes:
+        _meshes[name] = InstancedMesh(build(), scale_axes)
+    return _meshes[name]
+
+
+def draw_trees(x, z, height):
+    _mesh("tree", tree_mesh, (0.0, 1.0, 0.0)).draw(x, z, scale=height)
+
+
+def draw_tree_impostors(x, z, height):
+    _mesh("tree_impostor", tree_impostor_mesh, (0.0, 1.0, 0.0)).draw(x, z, scale=height)
+
+
+def draw_houses(x, z):
+    _mesh("house", house_mesh).draw(x, z)
+
+
+def draw_cars(x, z, colors):
+    _mesh("car", car_mesh).draw(x, z, tint=colors)
+
+
+def draw_clouds(x, y, z, size, segments=CLOUD_SEGMENTS):
+    _mesh(("cloud", segments), lambda: cloud_mesh(segments)).draw(x, z, y=y, scale=size)
+
+
+def release_meshes():
+    """Delete uploaded buffers while their GL context is still current,
+    before it is destroyed or replaced by a new one"""
+    for mesh in _meshes.values():
+        mesh.release()
+    _meshes.clear()
+    use_shaders(True)
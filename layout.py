@@ -0,0 +1,39 @@
+"""
+layout.py - Instrument cluster layout in window coordinates
+Positions of the panel, gauges, readouts and lights, shared by the
+single-dashboard overlay (main.py) and grid mode (grid.py).
+"""
+
+CLUSTER_RECT = (400, 0, 1100, 360)   # the frame and everything inside it
+PANEL_HEIGHT = 350
+OVERLAY_HEIGHT = 360                 # the panel plus the top of the half-circle frame
+FRAME = (750, 0, 350)                # half-circle frame: center x, center y, radius
+FRAME_THICKNESS = 10
+
+SPEEDOMETER = (770, 210, 120)        # center x, center y, radius
+RPM_GAUGE = (560, 140, 80)
+FUEL_GAUGE = (980, 130, 70)
+GAUGES = (                           # (kind, center x, center y, radius, full-scale value)
+    ("speedometer", *SPEEDOMETER, 230.0),
+    ("rpm", *RPM_GAUGE, 8.0),
+    ("fuel", *FUEL_GAUGE, 100.0),
+)
+NEEDLE_INSET = 30
+
+SPEED_DISPLAY = (695, 30, 140, 40, "km/h")   # x, y, width, height, unit label
+TEMP_DISPLAY = (910, 200, 70, 40, "°C")
+LEFT_ARROW = (515, 280)
+RIGHT_ARROW = (962, 280)
+FUEL_LIGHT = (1050, 50, 10)                  # center x, center y, radius
+
+# Each widget's rectangle bounds its pixels for every value it can show
+WIDGET_RECTS = {
+    "speedometer": (645, 85, 895, 335),
+    "rpm": (475, 55, 645, 225),
+    "fuel": (905, 55, 1055, 205),
+    "speed_display": (690, 25, 840, 75),
+    "temp_display": (905, 195, 985, 245),
+    "left_arrow": (508, 273, 552, 307),
+    "right_arrow": (947, 273, 989, 307),
+    "fuel_warning": (1033, 33, 1067, 67),
+}
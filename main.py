@@ -3,33 +3,48 @@
 from OpenGL.GL import *
 from OpenGL.GLUT import *
 from OpenGL.GLU import *
+import sys
 import time
 import math
 import random
+import numpy as np
 from components import *
 from scene import *
+from text_atlas import build_glyph_atlas
+from simulation import VehicleState, FixedTimestep, SIM_DT, MAX_FRAME_TIME
+from layout import *
+from entities import *
+from instancing import *
+from culling import *
+from world import WorldStreamer, HOUSE_SPACING
+from overlay import OverlayWidget, DirtyOverlay, set_overlay_cache, overlay_cache_enabled
+from telemetry import open_source, apply_sample
+from profiler import set_profiling, profiling_enabled, draw_profiler_hud, write_chrome_trace
 
 
 
 
 WINDOW_WIDTH = 1500
 WINDOW_HEIGHT = 1000
+# Display copies of the vehicle state, refreshed (interpolated) every frame
 speed = 0
 rpm = 0
 fuel_level = 100
 engine_temp = 20
+fuel_warning = False
 left_turn = False
 right_turn = False
-fuel_warning = False
 last_activity_time = 0
-fuel_consumption_counter = 0
 half_circle_drawn = False
 road_offset = 0
-target_speed = 0
-target_fuel = 100
 blink_counter = 0
 left_blink_time = 0
 right_blink_time = 0
+left_blink_show = False
+right_blink_show = False
+
+# Time source for the turn-signal blink; headless runs swap in a frame clock
+clock = time.time
 
 keys_pressed = {
     'up': False,
@@ -39,146 +54,166 @@ keys_pressed = {
 }
 
 camera_z = 0.0
-oncoming_cars = []
-trees = []
-clouds = []
-
-
-def initialize():
-    glViewport(0, 0, WINDOW_WIDTH, WINDOW_HEIGHT)
-    glEnable(GL_DEPTH_TEST)
-    glClearColor(0.4, 0.6, 0.9, 1.0)  
-    
-    
-    initialize_trees()
-    
-    initialize_clouds()
-
-def initialize_trees():
-    
-    global trees
-    tree_spacing = 30
-    for i in range(30):
-        z = i * tree_spacing
-        # Left side trees
-        trees.append({
-            'x': -18 - random.uniform(0, 3),
-            'z': z + random.uniform(-5, 5),
-            'height': 8 + random.uniform(0, 4),
-            'type': random.choice(['pine'])
-        })
-        # Right side trees
-        trees.append({
-            'x': 18 + random.uniform(0, 3),
-            'z': z + random.uniform(-5, 5),
-            'height': 8 + random.uniform(0, 4),
-            'type': random.choice(['pine'])
-        })
-
-
-
+vehicle = VehicleState()
+previous_vehicle = vehicle.copy()
+last_tick_time = None
+
+# Optional telemetry source driving the gauges instead of the keyboard
+telemetry = None
+telemetry_time = 0.0
+telemetry_signals = (False, False)
+TRACE_PATH = "dashboard_trace.json"   # written by the T key while profiling (P)
+ONCOMING_SPEED = 60 / 3.6
+oncoming_cars = EntityStore(CAR_COLUMNS)
+trees = EntityStore(TREE_COLUMNS)
+clouds = EntityStore(CLOUD_COLUMNS)
+houses = EntityStore(HOUSE_COLUMNS)
+car_index = ZIndex(oncoming_cars)
+tree_index = ZIndex(trees)
+house_index = ZIndex(houses)
+world = WorldStreamer(tree_index, house_index, car_index)
+
+
+def release_scene():
+    """Drop the road tile buffers and instanced meshes of the current GL context"""
+    release_road_tiles()
+    release_meshes()
 
 def initialize_clouds():
-    global clouds
     for i in range(15):
-        clouds.append({
-            'x': random.uniform(-100, 100),
-            'y': random.uniform(20, 40),
-            'z': random.uniform(0, 500),
-            'size': random.uniform(8, 15),
-            'speed': random.uniform(0.1, 0.3)
-        })
-
-def update_rpm():
-    global rpm
-    rpm = (speed / 230.0) * 7 + 0.5
-
-def update_engine_temp():
-    global engine_temp
-    target_temp = 20 + (rpm * 8) + (speed * 0.2)
-    if target_temp > 120:
-        target_temp = 120
-    
-    if engine_temp < target_temp:
-        engine_temp += 0.5
-    elif engine_temp > target_temp:
-        engine_temp -= 0.3
-
-def consume_fuel():
-    global fuel_level, fuel_consumption_counter, fuel_warning
-    
-    if speed > 0:
-        fuel_consumption_counter += 1
-        
-        if fuel_consumption_counter > 30:
-            fuel_level -= 0.5 * (1 + speed / 100.0)
-            fuel_consumption_counter = 0
-            
-            if fuel_level < 0:
-                fuel_level = 0
-    
-    if fuel_level < 20:
-        fuel_warning = True
-    else:
-        fuel_warning = False
-
-
-def display():
-    global blink_counter, left_turn, right_turn, left_blink_time, right_blink_time
-    
+        clouds.spawn(x=random.uniform(-100, 100),
+                     y=random.uniform(20, 40),
+                     z=random.uniform(0, 500),
+                     size=random.uniform(8, 15),
+                     speed=random.uniform(0.1, 0.3))
+
+def publish_vehicle_state():
+    """Copy the interpolated simulation state into the display globals"""
+    global speed, rpm, fuel_level, engine_temp, fuel_warning, camera_z
+    view = previous_vehicle.interpolate(vehicle, simulation.alpha)
+    speed = view.speed
+    rpm = view.rpm
+    fuel_level = view.fuel_level
+    engine_temp = view.engine_temp
+    fuel_warning = view.fuel_warning
+    camera_z = view.distance
+
+
+def setup_projection(view_distance):
+    """Clear the frame and load the perspective camera at camera_z"""
     glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
     glLoadIdentity()
     glMatrixMode(GL_PROJECTION)
     glLoadIdentity()
-    gluPerspective(60, WINDOW_WIDTH / WINDOW_HEIGHT, 0.1, 1000.0)
+    gluPerspective(60, WINDOW_WIDTH / WINDOW_HEIGHT, 0.1, max(1000.0, view_distance + 100))
     glMatrixMode(GL_MODELVIEW)
     glLoadIdentity()
     gluLookAt(0, 2, camera_z, 0, 2, camera_z + 100, 0, 1, 0)
-    for cloud in clouds:
-        draw_cloud(cloud['x'], cloud['y'], cloud['z'], cloud['size'])
-
-    draw_ground()
-    draw_3d_road()
-
-    for tree in trees:
-        if tree['z'] > camera_z - 50 and tree['z'] < camera_z + 500:
-            draw_tree(tree['x'], 0, tree['z'], tree['height'], tree['type'])
 
-    num_houses = 10
-    house_spacing = 50
-    start_z = math.floor(camera_z / house_spacing) * house_spacing
-    for i in range(num_houses):
-        z = start_z + i * house_spacing
-        draw_3d_house(25, 0, z)
-        draw_3d_house(-25, 0, z)
+def draw_scene_3d():
+    view_distance = get_view_distance()
+    setup_projection(view_distance)
 
-    for car in oncoming_cars:
-        draw_3d_car(car['x'], 0, car['z'], car['color'])
+    if instancing_enabled():
+        draw_road_tile(camera_z, view_distance)
+    else:
+        draw_ground(camera_z, view_distance)
+        draw_3d_road(camera_z, view_distance)
 
-    # 2D Dashboard Overlay
-    glMatrixMode(GL_PROJECTION)
-    glLoadIdentity()
-    glOrtho(0, WINDOW_WIDTH, 0, WINDOW_HEIGHT, -1, 1)
-    glMatrixMode(GL_MODELVIEW)
-    glLoadIdentity()
-    glDisable(GL_DEPTH_TEST)
-    glColor3f(0.1, 0.1, 0.1)
-    glBegin(GL_QUADS)
-    glVertex2f(0, 0)
-    glVertex2f(WINDOW_WIDTH, 0)
-    glVertex2f(WINDOW_WIDTH, 350)
-    glVertex2f(0, 350)
-    glEnd()
-
-    glColor3f(0.75, 0.75, 0.78)
-    draw_half_circle_frame(750, 0, 350, thickness=10)
-    update_rpm()
-    update_engine_temp()
-    consume_fuel()
+    frustum = Frustum(0, 2, camera_z, WINDOW_WIDTH / WINDOW_HEIGHT, far=view_distance)
+    visible = cull_scene(frustum)
+    if instancing_enabled():
+        draw_scene_instanced(visible)
+    else:
+        draw_scene_immediate(visible)
+
+def cull_scene(frustum):
+    """Visible (near, far) indices per entity type; far entries get the LOD mesh"""
+    visible = {}
+    view_distance = get_view_distance()
+    live = clouds.indices()
+    near, far = cull(frustum, 'clouds', clouds['x'][live], clouds['y'][live], clouds['z'][live],
+                     clouds['size'][live] * 0.85, CLOUD_LOD_DISTANCE)
+    visible['clouds'] = (live[near], live[far])
+
+    live = tree_index.query(camera_z - 10, camera_z + view_distance + 10)
+    height = trees['height'][live]
+    near, far = cull(frustum, 'trees', trees['x'][live], height * 0.45, trees['z'][live] + 0.25,
+                     np.hypot(2.5, height * 0.45) + 0.25, TREE_LOD_DISTANCE)
+    visible['trees'] = (live[near], live[far])
+
+    # Houses cover whole spacing rows from the one just behind the camera
+    start_z = math.floor(camera_z / HOUSE_SPACING) * HOUSE_SPACING
+    live = house_index.query(start_z, start_z + view_distance)
+    near, far = cull(frustum, 'houses', houses['x'][live], 4.5, houses['z'][live], 6.5)
+    visible['houses'] = live[near]
+
+    live = car_index.query(camera_z - 10, camera_z + view_distance + 10)
+    near, far = cull(frustum, 'cars', oncoming_cars['x'][live], 0.25, oncoming_cars['z'][live], 1.0)
+    visible['cars'] = live[near]
+    return visible
+
+def draw_scene_instanced(visible):
+    """Clouds, trees, houses and cars as one instanced draw call per mesh"""
+    near, far = visible['clouds']
+    draw_clouds(clouds['x'][near], clouds['y'][near], clouds['z'][near], clouds['size'][near])
+    draw_clouds(clouds['x'][far], clouds['y'][far], clouds['z'][far], clouds['size'][far],
+                segments=CLOUD_LOD_SEGMENTS)
+
+    near, far = visible['trees']
+    draw_trees(trees['x'][near], trees['z'][near], trees['height'][near])
+    draw_tree_impostors(trees['x'][far], trees['z'][far], trees['height'][far])
+
+    draw_houses(houses['x'][visible['houses']], houses['z'][visible['houses']])
+
+    cars = visible['cars']
+    draw_cars(oncoming_cars['x'][cars], oncoming_cars['z'][cars], oncoming_cars['color'][cars])
+
+def draw_scene_immediate(visible):
+    """The same visible set through the per-object scene.draw_* functions"""
+    cx, cy, cz, csize = clouds['x'], clouds['y'], clouds['z'], clouds['size']
+    near, far = visible['clouds']
+    for i in near:
+        draw_cloud(cx[i], cy[i], cz[i], csize[i])
+    for i in far:
+        draw_cloud(cx[i], cy[i], cz[i], csize[i], CLOUD_LOD_SEGMENTS)
+
+    tx, tz, theight, ttype = trees['x'], trees['z'], trees['height'], trees['type']
+    near, far = visible['trees']
+    for i in near:
+        draw_tree(tx[i], 0, tz[i], theight[i], TREE_TYPES[ttype[i]])
+    for i in far:
+        draw_tree_impostor(tx[i], 0, tz[i], theight[i])
+
+    for i in visible['houses']:
+        draw_3d_house(houses['x'][i], 0, houses['z'][i])
+
+    car_x, car_z, car_color = oncoming_cars['x'], oncoming_cars['z'], oncoming_cars['color']
+    for i in visible['cars']:
+        draw_3d_car(car_x[i], 0, car_z[i], car_color[i])
+
+def set_telemetry_source(source):
+    """Drive the gauges from a telemetry source (None returns to the keyboard)"""
+    global telemetry, telemetry_time, telemetry_signals
+    if telemetry is not None:
+        telemetry.close()
+    telemetry = source
+    telemetry_time = 0.0
+    telemetry_signals = (False, False)
+    if source is not None:
+        source.start()
+
+def update_gauges():
+    global blink_counter, left_turn, right_turn, left_blink_show, right_blink_show
+    publish_vehicle_state()
     blink_counter += 1
     
+    if telemetry is not None:
+        left_blink_show, right_blink_show = telemetry_signals
+        return
+    
     # Turn signal blink logic
-    current_time = time.time()
+    current_time = clock()
     left_blink_show = False
     right_blink_show = False
     
@@ -195,25 +230,114 @@ def display():
             right_blink_show = ((int(time_since_right // 250)) % 2) == 0
         else:
             right_turn = False
-    draw_speedometer(770, 210, 120, speed)
-    draw_rpm_meter(560, 140, 80, rpm)
-    draw_fuel_meter(980, 130, 70, fuel_level)
-    draw_digital_display(695, 30, 140, 40, speed, "km/h")
-    draw_digital_display(910, 200, 70, 40, engine_temp, "°C")
-    draw_turn_arrow(515, 280, 'left', left_blink_show)
-    draw_turn_arrow(962, 280, 'right', right_blink_show)
-    draw_indicator_light(1050, 50, 10, fuel_warning, (1.0, 0.0, 0.0))
-    
-    # Instructions
-    glColor3f(0.65, 0.66, 0.68)
-    draw_text(20, 20, "UP/DOWN: Speed  |  B: Brake  |  F: Refuel  |  LEFT/RIGHT: Turn Signals  |  ESC: Exit")
-    
+
+def draw_dashboard():
+    # 2D Dashboard Overlay
+    glMatrixMode(GL_PROJECTION)
+    glLoadIdentity()
+    glOrtho(0, WINDOW_WIDTH, 0, WINDOW_HEIGHT, -1, 1)
+    glMatrixMode(GL_MODELVIEW)
+    glLoadIdentity()
+    glDisable(GL_DEPTH_TEST)
+    if overlay_cache_enabled():
+        dashboard_overlay.resize(WINDOW_WIDTH, OVERLAY_HEIGHT)
+        if dashboard_overlay.update():
+            dashboard_overlay.composite()
+            return
+    draw_overlay_widgets()
+
+def draw_overlay_background():
+    """The static panel and frame, cached like the gauge faces"""
+    draw_cached_layer(("overlay_background", WINDOW_WIDTH, PANEL_HEIGHT), draw_overlay_panel)
+
+def draw_overlay_panel():
+    set_color(0.1, 0.1, 0.1)
+    fill_rect(0, 0, WINDOW_WIDTH, PANEL_HEIGHT)
+
+    set_color(0.75, 0.75, 0.78)
+    draw_half_circle_frame(*FRAME, thickness=FRAME_THICKNESS)
+
+def draw_overlay_widgets():
+    """Panel, frame and gauges; backend-neutral so the software framebuffer can draw it"""
+    draw_overlay_background()
+    for widget in overlay_widgets:
+        widget.draw()
+    flush_points()
+
+# Each widget's rectangle bounds its pixels for every input value; the key is
+# what the widget actually shows (the digital readouts show whole numbers)
+overlay_widgets = [
+    OverlayWidget("speedometer", WIDGET_RECTS["speedometer"], lambda: speed,
+                  lambda: draw_speedometer(*SPEEDOMETER, speed)),
+    OverlayWidget("rpm", WIDGET_RECTS["rpm"], lambda: rpm,
+                  lambda: draw_rpm_meter(*RPM_GAUGE, rpm)),
+    OverlayWidget("fuel", WIDGET_RECTS["fuel"], lambda: fuel_level,
+                  lambda: draw_fuel_meter(*FUEL_GAUGE, fuel_level)),
+    OverlayWidget("speed_display", WIDGET_RECTS["speed_display"], lambda: int(speed),
+                  lambda: draw_digital_display(*SPEED_DISPLAY[:4], speed, SPEED_DISPLAY[4])),
+    OverlayWidget("temp_display", WIDGET_RECTS["temp_display"], lambda: int(engine_temp),
+                  lambda: draw_digital_display(*TEMP_DISPLAY[:4], engine_temp, TEMP_DISPLAY[4])),
+    OverlayWidget("left_arrow", WIDGET_RECTS["left_arrow"], lambda: left_blink_show,
+                  lambda: draw_turn_arrow(*LEFT_ARROW, 'left', left_blink_show)),
+    OverlayWidget("right_arrow", WIDGET_RECTS["right_arrow"], lambda: right_blink_show,
+                  lambda: draw_turn_arrow(*RIGHT_ARROW, 'right', right_blink_show)),
+    OverlayWidget("fuel_warning", WIDGET_RECTS["fuel_warning"], lambda: fuel_warning,
+                  lambda: draw_indicator_light(*FUEL_LIGHT, fuel_warning, (1.0, 0.0, 0.0))),
+]
+dashboard_overlay = DirtyOverlay(WINDOW_WIDTH, OVERLAY_HEIGHT, draw_overlay_background, overlay_widgets,
+                                 opaque_height=PANEL_HEIGHT)
+
+def draw_instructions():
+    draw_instruction_text()
     glEnable(GL_DEPTH_TEST)
 
+def draw_instruction_text():
+    set_color(0.65, 0.66, 0.68)
+    draw_text(20, 20, "UP/DOWN: Speed  |  B: Brake  |  F: Refuel  |  LEFT/RIGHT: Turn Signals  |  ESC: Exit")
+    flush_points()
+
+def render_frame():
+    """Draw one complete frame (3D scene, dashboard overlay, instructions)"""
+    update_gauges()
+    draw_scene_3d()
+    draw_dashboard()
+    draw_instructions()
+
+def display():
+    render_frame()
+    draw_profiler_hud(WINDOW_WIDTH, WINDOW_HEIGHT)
     glutSwapBuffers()
 
+def reshape(width, height):
+    global WINDOW_WIDTH, WINDOW_HEIGHT
+    WINDOW_WIDTH = max(1, width)
+    WINDOW_HEIGHT = max(1, height)
+    glViewport(0, 0, WINDOW_WIDTH, WINDOW_HEIGHT)
+    invalidate_gauge_faces()
+    dashboard_overlay.invalidate()
+
+def brake():
+    vehicle.brake()
+
+def refuel():
+    vehicle.refuel()
+
+def signal_left():
+    global left_turn, right_turn, left_blink_time
+    if not left_turn:
+        left_turn = True
+        left_blink_time = clock()
+        right_turn = False
+
+def signal_right():
+    global left_turn, right_turn, right_blink_time
+    if not right_turn:
+        right_turn = True
+        right_blink_time = clock()
+        left_turn = False
+
 def keyboard(key, x, y):
-    global speed, fuel_level, target_fuel, left_turn, right_turn, fuel_warning, last_activity_time
+    global last_activity_time
     
     last_activity_time = time.time()
     
@@ -221,14 +345,20 @@ def keyboard(key, x, y):
         glutLeaveMainLoop()
     
     if key == b'b' or key == b'B':
-        speed = max(0, speed - 20)
+        brake()
     
     if key == b'f' or key == b'F':
-        target_fuel = 100
-        fuel_warning = False
+        refuel()
+    
+    if key == b'p' or key == b'P':
+        set_profiling(not profiling_enabled(), sys.modules[__name__])
+    
+    if (key == b't' or key == b'T') and profiling_enabled():
+        count = write_chrome_trace(TRACE_PATH)
+        print(f"wrote {count} trace events to {TRACE_PATH}")
 
 def special_keys(key, x, y):
-    global keys_pressed, left_turn, right_turn, last_activity_time, left_blink_time, right_blink_time
+    global keys_pressed, last_activity_time
     
     last_activity_time = time.time()
     
@@ -237,15 +367,9 @@ def special_keys(key, x, y):
     elif key == GLUT_KEY_DOWN:
         keys_pressed['down'] = True
     elif key == GLUT_KEY_LEFT:
-        if not left_turn:
-            left_turn = True
-            left_blink_time = time.time()
-            right_turn = False
+        signal_left()
     elif key == GLUT_KEY_RIGHT:
-        if not right_turn:
-            right_turn = True
-            right_blink_time = time.time()
-            left_turn = False
+        signal_right()
     
     glutPostRedisplay()
 
@@ -257,74 +381,64 @@ def special_keys_up(key, x, y):
     elif key == GLUT_KEY_DOWN:
         keys_pressed['down'] = False
 
-def animate(value):
-    global speed, target_speed, keys_pressed, camera_z, oncoming_cars, trees, clouds
-    
-    dt = 0.016
-    
-    if keys_pressed['up']:
-        if target_speed < 230:
-            target_speed += 3
-    
-    if keys_pressed['down']:
-        if target_speed > 0:
-            target_speed -= 3
-    
-    if speed < target_speed:
-        speed = min(speed + 1.6, target_speed)
-    elif speed > target_speed:
-        speed = max(speed - 1.6, target_speed)
-    
-    v_ego = speed / 3.6
-    camera_z += v_ego * dt
-    
-    for car in oncoming_cars:
-        v_onc = 60 / 3.6
-        car['z'] -= v_onc * dt
-    
-    oncoming_cars[:] = [car for car in oncoming_cars if car['z'] > camera_z - 10]
-    
-    if random.random() < 0.02:
-        new_z = camera_z + 300 + random.uniform(0, 100)
-        new_color = (random.uniform(0.5, 1), random.uniform(0, 0.5), random.uniform(0, 0.5))
-        oncoming_cars.append({'x': -3, 'z': new_z, 'color': new_color})
-    
-    if len(trees) > 0:
-        max_tree_z = max(tree['z'] for tree in trees)
-        if max_tree_z < camera_z + 500:
-            new_z = max_tree_z + 30
-            trees.append({
-                'x': -18 - random.uniform(0, 3),
-                'z': new_z,
-                'height': 8 + random.uniform(0, 4),
-                'type': random.choice(['pine', 'round'])
-            })
-            trees.append({
-                'x': 18 + random.uniform(0, 3),
-                'z': new_z,
-                'height': 8 + random.uniform(0, 4),
-                'type': random.choice(['pine', 'round'])
-            })
+def simulation_step(dt):
+    """One fixed step: driving model, traffic, streamed world chunks and clouds"""
+    global previous_vehicle, telemetry_time, telemetry_signals
+    
+    previous_vehicle = vehicle.copy()
+    if telemetry is not None:
+        telemetry_time += dt
+        sample = telemetry.sample(telemetry_time)
+        if sample is not None:
+            telemetry_signals = apply_sample(vehicle, sample)
+        vehicle.distance += vehicle.speed / 3.6 * dt
+    else:
+        vehicle.accelerating = keys_pressed['up']
+        vehicle.decelerating = keys_pressed['down']
+        vehicle.step(dt)
+    ego_z = vehicle.distance
     
-    trees[:] = [tree for tree in trees if tree['z'] > camera_z - 100]
+    advance_column(oncoming_cars, 'z', -ONCOMING_SPEED, dt)
+    car_index.drift(-ONCOMING_SPEED * dt)
     
-    for cloud in clouds:
-        cloud['x'] += cloud['speed'] * dt
-        if cloud['x'] > 100:
-            cloud['x'] = -100
+    world.update(ego_z, get_view_distance())
     
+    advance_column(clouds, 'x', 'speed', dt)
+    wrap_column(clouds, 'x', 100, -100)
+
+simulation = FixedTimestep(simulation_step, SIM_DT)
+
+def advance_simulation(elapsed):
+    """Feed elapsed seconds to the fixed-step simulation; returns steps run"""
+    return simulation.advance(elapsed)
+
+def animate(value):
+    global last_tick_time
+    now = time.perf_counter()
+    if last_tick_time is not None:
+        advance_simulation(min(now - last_tick_time, MAX_FRAME_TIME))
+    last_tick_time = now
     glutPostRedisplay()
     glutTimerFunc(16, animate, 0)
+
 def initialize():
     glViewport(0, 0, WINDOW_WIDTH, WINDOW_HEIGHT)
     glEnable(GL_DEPTH_TEST)
     glClearColor(0.4, 0.6, 0.9, 1.0)  
-    
-    initialize_trees()
+    set_raster_mode(RASTER_BATCHED)
+    build_glyph_atlas()
     
     initialize_clouds()
-def main():
+    world.update(vehicle.distance, get_view_distance())
+def main(argv=None):
+    import argparse
     global last_activity_time
+    parser = argparse.ArgumentParser(description="Car dashboard simulation")
+    parser.add_argument("--telemetry", metavar="SOURCE",
+                        help="drive the gauges from a .csv or binary log, tcp://host:port or unix://path")
+    parser.add_argument("--rate", type=float, default=1.0, help="log replay speed multiplier")
+    parser.add_argument("--loop", action="store_true", help="restart the log when it ends")
+    args = parser.parse_args(argv)
     last_activity_time = time.time()
     
     glutInit()
@@ -335,12 +449,18 @@ def main():
     
     initialize()
     glutDisplayFunc(display)
+    glutReshapeFunc(reshape)
     glutKeyboardFunc(keyboard)
     glutSpecialFunc(special_keys)
     glutSpecialUpFunc(special_keys_up)
     glutTimerFunc(0, animate, 0)
+    world.start_worker()
+    if args.telemetry:
+        set_telemetry_source(open_source(args.telemetry, args.rate, args.loop))
     
     glutMainLoop()
+    world.stop_worker()
+    set_telemetry_source(None)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,185 @@
+"""
+overlay.py - Change-driven dashboard overlay cached in a texture
+The 2D overlay is rendered into a persistent offscreen texture. Each frame
+only the widgets whose inputs changed are redrawn, scissored to their
+screen rectangles, and the texture is composited over the 3D scene with a
+single textured quad. A parked car therefore costs one quad per frame
+instead of a full gauge redraw.
+"""
+
+from OpenGL.GL import *
+from algorithms import flush_points
+
+_overlay_cache_enabled = True
+
+
+def set_overlay_cache(enabled):
+    """Composite the overlay from its cached texture (True) or redraw it every frame"""
+    global _overlay_cache_enabled
+    _overlay_cache_enabled = enabled
+
+
+def overlay_cache_enabled():
+    return _overlay_cache_enabled
+
+
+class OverlayWidget:
+    """One independently redrawn part of the overlay.
+
+    rect is (x0, y0, x1, y1) in overlay pixels and must bound everything
+    draw() can touch; key() returns the inputs that determine its pixels.
+    """
+
+    def __init__(self, name, rect, key, draw):
+        self.name = name
+        self.rect = rect
+        self.key = key
+        self.draw = draw
+
+    def intersects(self, rect):
+        x0, y0, x1, y1 = self.rect
+        return x0 < rect[2] and rect[0] < x1 and y0 < rect[3] and rect[1] < y1
+
+
+class DirtyOverlay:
+    """Overlay texture of width x height redrawn widget by widget.
+
+    background is drawn under every redrawn rectangle; widgets are drawn
+    in list order, so a partial redraw reproduces a full redraw exactly.
+    Rows below opaque_height must be fully covered by the background; they
+    are composited with a framebuffer blit instead of a textured quad.
+    """
+
+    def __init__(self, width, height, background, widgets, opaque_height=0):
+        self.width = width
+        self.height = height
+        self.opaque_height = opaque_height
+        self.background = background
+        self.widgets = widgets
+        self.texture = None
+        self.framebuffer = None
+        self.keys = {}
+        self.redrawn = []
+        self.available = True
+
+    def _create(self):
+        try:
+            self.framebuffer = glGenFramebuffers(1)
+        except Exception:
+            self.available = False
+            return
+        self.texture = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_NEAREST)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA8, self.width, self.height, 0, GL_RGBA, GL_UNSIGNED_BYTE, None)
+        glBindTexture(GL_TEXTURE_2D, 0)
+
+        previous = glGetIntegerv(GL_FRAMEBUFFER_BINDING)
+        glBindFramebuffer(GL_FRAMEBUFFER, self.framebuffer)
+        glFramebufferTexture2D(GL_FRAMEBUFFER, GL_COLOR_ATTACHMENT0, GL_TEXTURE_2D, self.texture, 0)
+        if glCheckFramebufferStatus(GL_FRAMEBUFFER) != GL_FRAMEBUFFER_COMPLETE:
+            self.available = False
+        glBindFramebuffer(GL_FRAMEBUFFER, previous)
+
+    def resize(self, width, height):
+        if (width, height) != (self.width, self.height):
+            self.release()
+            self.width = width
+            self.height = height
+
+    def invalidate(self):
+        """Force a full redraw on the next update (e.g. after a resize)"""
+        self.keys.clear()
+
+    def release(self):
+        if self.framebuffer is not None:
+            glDeleteFramebuffers(1, [self.framebuffer])
+            glDeleteTextures([self.texture])
+        self.framebuffer = None
+        self.texture = None
+        self.keys.clear()
+
+    def update(self):
+        """Redraw the widgets whose key changed; returns False without an FBO"""
+        if self.framebuffer is None and self.available:
+            self._create()
+        if not self.available:
+            return False
+
+        keys = {widget.name: widget.key() for widget in self.widgets}
+        if not self.keys:
+            dirty = [(0, 0, self.width, self.height)]
+        else:
+            dirty = [widget.rect for widget in self.widgets if keys[widget.name] != self.keys.get(widget.name)]
+        self.keys = keys
+        self.redrawn = dirty
+        if not dirty:
+            return True
+
+        flush_points()
+        previous = glGetIntegerv(GL_FRAMEBUFFER_BINDING)
+        glPushAttrib(GL_VIEWPORT_BIT | GL_SCISSOR_BIT | GL_COLOR_BUFFER_BIT | GL_ENABLE_BIT)
+        glBindFramebuffer(GL_FRAMEBUFFER, self.framebuffer)
+        glViewport(0, 0, self.width, self.height)
+        glMatrixMode(GL_PROJECTION)
+        glPushMatrix()
+        glLoadIdentity()
+        glOrtho(0, self.width, 0, self.height, -1, 1)
+        glMatrixMode(GL_MODELVIEW)
+        glPushMatrix()
+        glLoadIdentity()
+        glDisable(GL_DEPTH_TEST)
+        glEnable(GL_SCISSOR_TEST)
+        glClearColor(0.0, 0.0, 0.0, 0.0)
+
+        for rect in dirty:
+            x0, y0, x1, y1 = rect
+            glScissor(x0, y0, x1 - x0, y1 - y0)
+            glClear(GL_COLOR_BUFFER_BIT)
+            self.background()
+            for widget in self.widgets:
+                if widget.intersects(rect):
+                    widget.draw()
+            flush_points()
+
+        glMatrixMode(GL_PROJECTION)
+        glPopMatrix()
+        glMatrixMode(GL_MODELVIEW)
+        glPopMatrix()
+        glPopAttrib()
+        glBindFramebuffer(GL_FRAMEBUFFER, previous)
+        return True
+
+    def composite(self):
+        """Draw the cached overlay at the window origin (pixel-aligned 2D projection)"""
+        opaque = min(self.opaque_height, self.height)
+        if opaque:
+            previous = glGetIntegerv(GL_READ_FRAMEBUFFER_BINDING)
+            glBindFramebuffer(GL_READ_FRAMEBUFFER, self.framebuffer)
+            glBlitFramebuffer(0, 0, self.width, opaque, 0, 0, self.width, opaque,
+                              GL_COLOR_BUFFER_BIT, GL_NEAREST)
+            glBindFramebuffer(GL_READ_FRAMEBUFFER, previous)
+        if opaque == self.height:
+            return
+
+        bottom = opaque / self.height
+        glPushAttrib(GL_ENABLE_BIT | GL_TEXTURE_BIT | GL_COLOR_BUFFER_BIT)
+        glEnable(GL_TEXTURE_2D)
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glTexEnvi(GL_TEXTURE_ENV, GL_TEXTURE_ENV_MODE, GL_REPLACE)
+        glEnable(GL_ALPHA_TEST)
+        glAlphaFunc(GL_GREATER, 0.5)
+        glBegin(GL_QUADS)
+        glTexCoord2f(0, bottom)
+        glVertex2f(0, opaque)
+        glTexCoord2f(1, bottom)
+        glVertex2f(self.width, opaque)
+        glTexCoord2f(1, 1)
+        glVertex2f(self.width, self.height)
+        glTexCoord2f(0, 1)
+        glVertex2f(0, self.height)
+        glEnd()
+        glPopAttrib()
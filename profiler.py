@@ -0,0 +1,281 @@
+"""
+profiler.py - Opt-in per-phase frame profiler and on-screen HUD
+set_profiling(True, dashboard) swaps the dashboard module's phase functions
+(scene setup, road, clouds, trees, houses, cars, overlay frame, each gauge,
+text, animate) and the OpenGL entry points of the drawing modules for
+timing and counting wrappers; set_profiling(False) puts the originals
+back, so a disabled profiler costs nothing. Each phase records wall time,
+GL calls, vertices submitted (glVertex*, glDrawArrays* counts) and pixels
+queued by the point rasterizers of algorithms.py.
+
+Results are averaged over a rolling window of frames for the HUD and kept
+as Chrome trace events (open the JSON in chrome://tracing or Perfetto).
+Vertices inside display lists (glCallList) are not visible to the counters.
+"""
+
+import collections
+import contextlib
+import json
+import os
+import sys
+import time
+
+from OpenGL.GL import *
+from algorithms import set_color, get_color, fill_rect, flush_points
+from text_atlas import draw_string
+
+# Phase name -> dashboard functions timed under it, in HUD order
+PHASES = (
+    ("frame", ("render_frame",)),
+    ("animate", ("animate",)),
+    ("update", ("update_gauges",)),
+    ("scene", ("draw_scene_3d",)),
+    ("clear_projection", ("setup_projection",)),
+    ("ground_road", ("draw_road_tile", "draw_ground", "draw_3d_road")),
+    ("cull", ("cull_scene",)),
+    ("clouds", ("draw_clouds", "draw_cloud")),
+    ("trees", ("draw_trees", "draw_tree_impostors", "draw_tree", "draw_tree_impostor")),
+    ("houses", ("draw_houses", "draw_3d_house")),
+    ("cars", ("draw_cars", "draw_3d_car")),
+    ("overlay", ("draw_dashboard",)),
+    ("overlay_frame", ("draw_overlay_background",)),
+    ("speedometer", ("draw_speedometer",)),
+    ("rpm", ("draw_rpm_meter",)),
+    ("fuel", ("draw_fuel_meter",)),
+    ("digital_displays", ("draw_digital_display",)),
+    ("turn_arrows", ("draw_turn_arrow",)),
+    ("indicators", ("draw_indicator_light",)),
+    ("text", ("draw_instructions",)),
+)
+# A finished top-level phase of these names closes one frame of statistics
+FRAME_PHASES = ("frame",)
+# Modules whose GL calls are counted (besides the dashboard module itself)
+COUNTED_MODULES = ("algorithms", "components", "scene", "instancing", "overlay", "text_atlas")
+HUD_WINDOW = 60            # frames averaged by the HUD
+TRACE_EVENTS = 200000      # newest trace events kept for export
+HUD_LINE_HEIGHT = 14
+
+_enabled = False
+_patches = []              # (namespace, name, original) to restore
+_stack = []                # open phases: (name, start ns, counts at start)
+_counts = [0, 0, 0]        # running GL calls, vertices, queued pixels
+_pending = {}              # phase -> [ns, calls, vertices, pixels] since the last frame
+_frames = collections.deque(maxlen=HUD_WINDOW)
+_events = collections.deque(maxlen=TRACE_EVENTS)
+_origin = 0
+
+
+def set_profiling(enabled, dashboard=None):
+    """Install the wrappers into dashboard (the main module), or remove them"""
+    global _enabled, _origin
+    if enabled == _enabled:
+        return
+    if enabled:
+        if dashboard is None:
+            raise ValueError("profiling needs the dashboard module to instrument")
+        reset_profile()
+        _origin = time.perf_counter_ns()
+        _install(dashboard)
+    else:
+        for namespace, name, original in reversed(_patches):
+            namespace[name] = original
+        _patches.clear()
+        _stack.clear()
+    _enabled = enabled
+
+
+def profiling_enabled():
+    return _enabled
+
+
+def reset_profile():
+    """Forget all collected statistics and trace events"""
+    _pending.clear()
+    _frames.clear()
+    _events.clear()
+
+
+def _patch(namespace, name, wrapper):
+    _patches.append((namespace, name, namespace[name]))
+    namespace[name] = wrapper
+
+
+def _install(dashboard):
+    namespaces = [vars(dashboard)]
+    overlay = getattr(dashboard, "dashboard_overlay", None)
+    if overlay is not None:
+        namespaces.append(vars(overlay))    # holds its own reference to the background
+    for phase_name, functions in PHASES:
+        for function_name in functions:
+            original = getattr(dashboard, function_name, None)
+            if original is None:
+                continue
+            wrapper = _timed(phase_name, original)
+            for namespace in namespaces:
+                for name, value in list(namespace.items()):
+                    if value is original:
+                        _patch(namespace, name, wrapper)
+
+    modules = [sys.modules[name] for name in COUNTED_MODULES if name in sys.modules]
+    counters = {}
+    for module in [dashboard] + modules:
+        namespace = vars(module)
+        for name, value in list(namespace.items()):
+            if name.startswith("gl") and not name.startswith("glut") and callable(value):
+                if id(value) not in counters:    # some PyOpenGL wrappers are unhashable
+                    counters[id(value)] = _counted(name, value)
+                _patch(namespace, name, counters[id(value)])
+    algorithms = sys.modules["algorithms"]
+    _patch(vars(algorithms), "_emit_points", _counted_points(algorithms._emit_points))
+
+
+def _timed(phase_name, function):
+    def timed(*args, **kwargs):
+        if _stack and _stack[-1][0] == phase_name:
+            return function(*args, **kwargs)
+        _begin(phase_name)
+        try:
+            return function(*args, **kwargs)
+        finally:
+            _end()
+    timed.__wrapped__ = function
+    return timed
+
+
+def _counted(name, function):
+    counts = _counts
+    if name.startswith("glVertex"):
+        def counted(*args):
+            counts[0] += 1
+            counts[1] += 1
+            return function(*args)
+    elif name in ("glDrawArrays", "glDrawArraysInstanced", "glDrawElements", "glDrawElementsInstanced"):
+        count_index = 2 if name.startswith("glDrawArrays") else 1
+        instanced = name.endswith("Instanced")
+
+        def counted(*args):
+            counts[0] += 1
+            vertices = int(args[count_index])
+            if instanced:
+                vertices *= int(args[-1] if count_index == 2 else args[4])
+            counts[1] += vertices
+            return function(*args)
+    else:
+        def counted(*args, **kwargs):
+            counts[0] += 1
+            return function(*args, **kwargs)
+    counted.__wrapped__ = function
+    return counted
+
+
+def _counted_points(function):
+    def counted(points, size):
+        _counts[2] += len(points)
+        return function(points, size)
+    counted.__wrapped__ = function
+    return counted
+
+
+def _begin(name):
+    _stack.append((name, time.perf_counter_ns(), tuple(_counts)))
+
+
+def _end():
+    name, start, counts = _stack.pop()
+    now = time.perf_counter_ns()
+    calls = _counts[0] - counts[0]
+    vertices = _counts[1] - counts[1]
+    pixels = _counts[2] - counts[2]
+    totals = _pending.setdefault(name, [0, 0, 0, 0])
+    totals[0] += now - start
+    totals[1] += calls
+    totals[2] += vertices
+    totals[3] += pixels
+    _events.append((name, start - _origin, now - start, len(_stack), calls, vertices, pixels))
+    if not _stack and name in FRAME_PHASES:
+        _frames.append(dict(_pending))
+        _pending.clear()
+
+
+@contextlib.contextmanager
+def phase(name):
+    """Time a block as a phase (e.g. an explicit "frame" around headless draws)"""
+    if not _enabled:
+        yield
+        return
+    _begin(name)
+    try:
+        yield
+    finally:
+        _end()
+
+
+def profile_summary():
+    """Mean per frame over the rolling window: {phase: (ms, gl calls, vertices, pixels)}"""
+    frames = list(_frames)
+    if not frames:
+        return {}
+    order = [name for name, _ in PHASES]
+    names = sorted({name for frame in frames for name in frame},
+                   key=lambda name: order.index(name) if name in order else len(order))
+    summary = {}
+    for name in names:
+        totals = [frame.get(name, (0, 0, 0, 0)) for frame in frames]
+        summary[name] = (sum(t[0] for t in totals) / len(frames) / 1e6,
+                         sum(t[1] for t in totals) / len(frames),
+                         sum(t[2] for t in totals) / len(frames),
+                         sum(t[3] for t in totals) / len(frames))
+    return summary
+
+
+def format_profile(summary=None):
+    """Text table of profile_summary(), one phase per line"""
+    summary = profile_summary() if summary is None else summary
+    lines = [f"{'phase':<18}{'ms':>8}{'calls':>8}{'verts':>9}{'pixels':>9}"]
+    for name, (ms, calls, vertices, pixels) in summary.items():
+        lines.append(f"{name:<18}{ms:8.3f}{calls:8.0f}{vertices:9.0f}{pixels:9.0f}")
+    return "\n".join(lines)
+
+
+def chrome_trace():
+    """Collected phases as a Chrome trace-event document"""
+    pid = os.getpid()
+    events = [{
+        "name": name, "cat": "dashboard", "ph": "X", "pid": pid, "tid": 0,
+        "ts": start / 1000.0, "dur": duration / 1000.0,
+        "args": {"depth": depth, "gl_calls": calls, "vertices": vertices, "pixels": pixels},
+    } for name, start, duration, depth, calls, vertices, pixels in _events]
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def write_chrome_trace(path):
+    """Write chrome_trace() to path; returns the number of events"""
+    trace = chrome_trace()
+    with open(path, "w") as handle:
+        json.dump(trace, handle)
+    return len(trace["traceEvents"])
+
+
+def draw_profiler_hud(width, height):
+    """Draw the rolling per-phase table in the top-left corner (no-op when disabled)"""
+    if not _enabled:
+        return
+    lines = format_profile().splitlines()
+    if len(lines) < 2:
+        return
+    color = get_color()
+    glMatrixMode(GL_PROJECTION)
+    glLoadIdentity()
+    glOrtho(0, width, 0, height, -1, 1)
+    glMatrixMode(GL_MODELVIEW)
+    glLoadIdentity()
+    glDisable(GL_DEPTH_TEST)
+    top = height - 8
+    set_color(0.0, 0.0, 0.0)
+    fill_rect(6, top - HUD_LINE_HEIGHT * len(lines) - 6, 6 + 52 * 7, top)
+    set_color(0.3, 1.0, 0.4)
+    for index, line in enumerate(lines):
+        draw_string(12, top - HUD_LINE_HEIGHT * (index + 1), line)
+    flush_points()
+    set_color(*color)
+    glEnable(GL_DEPTH_TEST)
@@ -0,0 +1,195 @@
+"""
+replay.py - Batch snapshot rendering of recorded drives
+Replays a telemetry log (or a scripted input timeline) through the full
+main.render_frame() and writes every Nth frame to a PNG, without a window.
+Frames are split into contiguous ranges, one per worker process; each
+worker owns its own offscreen GL context, silently simulates up to the
+start of its range and then renders it, so the images match a
+single-process run exactly.
+
+Usage:
+    python replay.py drive.tlog frames/ --every 10 --workers 8
+    python replay.py drive.csv frames/ --every 1 --start 60 --end 90
+    python replay.py --timeline drive --frames 600 frames/
+"""
+
+import argparse
+import concurrent.futures
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+from headless import BACKENDS, FRAME_DT, OffscreenTarget, select_platform, load_timeline, apply_action
+
+FRAME_NAME = "frame_{:06d}.png"
+
+
+def split_frames(frames, workers):
+    """Split a sorted frame list into at most workers contiguous, balanced ranges"""
+    workers = max(1, min(workers, len(frames)))
+    size, extra = divmod(len(frames), workers)
+    ranges = []
+    first = 0
+    for worker in range(workers):
+        last = first + size + (worker < extra)
+        ranges.append(frames[first:last])
+        first = last
+    return [frames for frames in ranges if frames]
+
+
+def log_frame_count(path):
+    """Number of FRAME_DT frames covering a recorded telemetry log"""
+    from telemetry import open_source
+    source = open_source(path)
+    if not hasattr(source, "duration"):
+        raise ValueError(f"{path}: only recorded logs can be replayed, not live streams")
+    source.start()
+    if hasattr(source, "wait"):
+        source.wait()
+    frames = int(source.duration() / FRAME_DT) + 1
+    source.close()
+    return frames
+
+
+def render_range(job):
+    """Worker: render job["frames"] (ascending) into job["output"].
+
+    Runs in a fresh process, so the GL platform can still be selected.
+    Returns (frames written, seconds simulating up to the range, seconds rendering).
+    """
+    select_platform(job["backend"])
+    target = OffscreenTarget(job["width"], job["height"], job["backend"])
+
+    import text_atlas
+    import algorithms
+    from softraster import write_png
+    from telemetry import open_source
+    import main as dashboard
+
+    if job["backend"] == "egl":
+        text_atlas.set_glut_text(False)
+    random.seed(job["seed"])
+    dashboard.world.reset(job["seed"])
+    dashboard.WINDOW_WIDTH = job["width"]
+    dashboard.WINDOW_HEIGHT = job["height"]
+    sim_time = [0.0]
+    dashboard.clock = lambda: sim_time[0]
+    dashboard.initialize()
+    if job["backend"] == "egl":
+        text_atlas.build_bitmap_atlas()
+    algorithms.set_raster_mode(job["raster"])
+
+    events = {}
+    if job["telemetry"]:
+        source = open_source(job["telemetry"])
+        dashboard.set_telemetry_source(source)
+        if hasattr(source, "wait"):
+            source.wait()
+    else:
+        events = load_timeline(job["timeline"])
+
+    def step(frame):
+        for action in events.get(frame, ()):
+            apply_action(dashboard, action)
+        dashboard.advance_simulation(FRAME_DT)
+        sim_time[0] += FRAME_DT
+
+    wanted = job["frames"]
+    start = time.perf_counter()
+    for frame in range(wanted[0]):
+        step(frame)
+        dashboard.update_gauges()
+    simulated = time.perf_counter()
+    wanted = set(wanted)
+    for frame in range(job["frames"][0], job["frames"][-1] + 1):
+        step(frame)
+        if frame in wanted:
+            dashboard.render_frame()
+            write_png(os.path.join(job["output"], FRAME_NAME.format(frame)), target.read_rgb())
+        else:
+            dashboard.update_gauges()
+    rendered = time.perf_counter()
+    dashboard.set_telemetry_source(None)
+    # A worker may run another job in a new context; drop this one's buffers
+    dashboard.release_scene()
+    return len(wanted), simulated - start, rendered - simulated
+
+
+def replay(output, telemetry=None, timeline=None, frames=None, every=1, start=0.0, end=None,
+           workers=None, backend="egl", width=1500, height=1000, raster="batched", seed=0):
+    """Render every Nth frame of a recorded drive to output/; returns a summary dict"""
+    if telemetry is None and timeline is None:
+        raise ValueError("give a telemetry log or a timeline")
+    total = frames if frames is not None else log_frame_count(telemetry)
+    first = int(round(start / FRAME_DT))
+    last = total if end is None else min(total, int(round(end / FRAME_DT)) + 1)
+    selected = list(range(first, last, max(1, every)))
+    if not selected:
+        raise ValueError("no frames selected")
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(output, exist_ok=True)
+
+    base = {"output": output, "telemetry": telemetry, "timeline": timeline, "backend": backend,
+            "width": width, "height": height, "raster": raster, "seed": seed}
+    jobs = [dict(base, frames=frames) for frames in split_frames(selected, workers)]
+    began = time.perf_counter()
+    if len(jobs) == 1:
+        results = [render_range(jobs[0])]
+    else:
+        # spawn: every worker imports OpenGL fresh and creates its own context
+        context = multiprocessing.get_context("spawn")
+        with concurrent.futures.ProcessPoolExecutor(len(jobs), mp_context=context) as pool:
+            results = list(pool.map(render_range, jobs))
+    elapsed = time.perf_counter() - began
+    written = sum(count for count, _, _ in results)
+    return {
+        "frames": written,
+        "workers": len(jobs),
+        "seconds": elapsed,
+        "frames_per_second": written / elapsed,
+        "simulate_seconds": [round(seconds, 3) for _, seconds, _ in results],
+        "render_seconds": [round(seconds, 3) for _, _, seconds in results],
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Render frames of a recorded drive to PNG files")
+    parser.add_argument("inputs", nargs="+", metavar="[LOG] OUTPUT",
+                        help="telemetry log (.csv or binary) and output directory")
+    parser.add_argument("--timeline", help="replay a scripted input timeline instead of a log "
+                        "(built-in name or JSON file); needs --frames")
+    parser.add_argument("--frames", type=int, help="frame count (default: the whole log)")
+    parser.add_argument("--every", type=int, default=1, help="render every Nth frame")
+    parser.add_argument("--start", type=float, default=0.0, help="first second to render")
+    parser.add_argument("--end", type=float, help="last second to render")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per core)")
+    parser.add_argument("--backend", choices=BACKENDS, default="egl")
+    parser.add_argument("--size", default="1500x1000", help="image size WxH")
+    parser.add_argument("--raster", choices=("immediate", "batched"), default="batched")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    expected = 1 if args.timeline else 2
+    if len(args.inputs) != expected:
+        parser.error("expected OUTPUT with --timeline" if args.timeline else "expected LOG OUTPUT")
+    if args.timeline and args.frames is None:
+        parser.error("--timeline needs --frames")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    telemetry = None if args.timeline else args.inputs[0]
+    result = replay(args.inputs[-1], telemetry=telemetry, timeline=args.timeline, frames=args.frames,
+                    every=args.every, start=args.start, end=args.end, workers=args.workers,
+                    backend=args.backend, width=width, height=height, raster=args.raster,
+                    seed=args.seed)
+    print(f"{result['frames']} frames with {result['workers']} workers in {result['seconds']:.2f} s "
+          f"({result['frames_per_second']:.1f} frames/s)")
+    print(f"per worker: simulate {result['simulate_seconds']} s, render {result['render_seconds']} s")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,13 +5,14 @@ from OpenGL.GLU import *
 import time
 import math
 import random
+import ctypes
+import numpy as np
 from components import *
-from main import *
-from algorithms import rotate_point
-def draw_3d_road():
+from algorithms import unit_circle
+def draw_3d_road(camera_z, view_distance=500):
     """Draw the road with improved texturing"""
     near_z = camera_z
-    far_z = camera_z + 500
+    far_z = camera_z + view_distance
     
     # Main road
     glColor3f(0.3, 0.3, 0.3)
@@ -49,10 +50,106 @@ def draw_3d_road():
             glEnd()
         current_z += pattern_length
 
-def draw_ground():
+DASH_LENGTH = 20
+DASH_GAP = 15
+DASH_PATTERN = DASH_LENGTH + DASH_GAP
+ROAD_COLOR = (0.3, 0.3, 0.3)
+GRASS_COLOR = (0.2, 0.5, 0.2)
+EDGE_COLOR = (0.8, 0.8, 0.8)
+DASH_COLOR = (1, 0.95, 0)
+_road_tiles = {}
+
+
+def _road_tile(view_distance):
+    """Interleaved xyz/rgb float32 vertices for the ground and road.
+
+    Grass and asphalt quads and the edge lines span z 0..1 and are
+    stretched to the view distance; the center dashes are laid out in
+    road units from the start of a dash pattern. Returns the vertex array
+    and the (first, count) ranges of the quads, edges and dashes.
+    """
+    def vertices(color, *points):
+        return [(*point, *color) for point in points]
+
+    rows = vertices(GRASS_COLOR, (-50, 0, 0), (-10, 0, 0), (-10, 0, 1), (-50, 0, 1),
+                    (10, 0, 0), (50, 0, 0), (50, 0, 1), (10, 0, 1))
+    rows += vertices(ROAD_COLOR, (-10, 0, 0), (10, 0, 0), (10, 0, 1), (-10, 0, 1))
+    rows += vertices(EDGE_COLOR, (-5, 0.01, 0), (-5, 0.01, 1), (5, 0.01, 0), (5, 0.01, 1))
+    dashes = math.ceil(view_distance / DASH_PATTERN) + 1
+    for i in range(dashes):
+        start = DASH_GAP + i * DASH_PATTERN
+        rows += vertices(DASH_COLOR, (0, 0.01, start), (0, 0.01, start + DASH_LENGTH))
+    return np.array(rows, dtype=np.float32), ((0, 12), (12, 4), (16, 2 * dashes))
+
+
+def release_road_tiles():
+    """Delete the road tile vertex buffers; call while their GL context is
+    current, before it is destroyed or replaced"""
+    buffers = [buffer for buffer, _ in _road_tiles.values()]
+    if buffers:
+        glDeleteBuffers(len(buffers), buffers)
+    _road_tiles.clear()
+
+
+def draw_road_tile(camera_z, view_distance=500):
+    """draw_ground plus draw_3d_road from one prebuilt vertex buffer.
+
+    The buffer is built once per view distance; each frame only moves it
+    with the modelview matrix (the dashes modulo the 35-unit pattern), so
+    the cost no longer depends on how many dashes are in view.
+    """
+    if view_distance not in _road_tiles:
+        vertices, ranges = _road_tile(view_distance)
+        buffer = glGenBuffers(1)
+        glBindBuffer(GL_ARRAY_BUFFER, buffer)
+        glBufferData(GL_ARRAY_BUFFER, vertices.nbytes, vertices, GL_STATIC_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        _road_tiles[view_distance] = (buffer, ranges)
+    buffer, (quads, edges, dashes) = _road_tiles[view_distance]
+    near_z = camera_z
+    far_z = camera_z + view_distance
+    pattern_start = near_z - (near_z % DASH_PATTERN)
+
+    glBindBuffer(GL_ARRAY_BUFFER, buffer)
+    glEnableClientState(GL_VERTEX_ARRAY)
+    glEnableClientState(GL_COLOR_ARRAY)
+    stride = 6 * 4
+    glVertexPointer(3, GL_FLOAT, stride, ctypes.c_void_p(0))
+    glColorPointer(3, GL_FLOAT, stride, ctypes.c_void_p(3 * 4))
+
+    glPushMatrix()
+    glTranslatef(0, 0, near_z)
+    glScalef(1, 1, view_distance)
+    glDrawArrays(GL_QUADS, *quads)
+    glLineWidth(3)
+    glDrawArrays(GL_LINES, *edges)
+    glPopMatrix()
+
+    # Whole dashes come from the buffer; the one cut by far_z is drawn directly
+    whole = max(0, min(math.floor((far_z - pattern_start - DASH_PATTERN) / DASH_PATTERN) + 1,
+                       dashes[1] // 2))
+    glPushMatrix()
+    glTranslatef(0, 0, pattern_start)
+    glDrawArrays(GL_LINES, dashes[0], 2 * whole)
+    glPopMatrix()
+
+    glDisableClientState(GL_COLOR_ARRAY)
+    glDisableClientState(GL_VERTEX_ARRAY)
+    glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    cut_start = pattern_start + DASH_GAP + whole * DASH_PATTERN
+    if cut_start < far_z:
+        glColor3f(*DASH_COLOR)
+        glBegin(GL_LINES)
+        glVertex3f(0, 0.01, cut_start)
+        glVertex3f(0, 0.01, far_z)
+        glEnd()
+
+
+def draw_ground(camera_z, view_distance=500):
     """Draw grass ground on sides of road"""
     near_z = camera_z
-    far_z = camera_z + 500
+    far_z = camera_z + view_distance
     
     # Left grass
     glColor3f(0.2, 0.5, 0.2)
@@ -123,7 +220,27 @@ def draw_tree(x, y, z, height, tree_type):
     
     glPopMatrix()
 
-def draw_cloud(x, y, z, size):
+def draw_tree_impostor(x, y, z, height):
+    """Far level of detail: trunk quad plus one canopy triangle"""
+    glPushMatrix()
+    glTranslatef(x, y, z)
+    trunk_height = height * 0.4
+    glColor3f(0.4, 0.25, 0.1)
+    glBegin(GL_QUADS)
+    glVertex3f(-0.5, 0, 0)
+    glVertex3f(0.5, 0, 0)
+    glVertex3f(0.5, trunk_height, 0)
+    glVertex3f(-0.5, trunk_height, 0)
+    glEnd()
+    glColor3f(0.1, 0.4, 0.1)
+    glBegin(GL_TRIANGLES)
+    glVertex3f(0, height * 0.9, 0)
+    glVertex3f(-2.5, trunk_height, 0)
+    glVertex3f(2.5, trunk_height, 0)
+    glEnd()
+    glPopMatrix()
+
+def draw_cloud(x, y, z, size, segments=28):
     """Draw a simple cloud"""
     glPushMatrix()
     glTranslatef(x, y, z)
@@ -147,7 +264,7 @@ def draw_cloud(x, y, z, size):
         base_scale_z = size * 0.3
 
         # Draw 3 concentric fans with decreasing alpha and slightly larger radii
-        segments = 28
+        ux, uy = unit_circle(segments)
         for layer in range(3, 0, -1):
             s = layer / 3.0
             alpha = 0.12 + 0.28 * s  # inner layers more opaque
@@ -157,9 +274,7 @@ def draw_cloud(x, y, z, size):
             glBegin(GL_TRIANGLE_FAN)
             glVertex3f(0.0, 0.0, 0.0)
             for i in range(segments + 1):
-                theta = 2.0 * math.pi * i / segments
-                ux, uy = rotate_point(1.0, 0.0, theta)
-                glVertex3f(ux, uy, 0.0)
+                glVertex3f(ux[i], uy[i], 0.0)
             glEnd()
             glPopMatrix()
         glPopMatrix()
@@ -0,0 +1,131 @@
+"""
+simulation.py - Fixed-timestep vehicle simulation, independent of rendering
+VehicleState holds the driving model (speed, rpm, engine temperature, fuel)
+and FixedTimestep feeds it constant steps from an accumulator, so physics
+does not depend on frame rate and the renderer interpolates between steps.
+"""
+
+import copy
+
+SIM_DT = 0.016          # one simulation step (the original 16 ms GLUT tick)
+MAX_FRAME_TIME = 0.25   # longest wall-clock gap simulated per timer tick
+MAX_SPEED = 230
+ACCELERATION_STEP = 3   # target speed change per step while UP/DOWN is held
+SPEED_RESPONSE = 1.6    # max speed change per step toward the target
+FUEL_INTERVAL = 30      # steps between fuel consumption ticks
+
+
+class VehicleState:
+    """Driving state advanced in fixed steps of SIM_DT seconds"""
+
+    def __init__(self):
+        self.speed = 0.0
+        self.target_speed = 0.0
+        self.rpm = 0.5
+        self.engine_temp = 20.0
+        self.fuel_level = 100.0
+        self.fuel_warning = False
+        self.distance = 0.0
+        self.accelerating = False
+        self.decelerating = False
+        self.fuel_counter = 0
+
+    def step(self, dt=SIM_DT):
+        if self.accelerating and self.target_speed < MAX_SPEED:
+            self.target_speed += ACCELERATION_STEP
+        if self.decelerating and self.target_speed > 0:
+            self.target_speed -= ACCELERATION_STEP
+
+        if self.speed < self.target_speed:
+            self.speed = min(self.speed + SPEED_RESPONSE, self.target_speed)
+        elif self.speed > self.target_speed:
+            self.speed = max(self.speed - SPEED_RESPONSE, self.target_speed)
+
+        self.distance += self.speed / 3.6 * dt
+        self.update_rpm()
+        self._update_engine_temp()
+        self._consume_fuel()
+
+    def update_rpm(self):
+        self.rpm = (self.speed / 230.0) * 7 + 0.5
+
+    def _update_engine_temp(self):
+        target_temp = 20 + (self.rpm * 8) + (self.speed * 0.2)
+        if target_temp > 120:
+            target_temp = 120
+
+        if self.engine_temp < target_temp:
+            self.engine_temp += 0.5
+        elif self.engine_temp > target_temp:
+            self.engine_temp -= 0.3
+
+    def _consume_fuel(self):
+        if self.speed > 0:
+            self.fuel_counter += 1
+            if self.fuel_counter > FUEL_INTERVAL:
+                self.fuel_level -= 0.5 * (1 + self.speed / 100.0)
+                self.fuel_counter = 0
+                if self.fuel_level < 0:
+                    self.fuel_level = 0
+
+        self.fuel_warning = self.fuel_level < 20
+
+    def brake(self):
+        self.speed = max(0, self.speed - 20)
+
+    def refuel(self):
+        self.fuel_level = 100.0
+        self.fuel_warning = False
+
+    def copy(self):
+        return copy.copy(self)
+
+    def interpolate(self, newer, alpha):
+        """Blend continuous values toward newer by alpha in [0, 1] for display"""
+        view = newer.copy()
+        for name in ("speed", "rpm", "engine_temp", "fuel_level", "distance"):
+            old = getattr(self, name)
+            setattr(view, name, old + (getattr(newer, name) - old) * alpha)
+        return view
+
+
+class FixedTimestep:
+    """Accumulator that turns elapsed wall time into whole steps of dt.
+
+    step is called with dt for every whole step; the leftover fraction is
+    exposed as alpha for interpolating the rendered state. max_steps bounds
+    the work done per advance() (None = unbounded, for headless runs).
+    """
+
+    def __init__(self, step, dt=SIM_DT, max_steps=None):
+        self.step = step
+        self.dt = dt
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+        self.steps = 0
+
+    def advance(self, elapsed):
+        """Run as many steps as elapsed seconds allow; returns the step count"""
+        self.accumulator += elapsed
+        count = 0
+        # Small epsilon keeps float drift from dropping a step at exact multiples
+        while self.accumulator >= self.dt - 1e-9:
+            if self.max_steps is not None and count >= self.max_steps:
+                self.accumulator = 0.0
+                break
+            self.step(self.dt)
+            self.accumulator -= self.dt
+            count += 1
+        self.accumulator = max(self.accumulator, 0.0)
+        self.steps += count
+        return count
+
+    def run(self, steps):
+        """Run exactly steps steps, e.g. to fast-forward a headless simulation"""
+        for _ in range(steps):
+            self.step(self.dt)
+        self.steps += steps
+
+    @property
+    def alpha(self):
+        return min(self.accumulator / self.dt, 1.0)
@@ -0,0 +1,412 @@
+"""
+softraster.py - Pure-software framebuffer backend for the drawing API
+Rasterizes points, spans, convex polygons, rectangles, strokes and text
+into a NumPy RGB array so the dashboard overlay can be rendered (and
+pixel-diffed) without an OpenGL context. Activate it with
+algorithms.set_framebuffer().
+"""
+
+import functools
+import math
+import struct
+import zlib
+import numpy as np
+
+# 5x7 bitmap font, rows listed top to bottom ('#' = set pixel)
+FONT_5X7 = {
+    " ": "..... ..... ..... ..... ..... ..... .....",
+    "!": "..#.. ..#.. ..#.. ..#.. ..#.. ..... ..#..",
+    '"': ".#.#. .#.#. ..... ..... ..... ..... .....",
+    "#": ".#.#. .#.#. ##### .#.#. ##### .#.#. .#.#.",
+    "$": "..#.. .#### #.#.. .###. ..#.# ####. ..#..",
+    "%": "##... ##..# ...#. ..#.. .#... #..## ...##",
+    "&": ".##.. #..#. #.#.. .#... #.#.# #..#. .##.#",
+    "'": "..#.. ..#.. ..... ..... ..... ..... .....",
+    "(": "...#. ..#.. .#... .#... .#... ..#.. ...#.",
+    ")": ".#... ..#.. ...#. ...#. ...#. ..#.. .#...",
+    "*": "..... ..#.. #.#.# .###. #.#.# ..#.. .....",
+    "+": "..... ..#.. ..#.. ##### ..#.. ..#.. .....",
+    ",": "..... ..... ..... ..... .##.. ..#.. .#...",
+    "-": "..... ..... ..... ##### ..... ..... .....",
+    ".": "..... ..... ..... ..... ..... .##.. .##..",
+    "/": "..... ....# ...#. ..#.. .#... #.... .....",
+    "0": ".###. #...# #..## #.#.# ##..# #...# .###.",
+    "1": "..#.. .##.. ..#.. ..#.. ..#.. ..#.. .###.",
+    "2": ".###. #...# ....# ...#. ..#.. .#... #####",
+    "3": "##### ...#. ..#.. ...#. ....# #...# .###.",
+    "4": "...#. ..##. .#.#. #..#. ##### ...#. ...#.",
+    "5": "##### #.... ####. ....# ....# #...# .###.",
+    "6": "..##. .#... #.... ####. #...# #...# .###.",
+    "7": "##### ....# ...#. ..#.. .#... .#... .#...",
+    "8": ".###. #...# #...# .###. #...# #...# .###.",
+    "9": ".###. #...# #...# .#### ....# ...#. .##..",
+    ":": "..... .##.. .##.. ..... .##.. .##.. .....",
+    ";": "..... .##.. .##.. ..... .##.. ..#.. .#...",
+    "<": "...#. ..#.. .#... #.... .#... ..#.. ...#.",
+    "=": "..... ..... ##### ..... ##### ..... .....",
+    ">": ".#... ..#.. ...#. ....# ...#. ..#.. .#...",
+    "?": ".###. #...# ....# ...#. ..#.. ..... ..#..",
+    "@": ".###. #...# ....# .##.# #.#.# #.#.# .###.",
+    "A": ".###. #...# #...# ##### #...# #...# #...#",
+    "B": "####. #...# #...# ####. #...# #...# ####.",
+    "C": ".###. #...# #.... #.... #.... #...# .###.",
+    "D": "###.. #..#. #...# #...# #...# #..#. ###..",
+    "E": "##### #.... #.... ####. #.... #.... #####",
+    "F": "##### #.... #.... ####. #.... #.... #....",
+    "G": ".###. #...# #.... #.### #...# #...# .####",
+    "H": "#...# #...# #...# ##### #...# #...# #...#",
+    "I": ".###. ..#.. ..#.. ..#.. ..#.. ..#.. .###.",
+    "J": "..### ...#. ...#. ...#. ...#. #..#. .##..",
+    "K": "#...# #..#. #.#.. ##... #.#.. #..#. #...#",
+    "L": "#.... #.... #.... #.... #.... #.... #####",
+    "M": "#...# ##.## #.#.# #.#.# #...# #...# #...#",
+    "N": "#...# #...# ##..# #.#.# #..## #...# #...#",
+    "O": ".###. #...# #...# #...# #...# #...# .###.",
+    "P": "####. #...# #...# ####. #.... #.... #....",
+    "Q": ".###. #...# #...# #...# #.#.# #..#. .##.#",
+    "R": "####. #...# #...# ####. #.#.. #..#. #...#",
+    "S": ".#### #.... #.... .###. ....# ....# ####.",
+    "T": "##### ..#.. ..#.. ..#.. ..#.. ..#.. ..#..",
+    "U": "#...# #...# #...# #...# #...# #...# .###.",
+    "V": "#...# #...# #...# #...# #...# .#.#. ..#..",
+    "W": "#...# #...# #...# #.#.# #.#.# #.#.# .#.#.",
+    "X": "#...# #...# .#.#. ..#.. .#.#. #...# #...#",
+    "Y": "#...# #...# .#.#. ..#.. ..#.. ..#.. ..#..",
+    "Z": "##### ....# ...#. ..#.. .#... #.... #####",
+    "[": ".###. .#... .#... .#... .#... .#... .###.",
+    "\\": "..... #.... .#... ..#.. ...#. ....# .....",
+    "]": ".###. ...#. ...#. ...#. ...#. ...#. .###.",
+    "^": "..#.. .#.#. #...# ..... ..... ..... .....",
+    "_": "..... ..... ..... ..... ..... ..... #####",
+    "`": ".#... ..#.. ..... ..... ..... ..... .....",
+    "a": "..... ..... .###. ....# .#### #...# .####",
+    "b": "#.... #.... #.##. ##..# #...# #...# ####.",
+    "c": "..... ..... .###. #.... #.... #...# .###.",
+    "d": "....# ....# .##.# #..## #...# #...# .####",
+    "e": "..... ..... .###. #...# ##### #.... .###.",
+    "f": "..##. .#..# .#... ###.. .#... .#... .#...",
+    "g": "..... .#### #...# #...# .#### ....# .###.",
+    "h": "#.... #.... #.##. ##..# #...# #...# #...#",
+    "i": "..#.. ..... .##.. ..#.. ..#.. ..#.. .###.",
+    "j": "...#. ..... ..##. ...#. ...#. #..#. .##..",
+    "k": "#.... #.... #..#. #.#.. ##... #.#.. #..#.",
+    "l": ".##.. ..#.. ..#.. ..#.. ..#.. ..#.. .###.",
+    "m": "..... ..... ##.#. #.#.# #.#.# #...# #...#",
+    "n": "..... ..... #.##. ##..# #...# #...# #...#",
+    "o": "..... ..... .###. #...# #...# #...# .###.",
+    "p": "..... ..... ####. #...# ####. #.... #....",
+    "q": "..... ..... .##.# #..## .#### ....# ....#",
+    "r": "..... ..... #.##. ##..# #.... #.... #....",
+    "s": "..... ..... .###. #.... .###. ....# ####.",
+    "t": ".#... .#... ###.. .#... .#... .#..# ..##.",
+    "u": "..... ..... #...# #...# #...# #..## .##.#",
+    "v": "..... ..... #...# #...# #...# .#.#. ..#..",
+    "w": "..... ..... #...# #...# #.#.# #.#.# .#.#.",
+    "x": "..... ..... #...# .#.#. ..#.. .#.#. #...#",
+    "y": "..... ..... #...# #...# .#### ....# .###.",
+    "z": "..... ..... ##### ...#. ..#.. .#... #####",
+    "{": "...#. ..#.. ..#.. .#... ..#.. ..#.. ...#.",
+    "|": "..#.. ..#.. ..#.. ..#.. ..#.. ..#.. ..#..",
+    "}": ".#... ..#.. ..#.. ...#. ..#.. ..#.. .#...",
+    "~": "..... ..... .#... #.#.# ...#. ..... .....",
+    "°": ".##.. #..#. #..#. .##.. ..... ..... .....",
+}
+GLYPH_ADVANCE = 6
+
+
+@functools.lru_cache(maxsize=None)
+def _glyph_pixels(char):
+    """(N, 2) offsets of a glyph's set pixels from the baseline pen position"""
+    rows = FONT_5X7.get(char, FONT_5X7["?"]).split()
+    pixels = [(column, len(rows) - 1 - row)
+              for row, bits in enumerate(rows)
+              for column, bit in enumerate(bits) if bit == "#"]
+    return np.array(pixels, dtype=np.int32).reshape(-1, 2)
+
+
+@functools.lru_cache(maxsize=512)
+def layout_text(text):
+    """Pixel offsets of a whole string relative to its pen position"""
+    pieces = [_glyph_pixels(char) + (index * GLYPH_ADVANCE, 0) for index, char in enumerate(text)]
+    if not pieces:
+        return np.empty((0, 2), dtype=np.int32)
+    pixels = np.concatenate(pieces).astype(np.int32)
+    pixels.flags.writeable = False
+    return pixels
+
+
+def _fill_block(block, color):
+    """Fill a (rows, columns, 3) block with one color. Assigning the 3-value
+    color to the whole block runs a per-pixel inner loop; filling one row
+    and copying it is a plain memory copy per row."""
+    if block.size:
+        block[0] = to_rgb8(color)
+        block[1:] = block[0]
+
+
+def to_rgb8(color):
+    """Convert a float GL color to the 8-bit value OpenGL would store"""
+    return np.clip(np.rint(np.asarray(color[:3], dtype=np.float64) * 255), 0, 255).astype(np.uint8)
+
+
+class SoftwareLayer:
+    """A cropped RGB sprite plus coverage mask, composited with blit()"""
+
+    def __init__(self, x, y, pixels, mask):
+        self.x = x
+        self.y = y
+        self.pixels = pixels
+        self.mask = mask
+        # Fully covered rows are copied whole; only the rest need the mask
+        self.full_rows = mask.all(axis=1)
+        self.partial_rows = np.flatnonzero(mask.any(axis=1) & ~self.full_rows)
+
+
+class SoftwareFramebuffer:
+    """RGB framebuffer in OpenGL window coordinates (row 0 is the bottom).
+
+    Pixel coverage follows the GL rasterization rules used by the dashboard:
+    square points of the given size around the vertex, polygons that cover
+    the pixels whose centers fall inside them, and strokes blended by the
+    alpha their quads would interpolate at each pixel center.
+    """
+
+    def __init__(self, width, height, track_coverage=False):
+        self.width = width
+        self.height = height
+        self.pixels = np.zeros((height, width, 3), dtype=np.uint8)
+        self.coverage = np.zeros((height, width), dtype=bool) if track_coverage else None
+
+    def clear(self, color=(0.0, 0.0, 0.0)):
+        _fill_block(self.pixels, color)
+        if self.coverage is not None:
+            self.coverage[:] = False
+
+    def _write(self, xs, ys, color):
+        inside = (xs >= 0) & (xs < self.width) & (ys >= 0) & (ys < self.height)
+        xs = xs[inside]
+        ys = ys[inside]
+        self.pixels[ys, xs] = to_rgb8(color)
+        if self.coverage is not None:
+            self.coverage[ys, xs] = True
+
+    def plot_points(self, points, size, color):
+        """Plot square points of the given size centered on each vertex"""
+        points = np.asarray(points)
+        if len(points) == 0:
+            return
+        size = max(1, int(round(size)))
+        if size % 2:
+            base = np.floor(points).astype(np.int64)
+        else:
+            base = np.floor(points + 0.5).astype(np.int64)
+        offsets = np.arange(-(size // 2), size - size // 2)
+        xs = (base[:, 0, None, None] + offsets[None, None, :]).repeat(size, axis=1)
+        ys = (base[:, 1, None, None] + offsets[None, :, None]).repeat(size, axis=2)
+        self._write(xs.ravel(), ys.ravel(), color)
+
+    def fill_rect(self, x1, y1, x2, y2, color):
+        """Fill the pixels whose centers lie in the rectangle"""
+        left, right = sorted((x1, x2))
+        bottom, top = sorted((y1, y2))
+        column_start = max(0, int(np.ceil(left - 0.5)))
+        column_end = min(self.width, int(np.ceil(right - 0.5)))
+        row_start = max(0, int(np.ceil(bottom - 0.5)))
+        row_end = min(self.height, int(np.ceil(top - 0.5)))
+        if column_start >= column_end or row_start >= row_end:
+            return
+        _fill_block(self.pixels[row_start:row_end, column_start:column_end], color)
+        if self.coverage is not None:
+            self.coverage[row_start:row_end, column_start:column_end] = True
+
+    def fill_spans(self, spans, color):
+        """Fill (y, x_start, x_end) runs, x_end exclusive, one pixel tall"""
+        spans = np.asarray(spans, dtype=np.int64)
+        lengths = np.maximum(spans[:, 2] - spans[:, 1], 0)
+        if lengths.sum() == 0:
+            return
+        starts = np.repeat(spans[:, 1] - (np.cumsum(lengths) - lengths), lengths)
+        self._write(starts + np.arange(lengths.sum()), np.repeat(spans[:, 0], lengths), color)
+
+    def fill_polygon(self, vertices, color):
+        """Scanline-fill a convex polygon given as an (N, 2) array of vertices"""
+        vertices = np.asarray(vertices, dtype=np.float64)
+        row_start = max(0, int(np.ceil(vertices[:, 1].min() - 0.5)))
+        row_end = min(self.height, int(np.ceil(vertices[:, 1].max() - 0.5)))
+        if row_start >= row_end:
+            return
+        centers_y = np.arange(row_start, row_end) + 0.5
+
+        start = vertices
+        end = np.roll(vertices, -1, axis=0)
+        low = np.minimum(start[:, 1], end[:, 1])
+        high = np.maximum(start[:, 1], end[:, 1])
+        crosses = (centers_y[:, None] >= low) & (centers_y[:, None] < high)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = (centers_y[:, None] - start[:, 1]) / (end[:, 1] - start[:, 1])
+            xs = start[:, 0] + t * (end[:, 0] - start[:, 0])
+        left = np.where(crosses, xs, np.inf).min(axis=1)
+        right = np.where(crosses, xs, -np.inf).max(axis=1)
+
+        column_start = max(0, int(np.ceil(vertices[:, 0].min() - 0.5)))
+        column_end = min(self.width, int(np.ceil(vertices[:, 0].max() - 0.5)))
+        if column_start >= column_end:
+            return
+        centers_x = np.arange(column_start, column_end) + 0.5
+        mask = (centers_x[None, :] >= left[:, None]) & (centers_x[None, :] < right[:, None])
+        region = self.pixels[row_start:row_end, column_start:column_end]
+        region[mask] = to_rgb8(color)
+        if self.coverage is not None:
+            self.coverage[row_start:row_end, column_start:column_end] |= mask
+
+    def draw_stroke(self, x1, y1, x2, y2, width, color, feather=1.0):
+        """Blend an anti-aliased stroke, matching the quads of algorithms.stroke_vertices"""
+        dx = x2 - x1
+        dy = y2 - y1
+        length = math.hypot(dx, dy)
+        ux, uy = (dx / length, dy / length) if length else (1.0, 0.0)
+        half = max(width, 1.0) / 2
+        inner = max(half - feather / 2, 0.0)
+        outer = half + feather / 2
+        reach = outer + 0.5
+        column_start = max(0, int(math.floor(min(x1, x2) - reach)))
+        column_end = min(self.width, int(math.ceil(max(x1, x2) + reach)) + 1)
+        row_start = max(0, int(math.floor(min(y1, y2) - reach)))
+        row_end = min(self.height, int(math.ceil(max(y1, y2) + reach)) + 1)
+        if column_start >= column_end or row_start >= row_end:
+            return
+
+        px = np.arange(column_start, column_end)[None, :] + 0.5 - x1
+        py = np.arange(row_start, row_end)[:, None] + 0.5 - y1
+        along = px * ux + py * uy + 0.5
+        across = np.abs(py * ux - px * uy)
+        ramp = np.clip((outer - across) / (outer - inner), 0.0, 1.0)
+        alpha = np.where((along >= 0) & (along < length + 1), min(width, 1.0) * ramp, 0.0)
+        mask = alpha > 0
+        region = self.pixels[row_start:row_end, column_start:column_end]
+        blended = region * (1 - alpha[..., None]) + to_rgb8(color) * alpha[..., None]
+        region[mask] = np.rint(blended[mask]).astype(np.uint8)
+        if self.coverage is not None:
+            self.coverage[row_start:row_end, column_start:column_end] |= mask
+
+    def draw_text(self, x, y, text, color):
+        """Draw text with the built-in 5x7 font, baseline at (x, y)"""
+        pixels = layout_text(text)
+        if len(pixels):
+            self._write(pixels[:, 0] + int(round(x)), pixels[:, 1] + int(round(y)), color)
+
+    def to_layer(self):
+        """Crop everything drawn so far (needs track_coverage) into a sprite"""
+        rows = np.flatnonzero(self.coverage.any(axis=1))
+        columns = np.flatnonzero(self.coverage.any(axis=0))
+        if len(rows) == 0:
+            return SoftwareLayer(0, 0, np.zeros((0, 0, 3), np.uint8), np.zeros((0, 0), bool))
+        y0, y1 = rows[0], rows[-1] + 1
+        x0, x1 = columns[0], columns[-1] + 1
+        return SoftwareLayer(x0, y0, self.pixels[y0:y1, x0:x1].copy(), self.coverage[y0:y1, x0:x1].copy())
+
+    def blit(self, layer):
+        """Composite a layer produced by to_layer() onto this framebuffer"""
+        height, width = layer.mask.shape
+        left, bottom = max(layer.x, 0), max(layer.y, 0)
+        right, top = min(layer.x + width, self.width), min(layer.y + height, self.height)
+        if left >= right or bottom >= top:
+            return
+        if (right - left, top - bottom) != (width, height):
+            # Partly off this framebuffer: composite only the overlapping part
+            rows = slice(bottom - layer.y, top - layer.y)
+            columns = slice(left - layer.x, right - layer.x)
+            layer = SoftwareLayer(left, bottom, layer.pixels[rows, columns], layer.mask[rows, columns])
+            height, width = layer.mask.shape
+        region = self.pixels[layer.y:layer.y + height, layer.x:layer.x + width]
+        region[layer.full_rows] = layer.pixels[layer.full_rows]
+        rows = layer.partial_rows
+        if len(rows):
+            partial = region[rows]
+            mask = layer.mask[rows]
+            partial[mask] = layer.pixels[rows][mask]
+            region[rows] = partial
+        if self.coverage is not None:
+            self.coverage[layer.y:layer.y + height, layer.x:layer.x + width] |= layer.mask
+
+    def to_image(self):
+        """Top-down (height, width, 3) view, the row order image files use"""
+        return self.pixels[::-1]
+
+    def save_raw(self, path):
+        """Write the image as raw top-down RGB8 bytes"""
+        with open(path, "wb") as handle:
+            handle.write(np.ascontiguousarray(self.to_image()).tobytes())
+
+    def save_png(self, path):
+        write_png(path, self.to_image())
+
+
+def write_png(path, image):
+    """Write a top-down (height, width, 3) uint8 array as an RGB PNG"""
+    height, width, _ = image.shape
+    rows = np.zeros((height, width * 3 + 1), dtype=np.uint8)
+    rows[:, 1:] = image.reshape(height, width * 3)
+
+    def chunk(kind, data):
+        return (struct.pack(">I", len(data)) + kind + data
+                + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF))
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    with open(path, "wb") as handle:
+        handle.write(b"\x89PNG\r\n\x1a\n")
+        handle.write(chunk(b"IHDR", header))
+        handle.write(chunk(b"IDAT", zlib.compress(rows.tobytes(), 6)))
+        handle.write(chunk(b"IEND", b""))
+
+
+def render_overlay(dashboard, framebuffer=None):
+    """Render the dashboard module's overlay (panel, gauges, instructions) in software.
+
+    dashboard is the main module (or anything with the same drawing
+    functions and state); returns the framebuffer drawn into.
+    """
+    import algorithms
+    if framebuffer is None:
+        framebuffer = SoftwareFramebuffer(dashboard.WINDOW_WIDTH, dashboard.WINDOW_HEIGHT)
+    previous = algorithms.set_framebuffer(framebuffer)
+    try:
+        dashboard.draw_overlay_widgets()
+        dashboard.draw_instruction_text()
+    finally:
+        algorithms.set_framebuffer(previous)
+    return framebuffer
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Render a dashboard overlay snapshot without OpenGL")
+    parser.add_argument("output", help="output file (.png, anything else is written as raw RGB8)")
+    parser.add_argument("--speed", type=float, default=0.0)
+    parser.add_argument("--fuel", type=float, default=100.0)
+    parser.add_argument("--temp", type=float, default=20.0)
+    parser.add_argument("--left", action="store_true", help="left turn arrow lit")
+    parser.add_argument("--right", action="store_true", help="right turn arrow lit")
+    args = parser.parse_args(argv)
+
+    import main as dashboard
+    vehicle = dashboard.vehicle
+    vehicle.speed = args.speed
+    vehicle.fuel_level = args.fuel
+    vehicle.engine_temp = args.temp
+    vehicle.fuel_warning = args.fuel < 20
+    vehicle.update_rpm()
+    dashboard.previous_vehicle = vehicle.copy()
+    dashboard.publish_vehicle_state()
+    dashboard.left_blink_show = args.left
+    dashboard.right_blink_show = args.right
+
+    framebuffer = render_overlay(dashboard)
+    if args.output.lower().endswith(".png"):
+        framebuffer.save_png(args.output)
+    else:
+        framebuffer.save_raw(args.output)
+
+
+if __name__ == "__main__":
+    main()
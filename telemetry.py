@@ -0,0 +1,451 @@
+"""
+telemetry.py - Telemetry sources feeding the gauges from recorded or live streams
+A source turns a CSV log, a binary log or a local socket stream into
+samples of (time, speed, rpm, fuel, temp, signals). The render thread
+only ever calls sample(t), which never blocks: log sources look the time
+up in a memory-mapped or background-decoded array, live sources return the
+newest sample drained from a bounded queue filled by a reader thread.
+
+Binary log layout: 16-byte header (LOG_MAGIC, uint32 record size, uint32
+reserved), then packed little-endian SAMPLE_DTYPE records in time order.
+
+Usage:
+    python telemetry.py convert drive.csv drive.tlog
+    python telemetry.py bench --size-mb 300
+"""
+
+import bisect
+import itertools
+import mmap
+import os
+import queue
+import socket
+import struct
+import threading
+import time
+import numpy as np
+
+SAMPLE_DTYPE = np.dtype([
+    ("time", "<f8"),       # seconds
+    ("speed", "<f4"),      # km/h
+    ("rpm", "<f4"),        # x1000
+    ("fuel", "<f4"),       # percent
+    ("temp", "<f4"),       # degrees C
+    ("signals", "u1"),     # turn lamps lit: bit 0 left, bit 1 right
+])
+LEFT_SIGNAL = 1
+RIGHT_SIGNAL = 2
+LOG_MAGIC = b"DASHTLM1"
+LOG_HEADER = struct.Struct("<8sII")
+CSV_COLUMNS = ("time", "speed", "rpm", "fuel", "temp", "left", "right")
+CSV_CHUNK_ROWS = 65536
+INDEX_STRIDE = 4096       # samples per entry of the coarse time index
+LIVE_QUEUE_SIZE = 64      # decoded batches buffered between reader thread and display
+FUEL_WARNING_LEVEL = 20
+
+
+def make_samples(time, speed, rpm=None, fuel=100.0, temp=20.0, left=False, right=False):
+    """Structured SAMPLE_DTYPE array from columns (scalars broadcast).
+
+    rpm defaults to the simulation's speed-to-rpm mapping.
+    """
+    time = np.atleast_1d(np.asarray(time, dtype=np.float64))
+    samples = np.zeros(len(time), dtype=SAMPLE_DTYPE)
+    samples["time"] = time
+    samples["speed"] = speed
+    samples["rpm"] = (np.asarray(speed) / 230.0) * 7 + 0.5 if rpm is None else rpm
+    samples["fuel"] = fuel
+    samples["temp"] = temp
+    samples["signals"] = (np.where(left, LEFT_SIGNAL, 0) | np.where(right, RIGHT_SIGNAL, 0))
+    return samples
+
+
+def apply_sample(vehicle, sample):
+    """Copy a sample onto a VehicleState; returns its (left, right) lamp states"""
+    vehicle.speed = float(sample["speed"])
+    vehicle.target_speed = vehicle.speed
+    vehicle.rpm = float(sample["rpm"])
+    vehicle.fuel_level = float(sample["fuel"])
+    vehicle.engine_temp = float(sample["temp"])
+    vehicle.fuel_warning = vehicle.fuel_level < FUEL_WARNING_LEVEL
+    signals = int(sample["signals"])
+    return bool(signals & LEFT_SIGNAL), bool(signals & RIGHT_SIGNAL)
+
+
+class TelemetrySource:
+    """Interface of every source; sample(t) must never block the caller"""
+
+    def start(self):
+        """Begin background decoding or receiving, if the source has any"""
+
+    def close(self):
+        """Stop background work and release files or sockets"""
+
+    def sample(self, t):
+        """Latest sample at replay time t seconds (None before the first one)"""
+        raise NotImplementedError
+
+    def finished_at(self, t):
+        """True once a recorded source has nothing newer than its sample at t"""
+        return False
+
+
+class RecordedSource(TelemetrySource):
+    """Replays time-ordered sample chunks; rate > 1 plays faster than real time.
+
+    Chunks may keep arriving from a decoder thread: only list appends are
+    shared, so lookups see a consistent prefix without locking. Each chunk
+    keeps a contiguous coarse index of every INDEX_STRIDE-th time, since
+    np.searchsorted would first copy a strided field view of the whole log.
+    """
+
+    def __init__(self, samples=None, rate=1.0, loop=False):
+        self.rate = rate
+        self.loop = loop
+        self._chunks = []
+        self._indexes = []
+        self._starts = []          # first time of each chunk, appended last
+        if samples is not None and len(samples):
+            self._append(samples)
+
+    def _append(self, samples):
+        self._chunks.append(samples)
+        self._indexes.append(np.ascontiguousarray(samples["time"][::INDEX_STRIDE]))
+        self._starts.append(float(samples["time"][0]))
+
+    def __len__(self):
+        return sum(len(chunk) for chunk in self._chunks[:len(self._starts)])
+
+    def duration(self):
+        count = len(self._starts)
+        if count == 0:
+            return 0.0
+        return float(self._chunks[count - 1]["time"][-1]) - self._starts[0]
+
+    def _log_time(self, t):
+        elapsed = t * self.rate
+        if self.loop:
+            length = self.duration()
+            if length > 0:
+                elapsed %= length
+        return self._starts[0] + elapsed
+
+    def sample(self, t):
+        """Latest sample at replay time t, copied so it does not pin a memory map"""
+        count = len(self._starts)
+        if count == 0:
+            return None
+        log_time = self._log_time(t)
+        number = max(bisect.bisect_right(self._starts, log_time, 0, count) - 1, 0)
+        chunk = self._chunks[number]
+        # Coarse index, then one block: only a few pages of a memory-mapped log
+        block = max(int(np.searchsorted(self._indexes[number], log_time, side="right")) - 1, 0)
+        first = block * INDEX_STRIDE
+        times = np.ascontiguousarray(chunk["time"][first:first + INDEX_STRIDE])
+        index = first + int(np.searchsorted(times, log_time, side="right")) - 1
+        return chunk[max(index, 0)].copy()
+
+    def finished_at(self, t):
+        count = len(self._starts)
+        return (not self.loop and count > 0
+                and self._log_time(t) >= self._chunks[count - 1]["time"][-1])
+
+
+class BinaryLogSource(RecordedSource):
+    """Replays a binary log through a read-only memory map (no decoding pass)"""
+
+    def __init__(self, path, rate=1.0, loop=False):
+        super().__init__(None, rate, loop)
+        self.path = path
+        self.samples = None
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, record_size, _ = LOG_HEADER.unpack_from(self._map)
+        if magic != LOG_MAGIC or record_size != SAMPLE_DTYPE.itemsize:
+            self.close()
+            raise ValueError(f"not a dashboard telemetry log: {path}")
+        self._map_samples()
+
+    def _map_samples(self):
+        count = (len(self._map) - LOG_HEADER.size) // SAMPLE_DTYPE.itemsize
+        self.samples = np.frombuffer(self._map, dtype=SAMPLE_DTYPE, count=count, offset=LOG_HEADER.size)
+        if count:
+            self._append(self.samples)
+
+    def _drop_samples(self):
+        self.samples = None
+        self._starts.clear()
+        self._indexes.clear()
+        self._chunks.clear()
+
+    def close(self):
+        """Unmap the log; raises BufferError, still open, while a caller holds a view of it"""
+        if self._map is None:
+            return
+        # Our own array views are exports of the mmap and must go before it can close
+        self._drop_samples()
+        try:
+            self._map.close()
+        except BufferError:
+            self._map_samples()
+            raise
+        self._file.close()
+        self._map = None
+
+
+def write_log(path, samples):
+    """Write SAMPLE_DTYPE samples as a binary log"""
+    with LogWriter(path) as writer:
+        writer.write(samples)
+
+
+class LogWriter:
+    """Appends samples to a binary log, e.g. to record a live session"""
+
+    def __init__(self, path):
+        self._file = open(path, "wb")
+        self._file.write(LOG_HEADER.pack(LOG_MAGIC, SAMPLE_DTYPE.itemsize, 0))
+
+    def write(self, samples):
+        self._file.write(np.ascontiguousarray(samples, dtype=SAMPLE_DTYPE).tobytes())
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _read_csv_chunks(path, chunk_rows=CSV_CHUNK_ROWS):
+    """Yield SAMPLE_DTYPE arrays of up to chunk_rows rows from a headed CSV log.
+
+    time and speed are required; missing rpm/fuel/temp/left/right columns
+    take make_samples defaults.
+    """
+    with open(path, newline="") as handle:
+        header = [name.strip() for name in handle.readline().split(",")]
+        missing = {"time", "speed"} - set(header)
+        if missing:
+            raise ValueError(f"{path}: missing CSV columns {sorted(missing)}")
+        unknown = set(header) - set(CSV_COLUMNS)
+        if unknown:
+            raise ValueError(f"{path}: unknown CSV columns {sorted(unknown)}")
+        while True:
+            lines = list(itertools.islice(handle, chunk_rows))
+            if not lines:
+                return
+            table = np.loadtxt(lines, delimiter=",", ndmin=2, dtype=np.float64)
+            columns = {name: table[:, i] for i, name in enumerate(header)}
+            yield make_samples(columns["time"], columns["speed"], columns.get("rpm"),
+                               columns.get("fuel", 100.0), columns.get("temp", 20.0),
+                               columns.get("left", 0) != 0, columns.get("right", 0) != 0)
+
+
+def convert_csv(csv_path, log_path):
+    """Convert a CSV log to a binary log chunk by chunk; returns the sample count"""
+    count = 0
+    with LogWriter(log_path) as writer:
+        for chunk in _read_csv_chunks(csv_path):
+            writer.write(chunk)
+            count += len(chunk)
+    return count
+
+
+class CsvLogSource(RecordedSource):
+    """Replays a CSV log decoded chunk by chunk on a background thread.
+
+    Until decoding catches up, sample(t) answers from the rows decoded so
+    far; call wait() to block (outside the render loop) until it is done.
+    """
+
+    def __init__(self, path, rate=1.0, loop=False):
+        super().__init__(None, rate, loop)
+        self.path = path
+        self._decoded = threading.Event()
+        self._thread = None
+        self.error = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._decode, name="telemetry-csv", daemon=True)
+            self._thread.start()
+
+    def _decode(self):
+        try:
+            for chunk in _read_csv_chunks(self.path):
+                self._append(chunk)
+        except Exception as error:
+            self.error = error
+        finally:
+            self._decoded.set()
+
+    def wait(self, timeout=None):
+        self.start()
+        return self._decoded.wait(timeout)
+
+    def finished_at(self, t):
+        return self._decoded.is_set() and super().finished_at(t)
+
+
+class SocketSource(TelemetrySource):
+    """Live samples from a local stream socket carrying packed SAMPLE_DTYPE records.
+
+    address is (host, port) for TCP or a filesystem path for a Unix
+    socket. A reader thread decodes whole records into a bounded queue,
+    dropping the oldest batch when the display falls behind; sample()
+    drains the queue without waiting and keeps the newest sample.
+    """
+
+    def __init__(self, address, queue_size=LIVE_QUEUE_SIZE):
+        self.address = address
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._latest = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._socket = None
+        self.received = 0
+        self.dropped = 0
+
+    def start(self):
+        if self._thread is not None:
+            return
+        family = socket.AF_INET if isinstance(self.address, tuple) else socket.AF_UNIX
+        self._socket = socket.socket(family, socket.SOCK_STREAM)
+        self._socket.connect(self.address)
+        self._thread = threading.Thread(target=self._receive, name="telemetry-socket", daemon=True)
+        self._thread.start()
+
+    def _receive(self):
+        pending = b""
+        record = SAMPLE_DTYPE.itemsize
+        while not self._stop.is_set():
+            try:
+                data = self._socket.recv(65536)
+            except OSError:
+                break
+            if not data:
+                break
+            pending += data
+            whole = len(pending) - len(pending) % record
+            if not whole:
+                continue
+            batch = np.frombuffer(pending[:whole], dtype=SAMPLE_DTYPE)
+            pending = pending[whole:]
+            self.received += len(batch)
+            while True:
+                try:
+                    self._queue.put_nowait(batch)
+                    break
+                except queue.Full:
+                    try:
+                        self._queue.get_nowait()
+                        self.dropped += 1
+                    except queue.Empty:
+                        pass
+
+    def sample(self, t):
+        while True:
+            try:
+                batch = self._queue.get_nowait()
+            except queue.Empty:
+                return self._latest
+            self._latest = batch[-1]
+
+    def close(self):
+        self._stop.set()
+        if self._socket is not None:
+            try:
+                self._socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._socket.close()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+        self._thread = None
+
+
+def open_source(spec, rate=1.0, loop=False):
+    """Source for a spec: tcp://host:port, unix://path, a .csv file or a binary log"""
+    if spec.startswith("tcp://"):
+        host, _, port = spec[len("tcp://"):].rpartition(":")
+        return SocketSource((host or "127.0.0.1", int(port)))
+    if spec.startswith("unix://"):
+        return SocketSource(spec[len("unix://"):])
+    if spec.lower().endswith(".csv"):
+        return CsvLogSource(spec, rate, loop)
+    return BinaryLogSource(spec, rate, loop)
+
+
+def synthetic_drive(duration, rate_hz=100.0, seed=0):
+    """A plausible drive (speed ramps, fuel burn, signals) for tests and benchmarks"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(duration * rate_hz)) / rate_hz
+    speed = np.clip(np.cumsum(rng.normal(0, 0.5, len(t))) + 80 + 60 * np.sin(t / 60), 0, 230)
+    fuel = np.maximum(100 - t / max(duration, 1e-9) * 95, 0)
+    temp = np.minimum(20 + t * 2, 90)
+    phase = (t % 40.0)
+    return make_samples(t, speed, None, fuel, temp,
+                        (phase < 3) & ((t * 2).astype(int) % 2 == 0),
+                        (phase > 20) & (phase < 23) & ((t * 2).astype(int) % 2 == 0))
+
+
+def _benchmark(size_mb, path):
+    count = int(size_mb * 1e6) // SAMPLE_DTYPE.itemsize
+    start = time.perf_counter()
+    with LogWriter(path) as writer:
+        for first in range(0, count, 1_000_000):
+            chunk = synthetic_drive(min(1_000_000, count - first) / 100.0, seed=first)
+            chunk["time"] += first / 100.0
+            writer.write(chunk)
+    written = time.perf_counter() - start
+    print(f"wrote {count:,} samples ({os.path.getsize(path) / 1e6:.0f} MB, "
+          f"{count / 100.0 / 3600:.1f} h at 100 Hz) in {written:.2f} s")
+
+    start = time.perf_counter()
+    source = BinaryLogSource(path)
+    opened = time.perf_counter() - start
+    duration = source.duration()
+    lookups = np.random.default_rng(0).uniform(0, duration, 100000).tolist()
+    start = time.perf_counter()
+    for t in lookups:
+        source.sample(t)
+    lookup = (time.perf_counter() - start) / len(lookups)
+    frames = int(duration / 0.016)
+    print(f"open: {opened * 1000:.2f} ms   sample(t): {lookup * 1e6:.2f} us")
+    print(f"replaying every 16 ms frame of the drive: {frames * lookup:.1f} s "
+          f"for {duration:.0f} s of driving ({duration / (frames * lookup):,.0f}x real time)")
+
+    start = time.perf_counter()
+    total = 0.0
+    for first in range(0, len(source), 1_000_000):
+        total += float(source.samples["speed"][first:first + 1_000_000].sum(dtype=np.float64))
+    scan = time.perf_counter() - start
+    print(f"sequential decode of every sample: {len(source) / scan / 1e6:.1f} M samples/s")
+    source.close()
+
+
+def main(argv=None):
+    import argparse
+    import tempfile
+    parser = argparse.ArgumentParser(description="Dashboard telemetry log tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+    convert = commands.add_parser("convert", help="convert a CSV log to a binary log")
+    convert.add_argument("csv")
+    convert.add_argument("log")
+    bench = commands.add_parser("bench", help="time replay of a large synthetic binary log")
+    bench.add_argument("--size-mb", type=float, default=300.0)
+    args = parser.parse_args(argv)
+
+    if args.command == "convert":
+        count = convert_csv(args.csv, args.log)
+        print(f"{count} samples written to {args.log}")
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            _benchmark(args.size_mb, os.path.join(directory, "bench.tlog"))
+
+
+if __name__ == "__main__":
+    main()
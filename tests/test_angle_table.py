@@ -0,0 +1,41 @@
+import math
+
+import numpy as np
+import pytest
+
+from algorithms import rotate_point
+from angle_table import (ANGLE_STEPS, INTERPOLATED_MAX_ERROR, NEAREST_MAX_ERROR, gauge_angle,
+                         lookup_cos, lookup_polar, lookup_sin, measure_error)
+
+
+@pytest.mark.parametrize("interpolate, bound", [(False, NEAREST_MAX_ERROR), (True, INTERPOLATED_MAX_ERROR)])
+def test_lookup_error_within_bound(interpolate, bound):
+    assert measure_error(samples=20000, interpolate=interpolate) <= bound
+
+
+@pytest.mark.parametrize("interpolate", [False, True])
+@pytest.mark.parametrize("angle", [-1e-17, -1e-300, -5e-324, 360.0, -360.0, 0.0])
+def test_lookup_wraps_angles_that_round_to_a_full_turn(angle, interpolate):
+    assert lookup_cos(angle, interpolate) == pytest.approx(1.0)
+    assert lookup_sin(angle, interpolate) == pytest.approx(0.0, abs=1e-12)
+    array = np.array([angle, angle])
+    np.testing.assert_allclose(lookup_cos(array, interpolate), 1.0)
+    np.testing.assert_allclose(lookup_sin(array, interpolate), 0.0, atol=1e-12)
+
+
+def test_scalar_and_array_lookups_agree():
+    angles = np.linspace(-720.0, 720.0, 4 * ANGLE_STEPS + 7)
+    for interpolate in (False, True):
+        x, y = lookup_polar(3.0, angles, interpolate)
+        scalar = np.array([lookup_polar(3.0, angle, interpolate) for angle in angles.tolist()])
+        np.testing.assert_allclose(x, scalar[:, 0], rtol=0, atol=1e-12)
+        np.testing.assert_allclose(y, scalar[:, 1], rtol=0, atol=1e-12)
+
+
+def test_needle_angles_match_rotate_point():
+    for value in np.linspace(-10, 240, 501).tolist():
+        angle = gauge_angle(value, 0, 230)
+        x, y = lookup_polar(90, angle)
+        ex, ey = rotate_point(90, 0.0, math.radians(angle))
+        assert abs(x - ex) <= 90 * INTERPOLATED_MAX_ERROR
+        assert abs(y - ey) <= 90 * INTERPOLATED_MAX_ERROR
@@ -0,0 +1,128 @@
+"""GL call budgets of the overlay, recorded through the glrecord shim.
+
+install() has to replace OpenGL before the drawing modules are imported,
+and other tests import them for real, so each recording runs in a fresh
+interpreter and reports back its saved logs.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from glrecord import CallLog, diff_logs
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+RECORD_SCRIPT = """
+import json, os, sys
+import glrecord
+glrecord.install()
+import components
+from algorithms import flush_points
+
+out = sys.argv[1]
+log = glrecord.record_dashboard("overlay")
+log.save(os.path.join(out, "overlay.glog"))
+components.set_gauge_face_cache(False)
+cases = {
+    "speedometer": lambda: components.draw_speedometer(770, 210, 120, 137.0),
+    "left_arrow": lambda: components.draw_turn_arrow(515, 280, "left", True),
+    "fuel_light": lambda: components.draw_indicator_light(1050, 50, 10, True, (1.0, 0.0, 0.0)),
+}
+for name, draw in cases.items():
+    log.clear()
+    draw()
+    flush_points()
+    log.save(os.path.join(out, name + ".glog"))
+"""
+
+# Budgets for one frame: at or a little above what the tree currently emits
+OVERLAY_MAX_DRAW_CALLS = 17
+OVERLAY_MAX_VERTICES = 1600
+SPEEDOMETER_MAX_VERTICES = 3200     # uncached face: ring spans, ticks, needle strokes
+ARROW_MAX_VERTICES = 72             # three strokes (core + two feather bands each)
+FUEL_LIGHT_MAX_VERTICES = 372       # four quads per scanline span
+
+
+@pytest.fixture(scope="module")
+def recorded(tmp_path_factory):
+    out = tmp_path_factory.mktemp("glrecord")
+    subprocess.run([sys.executable, "-c", RECORD_SCRIPT, str(out)], cwd=ROOT, check=True,
+                   env=dict(os.environ, PYTHONPATH=ROOT))
+    return {name[:-len(".glog")]: CallLog.load(str(out / name)) for name in os.listdir(out)}
+
+
+def test_overlay_redraw_budget(recorded):
+    overlay = recorded["overlay"]
+    assert 0 < overlay.draw_calls() <= OVERLAY_MAX_DRAW_CALLS
+    assert 0 < overlay.vertex_count() <= OVERLAY_MAX_VERTICES
+    assert "glBegin" not in overlay.counts()      # batched mode: arrays only
+
+
+def test_primitive_budgets(recorded):
+    assert recorded["speedometer"].vertex_count() <= SPEEDOMETER_MAX_VERTICES
+    arrow = recorded["left_arrow"]
+    assert arrow.draw_calls() == 1                 # all strokes in one buffer
+    assert arrow.vertex_count() <= ARROW_MAX_VERTICES
+    # One span-quad draw per disk or ring: glow, LED, highlight, outline
+    fuel_light = recorded["fuel_light"]
+    assert fuel_light.draw_calls() == 4
+    assert fuel_light.vertex_count() <= FUEL_LIGHT_MAX_VERTICES
+
+
+def test_save_load_diff_round_trip(recorded, tmp_path):
+    overlay = recorded["overlay"]
+    path = str(tmp_path / "copy.glog")
+    overlay.save(path)
+    again = CallLog.load(path)
+    assert list(again.lines()) == list(overlay.lines())
+    assert again.summary() == overlay.summary()
+    assert diff_logs(overlay, again) == [diff_logs(overlay, again)[0]]
+
+    lines = diff_logs(recorded["left_arrow"], recorded["fuel_light"])
+    assert len(lines) > 1
+    assert lines[0].startswith(f"calls {len(recorded['left_arrow'])} -> {len(recorded['fuel_light'])}")
+
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / "other.glog"
+    path.write_text(json.dumps({"not": "a log"}))
+    with pytest.raises(ValueError):
+        CallLog.load(str(path))
+
+
+def test_cli_budget_failure_exit_status():
+    result = subprocess.run([sys.executable, "glrecord.py", "record", "overlay", "--max-draw-calls", "1"],
+                            cwd=ROOT, capture_output=True, text=True)
+    assert result.returncode == 1
+    assert "budget exceeded" in result.stdout
+
+
+RELEASE_SCRIPT = """
+import glrecord
+log = glrecord.install()
+import main as dashboard
+import instancing
+import scene
+
+dashboard.draw_road_tile(0.0, 500)
+dashboard.draw_road_tile(0.0, 300)
+instancing.draw_houses([0.0, 1.0], [10.0, 20.0])
+uploaded = sum(mesh.vertex_buffer is not None for mesh in instancing._meshes.values())
+log.clear()
+dashboard.release_scene()
+assert scene._road_tiles == {} and instancing._meshes == {}
+print(uploaded, " ".join(log.lines()))
+"""
+
+
+def test_release_scene_deletes_gl_buffers():
+    result = subprocess.run([sys.executable, "-c", RELEASE_SCRIPT], cwd=ROOT, check=True,
+                            capture_output=True, text=True, env=dict(os.environ, PYTHONPATH=ROOT))
+    uploaded, calls = result.stdout.split(" ", 1)
+    # one call deleting both road tiles, one per instanced mesh that was uploaded
+    assert calls.count("glDeleteBuffers") == 1 + int(uploaded)
+    assert "glDeleteBuffers 2" in calls
@@ -0,0 +1,34 @@
+"""Grid mode simulation: fixed steps with the remainder carried and interpolated"""
+
+import pytest
+
+from grid import FleetDriver, gauge_values, make_fleet
+from simulation import FixedTimestep, SIM_DT
+
+
+def test_fleet_keeps_partial_steps():
+    dashboards = make_fleet(3)
+    timestep = FixedTimestep(FleetDriver(dashboards).step, SIM_DT)
+    # 1.5 steps per tick: rounding would run 2 each time, the accumulator 3 per 2 ticks
+    for _ in range(10):
+        timestep.advance(1.5 * SIM_DT)
+    assert timestep.steps == 15
+    assert timestep.alpha == pytest.approx(0.0, abs=1e-6)
+    timestep.advance(0.5 * SIM_DT)
+    assert timestep.alpha == pytest.approx(0.5)
+
+
+def test_view_interpolates_between_steps():
+    dashboards = make_fleet(1)
+    dashboard = dashboards[0]
+    driver = FleetDriver(dashboards)
+    dashboard.vehicle.accelerating = True
+    driver.random.random = lambda: 1.0   # keep the scripted throttle and signals fixed
+    for _ in range(20):
+        driver.step()
+    previous, current = gauge_values(dashboard.previous), gauge_values(dashboard.vehicle)
+    assert previous != current
+    assert gauge_values(dashboard.view(0.0)) == pytest.approx(previous)
+    assert gauge_values(dashboard.view(1.0)) == current
+    halfway = gauge_values(dashboard.view(0.5))
+    assert halfway == pytest.approx([(a + b) / 2 for a, b in zip(previous, current)])
@@ -0,0 +1,179 @@
+"""Parity of the vectorized rasterizers with the scalar DDA and Midpoint routines"""
+
+import numpy as np
+import pytest
+
+import algorithms
+from algorithms import (dda_line_points, midpoint_circle_points, midpoint_octant, pixel_radius,
+                        rasterize_circles, rasterize_lines, ring_spans)
+from softraster import SoftwareFramebuffer
+
+
+def scalar_dda(x1, y1, x2, y2):
+    """The per-pixel loop of dda_line's immediate path"""
+    dx = x2 - x1
+    dy = y2 - y1
+    steps = max(abs(dx), abs(dy))
+    if steps == 0:
+        return [(round(x1), round(y1))]
+    x_increment = dx / steps
+    y_increment = dy / steps
+    x = x1
+    y = y1
+    pixels = []
+    for _ in range(int(steps) + 1):
+        pixels.append((round(x), round(y)))
+        x += x_increment
+        y += y_increment
+    return pixels
+
+
+def scalar_midpoint(radius, x0, y0):
+    """The decision loop of midpoint_circle's immediate path, in draw_circle_points order"""
+    def mirrored(x, y):
+        return [(x + x0, y + y0), (y + x0, x + y0), (y + x0, -x + y0), (x + x0, -y + y0),
+                (-x + x0, -y + y0), (-y + x0, -x + y0), (-y + x0, x + y0), (-x + x0, y + y0)]
+
+    x = 0
+    y = radius
+    d = 1 - radius
+    pixels = mirrored(x, y)
+    while x < y:
+        if d < 0:
+            d = d + 2 * x + 3
+        else:
+            d = d + 2 * (x - y) + 5
+            y -= 1
+        x += 1
+        pixels += mirrored(x, y)
+    return pixels
+
+
+# One segment per octant (both slope regimes in every quadrant), axis-aligned
+# and diagonal segments, and ties that round half to even
+OCTANT_SEGMENTS = [
+    (0, 0, 17, 5), (0, 0, 5, 17), (0, 0, -5, 17), (0, 0, -17, 5),
+    (0, 0, -17, -5), (0, 0, -5, -17), (0, 0, 5, -17), (0, 0, 17, -5),
+    (3, 4, 30, 4), (3, 4, 3, -20), (-7, -7, 9, 9), (9, -9, -9, 9),
+    (0, 0, 4, 2), (1, 0, 7, 3), (100, 200, 97, 211),
+]
+DEGENERATE_SEGMENTS = [(5, 5, 5, 5), (-3, 8, -3, 8), (2.4, 7.6, 2.4, 7.6), (2.5, 3.5, 2.5, 3.5)]
+
+
+@pytest.mark.parametrize("segment", OCTANT_SEGMENTS + DEGENERATE_SEGMENTS)
+def test_dda_line_points_matches_scalar_loop(segment):
+    assert dda_line_points(*segment).tolist() == [list(p) for p in scalar_dda(*segment)]
+
+
+def test_rasterize_lines_matches_dda_line_points_in_input_order():
+    segments = OCTANT_SEGMENTS + DEGENERATE_SEGMENTS
+    rng = np.random.default_rng(3)
+    segments += [tuple(v) for v in rng.integers(-60, 60, (200, 4)).tolist()]
+    segments += [tuple(v) for v in np.round(rng.uniform(-60, 60, (100, 4)), 2).tolist()]
+    expected = np.concatenate([dda_line_points(*segment) for segment in segments])
+    x1, y1, x2, y2 = np.array(segments, dtype=np.float64).T
+    points = rasterize_lines(x1, y1, x2, y2)
+    assert points.dtype == np.int32
+    np.testing.assert_array_equal(points, expected)
+
+
+def test_degenerate_segments_round_float_endpoints():
+    for points in (dda_line_points(2.6, -1.4, 2.6, -1.4), rasterize_lines(2.6, -1.4, 2.6, -1.4)):
+        assert points.dtype == np.int32
+        assert points.tolist() == [[3, -1]]
+
+
+def render_lines(draw, segments, point_size):
+    """Pixels and final point size of drawing segments after a point of point_size"""
+    framebuffer = SoftwareFramebuffer(80, 60)
+    previous = algorithms.set_framebuffer(framebuffer)
+    try:
+        algorithms.set_color(1.0, 1.0, 1.0)
+        algorithms.draw_point(-10, -10, point_size)   # off screen; sets the point size
+        draw(segments)
+        algorithms.flush_points()
+        return framebuffer.pixels.copy(), algorithms._point_size
+    finally:
+        algorithms.set_framebuffer(previous)
+
+
+@pytest.mark.parametrize("point_size", [1, 2, 3])
+@pytest.mark.parametrize("degenerate", [(), (0,), (3,), (1, 4), (0, 1, 2, 3, 4, 5)])
+def test_dda_lines_matches_dda_line_with_degenerate_segments(point_size, degenerate):
+    segments = [(10, 10, 30, 14), (40, 5, 41, 30), (5, 50, 60, 44), (70, 2, 66, 20),
+                (20, 30, 35, 30), (50, 50, 52, 58)]
+    for index in degenerate:
+        x, y = segments[index][:2]
+        segments[index] = (x + 0.4, y - 0.6, x + 0.4, y - 0.6)
+
+    def one_by_one(segments):
+        for segment in segments:
+            algorithms.dda_line(*segment)
+
+    def batched(segments):
+        algorithms.dda_lines(*np.array(segments, dtype=np.float64).T)
+
+    expected, expected_size = render_lines(one_by_one, segments, point_size)
+    pixels, size = render_lines(batched, segments, point_size)
+    np.testing.assert_array_equal(pixels, expected)
+    assert size == expected_size
+
+
+def test_rasterize_lines_empty():
+    assert rasterize_lines([], [], [], []).shape == (0, 2)
+
+
+@pytest.mark.parametrize("radius", [0, 1, 2, 3, 7, 10, 33, 120])
+def test_midpoint_circle_points_match_scalar_loop(radius):
+    points = midpoint_circle_points(radius, 40, -25)
+    assert points.tolist() == [list(p) for p in scalar_midpoint(radius, 40, -25)]
+
+
+def test_midpoint_octant_small_radii():
+    assert [v.tolist() for v in midpoint_octant(0)] == [[0], [0]]
+    assert [v.tolist() for v in midpoint_octant(1)] == [[0, 1], [1, 0]]
+
+
+def test_rasterize_circles_matches_midpoint_circle_points_in_input_order():
+    radii = [0, 1, 5, 1, 80, 0, 5, 13]
+    centers = [(0, 0), (10, -4), (3, 3), (-7, 2), (400, 300), (9, 9), (0, 0), (-50, 60)]
+    expected = np.concatenate([midpoint_circle_points(r, x, y) for r, (x, y) in zip(radii, centers)])
+    xs, ys = np.array(centers).T
+    np.testing.assert_array_equal(rasterize_circles(radii, xs, ys), expected)
+
+
+def test_float_radii_and_centers_round_to_whole_pixels():
+    assert pixel_radius(4.4) == 4
+    assert pixel_radius(4.6) == 5
+    assert pixel_radius(2.5) == 2                      # half to even, like round()
+    np.testing.assert_array_equal(midpoint_circle_points(4.6, 10.4, 19.6), midpoint_circle_points(5, 10, 20))
+    np.testing.assert_array_equal(rasterize_circles([4.6, 2.5], [10.4, 0.0], [19.6, 0.0]),
+                                  rasterize_circles([5, 2], [10, 0], [20, 0]))
+
+
+def test_negative_radius_is_rejected():
+    with pytest.raises(ValueError):
+        midpoint_circle_points(-1, 0, 0)
+    with pytest.raises(ValueError):
+        rasterize_circles([3, -2], 0, 0)
+
+
+def span_pixels(spans):
+    return {(x, y) for y, start, end in spans.tolist() for x in range(start, end)}
+
+
+@pytest.mark.parametrize("inner, outer", [(0, 0), (0, 1), (0, 9), (3, 4), (110, 117), (-1, 6)])
+def test_ring_spans_cover_every_circle_between_the_radii(inner, outer):
+    covered = span_pixels(ring_spans(inner, outer, 12, -7))
+    circles = {tuple(p) for r in range(max(0, inner), outer + 1)
+               for p in midpoint_circle_points(r, 12, -7).tolist()}
+    assert circles <= covered
+    if inner > 0:
+        hole = {tuple(p) for r in range(inner) for p in midpoint_circle_points(r, 12, -7).tolist()}
+        assert not hole & covered
+
+
+def test_ring_spans_round_float_radii_and_center():
+    np.testing.assert_array_equal(ring_spans(2.6, 7.4, 10.4, 19.6), ring_spans(3, 7, 10, 20))
+    with pytest.raises(ValueError):
+        ring_spans(0, -1, 0, 0)
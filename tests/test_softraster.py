@@ -0,0 +1,136 @@
+"""Software framebuffer: a golden overlay render and the fill/blit primitives at clipped edges"""
+
+import hashlib
+
+import numpy as np
+import pytest
+
+import components
+from softraster import SoftwareFramebuffer, render_overlay, to_rgb8
+
+# sha256 of the RGB8 pixels of the overlay at the inputs set in render_fixed();
+# update it only for a deliberate change to how the dashboard looks
+OVERLAY_SHA256 = "0ee88d818edc86a1e1dc9f6184865327dcfc0c7f5f97a2e9a6162748b104888d"
+RED = (1.0, 0.0, 0.0)
+GREEN = (0.0, 1.0, 0.0)
+
+
+def render_fixed():
+    import main as dashboard
+    vehicle = dashboard.vehicle
+    vehicle.speed = 137.0
+    vehicle.fuel_level = 15.0
+    vehicle.engine_temp = 85.0
+    vehicle.fuel_warning = True
+    vehicle.update_rpm()
+    dashboard.previous_vehicle = vehicle.copy()
+    dashboard.publish_vehicle_state()
+    dashboard.left_blink_show = True
+    dashboard.right_blink_show = False
+    return render_overlay(dashboard)
+
+
+def digest(framebuffer):
+    return hashlib.sha256(np.ascontiguousarray(framebuffer.pixels).tobytes()).hexdigest()
+
+
+def test_overlay_matches_golden_render():
+    assert digest(render_fixed()) == OVERLAY_SHA256
+
+
+def test_overlay_cached_layers_match_direct_drawing():
+    components.invalidate_gauge_faces()
+    cached = render_fixed().pixels      # first render records the sprites
+    replayed = render_fixed().pixels    # second one blits them
+    components.set_gauge_face_cache(False)
+    try:
+        direct = render_fixed().pixels
+    finally:
+        components.set_gauge_face_cache(True)
+    np.testing.assert_array_equal(cached, direct)
+    np.testing.assert_array_equal(replayed, direct)
+
+
+def reference_rect(width, height, x1, y1, x2, y2, color):
+    """Per-pixel-center definition of fill_rect"""
+    pixels = np.zeros((height, width, 3), dtype=np.uint8)
+    ys, xs = np.mgrid[0:height, 0:width] + 0.5
+    inside = ((xs >= min(x1, x2)) & (xs < max(x1, x2)) &
+              (ys >= min(y1, y2)) & (ys < max(y1, y2)))
+    pixels[inside] = to_rgb8(color)
+    return pixels, inside
+
+
+@pytest.mark.parametrize("rect", [
+    (2, 3, 7, 6),            # inside
+    (-5, -5, 4, 3),          # off the bottom-left corner
+    (6, 5, 40, 40),          # off the top-right corner
+    (-10, 2, 30, 4),         # wider than the framebuffer
+    (9.6, 1.2, 3.4, 7.5),    # fractional, corners given in reverse
+    (3, 3, 3, 8),            # zero width
+    (20, 20, 30, 30),        # entirely outside
+])
+def test_fill_rect_clips_to_the_framebuffer(rect):
+    framebuffer = SoftwareFramebuffer(12, 9, track_coverage=True)
+    framebuffer.fill_rect(*rect, GREEN)
+    pixels, inside = reference_rect(12, 9, *rect, GREEN)
+    np.testing.assert_array_equal(framebuffer.pixels, pixels)
+    np.testing.assert_array_equal(framebuffer.coverage, inside)
+
+
+def test_clear_fills_every_pixel():
+    framebuffer = SoftwareFramebuffer(5, 4)
+    framebuffer.clear((0.2, 0.4, 0.6))
+    assert (framebuffer.pixels == to_rgb8((0.2, 0.4, 0.6))).all()
+
+
+def test_fill_spans_clips_to_the_framebuffer():
+    framebuffer = SoftwareFramebuffer(10, 6)
+    spans = [(-1, 0, 10),     # row below the framebuffer
+             (0, -3, 2),      # starts left of it
+             (2, 8, 15),      # runs off the right edge
+             (3, 4, 4),       # empty
+             (5, 0, 10),      # full top row
+             (6, 0, 10)]      # row above it
+    framebuffer.fill_spans(spans, RED)
+    lit = (framebuffer.pixels == to_rgb8(RED)).all(axis=-1)
+    expected = np.zeros((6, 10), dtype=bool)
+    expected[0, 0:2] = True
+    expected[2, 8:10] = True
+    expected[5, :] = True
+    np.testing.assert_array_equal(lit, expected)
+
+
+def make_layer():
+    """A 4x3 sprite with one partially covered row"""
+    recorder = SoftwareFramebuffer(20, 20, track_coverage=True)
+    recorder.fill_rect(5, 5, 9, 7, RED)
+    recorder.fill_spans([(7, 6, 8)], GREEN)
+    return recorder.to_layer()
+
+
+def test_blit_copies_full_rows_and_masks_partial_ones():
+    layer = make_layer()
+    assert (layer.x, layer.y, layer.mask.shape) == (5, 5, (3, 4))
+    target = SoftwareFramebuffer(20, 20, track_coverage=True)
+    target.clear((0.0, 0.0, 1.0))
+    target.blit(layer)
+    expected = np.zeros((20, 20, 3), dtype=np.uint8)
+    expected[:] = to_rgb8((0.0, 0.0, 1.0))
+    expected[5:7, 5:9] = to_rgb8(RED)
+    expected[7, 6:8] = to_rgb8(GREEN)
+    np.testing.assert_array_equal(target.pixels, expected)
+    assert target.coverage.sum() == 10
+
+
+@pytest.mark.parametrize("x, y", [(-2, 0), (18, 0), (0, -1), (0, 19), (-3, -2), (21, 5)])
+def test_blit_clips_layers_hanging_off_an_edge(x, y):
+    layer = make_layer()
+    layer.x, layer.y = x, y
+    target = SoftwareFramebuffer(20, 20)
+    target.blit(layer)
+    height, width = layer.mask.shape
+    expected = np.zeros((20 + 2 * 8, 20 + 2 * 8, 3), dtype=np.uint8)   # padded by 8 on each side
+    region = expected[8 + y:8 + y + height, 8 + x:8 + x + width]
+    region[layer.mask] = layer.pixels[layer.mask]
+    np.testing.assert_array_equal(target.pixels, expected[8:28, 8:28])
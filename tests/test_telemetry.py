@@ -0,0 +1,146 @@
+"""Telemetry sources: CSV, binary log and socket replay, edge cases and cleanup"""
+
+import socket
+import time
+
+import numpy as np
+import pytest
+
+from telemetry import (LOG_HEADER, LOG_MAGIC, SAMPLE_DTYPE, BinaryLogSource, CsvLogSource,
+                       SocketSource, apply_sample, make_samples, write_log)
+from simulation import VehicleState
+
+
+def drive(count=50):
+    t = np.arange(count) * 0.1
+    return make_samples(t, speed=t * 10, fuel=50.0, temp=80.0, left=t > 2.0)
+
+
+def write_csv(path, text):
+    path.write_text(text)
+    return str(path)
+
+
+def test_binary_log_replays_samples(tmp_path):
+    path = str(tmp_path / "drive.tlog")
+    write_log(path, drive())
+    source = BinaryLogSource(path)
+    try:
+        assert len(source) == 50
+        assert source.sample(-1.0)["time"] == 0.0       # before the start: first sample
+        assert source.sample(1.05)["time"] == pytest.approx(1.0)
+        vehicle = VehicleState()
+        assert apply_sample(vehicle, source.sample(2.55)) == (True, False)
+        assert vehicle.speed == pytest.approx(25.0)
+    finally:
+        source.close()
+
+
+def test_empty_binary_log(tmp_path):
+    path = tmp_path / "empty.tlog"
+    path.write_bytes(LOG_HEADER.pack(LOG_MAGIC, SAMPLE_DTYPE.itemsize, 0))
+    source = BinaryLogSource(str(path))
+    assert len(source) == 0
+    assert source.duration() == 0.0
+    assert source.sample(1.0) is None
+    assert not source.finished_at(1.0)
+    source.close()
+
+
+def test_binary_log_rejects_foreign_files(tmp_path):
+    path = tmp_path / "foreign.tlog"
+    path.write_bytes(b"not a log at all")
+    with pytest.raises(ValueError):
+        BinaryLogSource(str(path))
+
+
+def test_sample_after_end_of_log(tmp_path):
+    path = str(tmp_path / "drive.tlog")
+    write_log(path, drive())
+    source = BinaryLogSource(path)
+    try:
+        assert source.sample(100.0)["time"] == pytest.approx(4.9)
+        assert source.finished_at(100.0)
+        assert not source.finished_at(1.0)
+    finally:
+        source.close()
+
+    looped = BinaryLogSource(path, loop=True)
+    try:
+        assert looped.sample(4.9 + 1.05)["time"] == pytest.approx(1.0)
+        assert not looped.finished_at(100.0)
+    finally:
+        looped.close()
+
+
+def test_close_after_sample(tmp_path):
+    path = str(tmp_path / "drive.tlog")
+    write_log(path, drive())
+    source = BinaryLogSource(path)
+    held = source.sample(2.0)
+    source.close()
+    assert held["time"] == pytest.approx(2.0)
+    source.close()                                       # closing twice is harmless
+
+
+def test_close_with_outside_view_keeps_source_usable(tmp_path):
+    path = str(tmp_path / "drive.tlog")
+    write_log(path, drive())
+    source = BinaryLogSource(path)
+    view = source.samples[:10]
+    with pytest.raises(BufferError):
+        source.close()
+    assert len(source) == 50
+    assert source.sample(3.0)["time"] == pytest.approx(3.0)
+    del view
+    source.close()
+
+
+def test_csv_log_with_defaults(tmp_path):
+    path = write_csv(tmp_path / "drive.csv", "time,speed\n0,10\n1,20\n2,30\n")
+    source = CsvLogSource(path)
+    assert source.wait(5.0)
+    assert source.error is None
+    sample = source.sample(1.5)
+    assert sample["speed"] == pytest.approx(20.0)
+    assert sample["fuel"] == pytest.approx(100.0)
+    assert source.finished_at(2.0)
+
+
+def test_csv_with_only_a_header(tmp_path):
+    source = CsvLogSource(write_csv(tmp_path / "header.csv", "time,speed,rpm\n"))
+    assert source.wait(5.0)
+    assert source.error is None
+    assert len(source) == 0
+    assert source.sample(0.0) is None
+    assert not source.finished_at(0.0)
+
+
+def test_empty_csv_reports_missing_columns(tmp_path):
+    source = CsvLogSource(write_csv(tmp_path / "empty.csv", ""))
+    assert source.wait(5.0)
+    assert isinstance(source.error, ValueError)
+    assert source.sample(0.0) is None
+
+
+def test_socket_source_keeps_the_newest_sample(tmp_path):
+    address = str(tmp_path / "live.sock")
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(address)
+    server.listen(1)
+    source = SocketSource(address)
+    try:
+        assert source.sample(0.0) is None
+        source.start()
+        connection, _ = server.accept()
+        data = drive(20).tobytes()
+        connection.sendall(data[:100])               # records may arrive split
+        connection.sendall(data[100:])
+        deadline = time.monotonic() + 5.0
+        while source.received < 20 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert source.sample(0.0)["time"] == pytest.approx(1.9)
+        connection.close()
+    finally:
+        source.close()
+        server.close()
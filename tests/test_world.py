@@ -0,0 +1,53 @@
+"""World streaming: a chunk the worker has not finished never blocks update()"""
+
+import concurrent.futures
+
+import numpy as np
+
+from entities import CAR_COLUMNS, HOUSE_COLUMNS, TREE_COLUMNS, EntityStore, ZIndex
+from world import CHUNK_LENGTH, WorldStreamer, generate_road_chunk
+
+
+def make_streamer(seed=7):
+    return WorldStreamer(ZIndex(EntityStore(TREE_COLUMNS)), ZIndex(EntityStore(HOUSE_COLUMNS)),
+                         ZIndex(EntityStore(CAR_COLUMNS)), seed)
+
+
+def live_z(index):
+    store = index.store
+    return np.sort(store.columns["z"][store.alive])
+
+
+def test_pending_chunk_is_deferred_not_waited_for():
+    world = make_streamer()
+    world.update(0.0, 300.0)
+    chunk = world.road_next
+    blocked = concurrent.futures.Future()   # never completes unless set below
+    world._pending[("road", chunk)] = blocked
+    trees_before = world.trees.store.count
+
+    world.update(CHUNK_LENGTH, 300.0)
+    assert world.road_next == chunk
+    assert world.trees.store.count <= trees_before
+
+    blocked.set_result(generate_road_chunk(world.seed, chunk))
+    world.update(CHUNK_LENGTH, 300.0)
+    assert world.road_next > chunk
+    assert ("road", chunk) not in world._pending
+
+
+def test_worker_streams_the_same_world():
+    direct, threaded = make_streamer(), make_streamer()
+    threaded.start_worker()
+    try:
+        for step in range(40):
+            direct.update(step * 20.0, 300.0)
+            threaded.update(step * 20.0, 300.0)
+            for future in list(threaded._pending.values()):
+                concurrent.futures.wait([future])
+        threaded.update(39 * 20.0, 300.0)
+        direct.update(39 * 20.0, 300.0)
+    finally:
+        threaded.stop_worker()
+    assert np.array_equal(live_z(direct.trees), live_z(threaded.trees))
+    assert np.array_equal(live_z(direct.houses), live_z(threaded.houses))
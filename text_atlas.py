@@ -0,0 +1,235 @@
+"""
+text_atlas.py - Glyph atlas text rendering for the dashboard
+Rasterizes the GLUT Helvetica-12 bitmap font once into a texture and draws
+each string as one batch of textured quads instead of one
+glutBitmapCharacter call per character.
+"""
+
+from OpenGL.GL import *
+from OpenGL.GLUT import *
+import functools
+import numpy as np
+
+ATLAS_COLUMNS = 16
+ATLAS_ROWS = 16
+CELL_SIZE = 24
+CELL_PAD = 4       # room left of the pen for negative bearings
+CELL_DESCENT = 6   # room below the baseline for descenders
+
+_atlas_texture = None
+_glyph_advance = np.zeros(256, dtype=np.float32)
+_glut_text_enabled = True
+
+
+def set_glut_text(enabled):
+    """Allow or forbid the glutBitmapCharacter fallback.
+
+    Headless EGL contexts have no initialized GLUT, and freeglut exits the
+    process if its font functions are called without glutInit.
+    """
+    global _glut_text_enabled
+    _glut_text_enabled = enabled
+
+
+def build_glyph_atlas(font=GLUT_BITMAP_HELVETICA_12):
+    """Render every Latin-1 glyph of font into the atlas texture.
+
+    Must be called with a current GL context and GLUT initialized, outside
+    of any display list compilation. Returns False (and leaves the GLUT
+    fallback in place) if GLUT text is disabled or the offscreen
+    framebuffer is not available.
+    """
+    if not _glut_text_enabled:
+        return False
+    width = ATLAS_COLUMNS * CELL_SIZE
+    height = ATLAS_ROWS * CELL_SIZE
+
+    try:
+        framebuffer = glGenFramebuffers(1)
+    except Exception:
+        return False
+    previous = glGetIntegerv(GL_FRAMEBUFFER_BINDING)
+    color_buffer = glGenRenderbuffers(1)
+    glBindRenderbuffer(GL_RENDERBUFFER, color_buffer)
+    glRenderbufferStorage(GL_RENDERBUFFER, GL_RGBA8, width, height)
+    glBindFramebuffer(GL_FRAMEBUFFER, framebuffer)
+    glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_COLOR_ATTACHMENT0, GL_RENDERBUFFER, color_buffer)
+
+    glPushAttrib(GL_ALL_ATTRIB_BITS)
+    glMatrixMode(GL_PROJECTION)
+    glPushMatrix()
+    glLoadIdentity()
+    glOrtho(0, width, 0, height, -1, 1)
+    glMatrixMode(GL_MODELVIEW)
+    glPushMatrix()
+    glLoadIdentity()
+
+    glViewport(0, 0, width, height)
+    glDisable(GL_DEPTH_TEST)
+    glClearColor(0.0, 0.0, 0.0, 0.0)
+    glClear(GL_COLOR_BUFFER_BIT)
+    glColor3f(1.0, 1.0, 1.0)
+    for code in range(32, 256):
+        column = code % ATLAS_COLUMNS
+        row = code // ATLAS_COLUMNS
+        glRasterPos2f(column * CELL_SIZE + CELL_PAD, row * CELL_SIZE + CELL_DESCENT)
+        glutBitmapCharacter(font, code)
+        _glyph_advance[code] = glutBitmapWidth(font, code)
+
+    glPixelStorei(GL_PACK_ALIGNMENT, 1)
+    pixels = glReadPixels(0, 0, width, height, GL_RED, GL_UNSIGNED_BYTE)
+
+    glMatrixMode(GL_MODELVIEW)
+    glPopMatrix()
+    glMatrixMode(GL_PROJECTION)
+    glPopMatrix()
+    glMatrixMode(GL_MODELVIEW)
+    glPopAttrib()
+
+    glBindFramebuffer(GL_FRAMEBUFFER, previous)
+    glDeleteFramebuffers(1, [framebuffer])
+    glDeleteRenderbuffers(1, [color_buffer])
+    _upload_atlas(pixels)
+    return True
+
+
+def build_bitmap_atlas():
+    """Fill the atlas from the built-in 5x7 software font instead of GLUT.
+
+    For contexts without GLUT (EGL snapshots), where text would otherwise
+    not be drawn at all. Needs a current GL context but no framebuffer.
+    """
+    from softraster import GLYPH_ADVANCE, _glyph_pixels
+    pixels = np.zeros((ATLAS_ROWS * CELL_SIZE, ATLAS_COLUMNS * CELL_SIZE), dtype=np.uint8)
+    for code in range(32, 256):
+        offsets = _glyph_pixels(chr(code))
+        column = code % ATLAS_COLUMNS
+        row = code // ATLAS_COLUMNS
+        pixels[row * CELL_SIZE + CELL_DESCENT + offsets[:, 1],
+               column * CELL_SIZE + CELL_PAD + offsets[:, 0]] = 255
+        _glyph_advance[code] = GLYPH_ADVANCE
+    _upload_atlas(pixels)
+    return True
+
+
+def _upload_atlas(pixels):
+    """Create the atlas texture from bottom-up single-channel glyph pixels"""
+    global _atlas_texture
+    width = ATLAS_COLUMNS * CELL_SIZE
+    height = ATLAS_ROWS * CELL_SIZE
+    _atlas_texture = glGenTextures(1)
+    glBindTexture(GL_TEXTURE_2D, _atlas_texture)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_NEAREST)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
+    glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+    glTexImage2D(GL_TEXTURE_2D, 0, GL_ALPHA8, width, height, 0, GL_ALPHA, GL_UNSIGNED_BYTE, pixels)
+    glBindTexture(GL_TEXTURE_2D, 0)
+    layout_text.cache_clear()
+
+
+def has_glyph_atlas():
+    return _atlas_texture is not None
+
+
+@functools.lru_cache(maxsize=512)
+def layout_text(text):
+    """Lay text out as quads relative to the pen origin.
+
+    Returns read-only float32 (positions, texcoords), four corners per
+    character. Layouts are cached so labels and numerals that do not change
+    are never laid out again.
+    """
+    codes = np.frombuffer(text.encode("latin-1", "replace"), dtype=np.uint8)
+    advances = _glyph_advance[codes]
+    pens = np.cumsum(advances) - advances
+
+    corners = np.array([[0, 0], [1, 0], [1, 1], [0, 1]], dtype=np.float32)
+    origins = np.stack((pens - CELL_PAD, np.full_like(pens, -CELL_DESCENT)), axis=1)
+    positions = origins[:, None, :] + corners[None, :, :] * CELL_SIZE
+
+    cells = np.stack((codes % ATLAS_COLUMNS, codes // ATLAS_COLUMNS), axis=1)
+    texcoords = (cells[:, None, :] + corners[None, :, :]) / np.array([ATLAS_COLUMNS, ATLAS_ROWS])
+
+    positions = positions.reshape(-1, 2).astype(np.float32)
+    texcoords = texcoords.reshape(-1, 2).astype(np.float32)
+    positions.flags.writeable = False
+    texcoords.flags.writeable = False
+    return positions, texcoords
+
+
+def draw_atlas_text(x, y, text):
+    """Draw text at pen position (x, y) in the current color.
+
+    Returns False without drawing when the atlas has not been built.
+    """
+    if _atlas_texture is None:
+        return False
+    if not text:
+        return True
+
+    positions, texcoords = layout_text(text)
+    glPushAttrib(GL_ENABLE_BIT | GL_TEXTURE_BIT | GL_COLOR_BUFFER_BIT)
+    glEnable(GL_TEXTURE_2D)
+    glBindTexture(GL_TEXTURE_2D, _atlas_texture)
+    glTexEnvi(GL_TEXTURE_ENV, GL_TEXTURE_ENV_MODE, GL_MODULATE)
+    glEnable(GL_ALPHA_TEST)
+    glAlphaFunc(GL_GREATER, 0.5)
+
+    glPushMatrix()
+    glTranslatef(x, y, 0)
+    glEnableClientState(GL_VERTEX_ARRAY)
+    glEnableClientState(GL_TEXTURE_COORD_ARRAY)
+    glVertexPointer(2, GL_FLOAT, 0, positions)
+    glTexCoordPointer(2, GL_FLOAT, 0, texcoords)
+    glDrawArrays(GL_QUADS, 0, len(positions))
+    glDisableClientState(GL_TEXTURE_COORD_ARRAY)
+    glDisableClientState(GL_VERTEX_ARRAY)
+    glPopMatrix()
+
+    glPopAttrib()
+    return True
+
+
+def draw_atlas_text_batch(runs):
+    """Draw many strings with one glDrawArrays in the current color.
+
+    runs is a sequence of (x, y, scale, text) pen positions. Returns False
+    without drawing when the atlas has not been built.
+    """
+    if _atlas_texture is None:
+        return False
+    layouts = [(x, y, scale, layout_text(text)) for x, y, scale, text in runs if text]
+    if not layouts:
+        return True
+
+    positions = np.concatenate([quads * scale + np.array([x, y], dtype=np.float32)
+                                for x, y, scale, (quads, _) in layouts]).astype(np.float32)
+    texcoords = np.concatenate([coords for _, _, _, (_, coords) in layouts])
+    glPushAttrib(GL_ENABLE_BIT | GL_TEXTURE_BIT | GL_COLOR_BUFFER_BIT)
+    glEnable(GL_TEXTURE_2D)
+    glBindTexture(GL_TEXTURE_2D, _atlas_texture)
+    glTexEnvi(GL_TEXTURE_ENV, GL_TEXTURE_ENV_MODE, GL_MODULATE)
+    glEnable(GL_ALPHA_TEST)
+    glAlphaFunc(GL_GREATER, 0.5)
+    glEnableClientState(GL_VERTEX_ARRAY)
+    glEnableClientState(GL_TEXTURE_COORD_ARRAY)
+    glVertexPointer(2, GL_FLOAT, 0, positions)
+    glTexCoordPointer(2, GL_FLOAT, 0, texcoords)
+    glDrawArrays(GL_QUADS, 0, len(positions))
+    glDisableClientState(GL_TEXTURE_COORD_ARRAY)
+    glDisableClientState(GL_VERTEX_ARRAY)
+    glPopAttrib()
+    return True
+
+
+def draw_string(x, y, text, font=GLUT_BITMAP_HELVETICA_12):
+    """Draw text at pen position (x, y) from the atlas, or with GLUT bitmaps"""
+    if draw_atlas_text(x, y, text):
+        return
+    if not _glut_text_enabled:
+        return
+    glRasterPos2f(x, y)
+    for char in text:
+        glutBitmapCharacter(font, ord(char))
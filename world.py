@@ -0,0 +1,170 @@
+"""
+world.py - Streaming procedural world generator for the road scene
+The road is cut into CHUNK_LENGTH-unit chunks whose trees, houses and
+oncoming traffic are generated from a seed derived from the world seed and
+the chunk index, so a given seed always produces the same world whatever
+the frame rate or travel speed. Chunks are prefetched ahead of the camera
+and evicted behind it, keeping memory constant at any distance; generation
+can optionally run on a background worker thread, which update() never
+waits for (a chunk still being generated streams in on a later update).
+"""
+
+import concurrent.futures
+import math
+import numpy as np
+from entities import TREE_TYPES
+
+CHUNK_LENGTH = 150.0     # a whole number of tree rows and house rows
+TREE_SPACING = 30.0
+HOUSE_SPACING = 50.0
+TRAFFIC_DENSITY = 1 / 40.0   # oncoming cars per unit of road
+PREFETCH_CHUNKS = 2
+TREE_EVICT_DISTANCE = 100.0  # how far behind the camera content is kept
+HOUSE_EVICT_DISTANCE = 50.0
+TRAFFIC_EVICT_DISTANCE = 10.0
+
+# Independent random streams per kind of content
+TREES, TRAFFIC = 0, 1
+
+
+def chunk_rng(seed, chunk, stream):
+    """Generator for one chunk; SeedSequence needs non-negative entropy"""
+    return np.random.default_rng([seed, stream, chunk % 2 ** 63])
+
+
+def generate_road_chunk(seed, chunk):
+    """Trees and houses of road chunk number chunk, as column dicts"""
+    rng = chunk_rng(seed, chunk, TREES)
+    start = chunk * CHUNK_LENGTH
+    rows = int(CHUNK_LENGTH // TREE_SPACING)
+    count = 2 * rows
+    side = np.tile([-1.0, 1.0], rows)
+    trees = {
+        "x": side * (18 + rng.uniform(0, 3, count)),
+        "z": start + np.repeat(np.arange(rows) * TREE_SPACING, 2) + rng.uniform(-5, 5, count),
+        "height": 8 + rng.uniform(0, 4, count),
+        "type": rng.integers(0, len(TREE_TYPES), count).astype(np.int8),
+    }
+    rows = int(CHUNK_LENGTH // HOUSE_SPACING)
+    houses = {
+        "x": np.tile([25.0, -25.0], rows),
+        "z": start + np.repeat(np.arange(rows) * HOUSE_SPACING, 2),
+    }
+    return trees, houses
+
+
+def generate_traffic_chunk(seed, chunk):
+    """Oncoming cars of traffic chunk number chunk.
+
+    Traffic chunks are laid out in the cars' own moving frame (z minus the
+    distance all oncoming cars have driven), so z here is a frame position.
+    """
+    rng = chunk_rng(seed, chunk, TRAFFIC)
+    count = rng.poisson(CHUNK_LENGTH * TRAFFIC_DENSITY)
+    return {
+        "x": np.full(count, -3.0),
+        "z": chunk * CHUNK_LENGTH + np.sort(rng.uniform(0, CHUNK_LENGTH, count)),
+        "color": np.stack((rng.uniform(0.5, 1, count), rng.uniform(0, 0.5, count),
+                           rng.uniform(0, 0.5, count)), axis=1),
+    }
+
+
+class WorldStreamer:
+    """Keeps the tree, house and traffic indexes filled around the camera.
+
+    trees, houses and traffic are entities.ZIndex instances; eviction goes
+    through their despawn_behind so whole road segments are dropped.
+    """
+
+    def __init__(self, trees, houses, traffic, seed=0):
+        self.trees = trees
+        self.houses = houses
+        self.traffic = traffic
+        self.seed = seed
+        self.road_next = None
+        self.traffic_next = None
+        self.chunks_generated = 0
+        self._executor = None
+        self._pending = {}
+
+    def reset(self, seed=None):
+        """Drop all streamed content (and optionally change the seed)"""
+        for future in self._pending.values():
+            future.cancel()
+        self._pending.clear()
+        if seed is not None:
+            self.seed = seed
+        for index in (self.trees, self.houses, self.traffic):
+            index.clear()
+        self.road_next = None
+        self.traffic_next = None
+
+    def start_worker(self):
+        """Generate prefetched chunks on a background thread from now on"""
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="world-chunks")
+
+    def stop_worker(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._pending.clear()
+
+    def _chunk(self, kind, chunk):
+        """Chunk content from the worker if it was prefetched, else generated now.
+
+        Returns None while the worker is still generating the chunk; the
+        caller streams it in on a later update instead of waiting for it.
+        """
+        future = self._pending.get((kind, chunk))
+        if future is not None and not future.done():
+            return None
+        self._pending.pop((kind, chunk), None)
+        self.chunks_generated += 1
+        if future is not None and not future.cancelled():
+            return future.result()
+        generate = generate_road_chunk if kind == "road" else generate_traffic_chunk
+        return generate(self.seed, chunk)
+
+    def _prefetch(self, kind, first):
+        if self._executor is None:
+            return
+        generate = generate_road_chunk if kind == "road" else generate_traffic_chunk
+        for chunk in range(first, first + PREFETCH_CHUNKS):
+            if (kind, chunk) not in self._pending:
+                self._pending[(kind, chunk)] = self._executor.submit(generate, self.seed, chunk)
+
+    def update(self, ego_z, view_distance):
+        """Stream chunks in up to view_distance ahead of ego_z and evict behind"""
+        last = math.floor((ego_z + view_distance) / CHUNK_LENGTH)
+        if self.road_next is None:
+            self.road_next = math.floor((ego_z - TREE_EVICT_DISTANCE) / CHUNK_LENGTH)
+        while self.road_next <= last:
+            content = self._chunk("road", self.road_next)
+            if content is None:
+                break
+            trees, houses = content
+            self.trees.spawn(**trees)
+            self.houses.spawn(**houses)
+            self.road_next += 1
+        self._prefetch("road", self.road_next)
+
+        # Traffic chunks live in the cars' moving frame
+        frame = -self.traffic.offset
+        last = math.floor((ego_z + view_distance + frame) / CHUNK_LENGTH)
+        if self.traffic_next is None:
+            self.traffic_next = math.floor((ego_z - TRAFFIC_EVICT_DISTANCE + frame) / CHUNK_LENGTH)
+        while self.traffic_next <= last:
+            cars = self._chunk("traffic", self.traffic_next)
+            if cars is None:
+                break
+            if len(cars["z"]):
+                cars["z"] = cars["z"] - frame
+                self.traffic.spawn(**cars)
+            self.traffic_next += 1
+        self._prefetch("traffic", self.traffic_next)
+
+        self.trees.despawn_behind(ego_z - TREE_EVICT_DISTANCE)
+        self.houses.despawn_behind(ego_z - HOUSE_EVICT_DISTANCE)
+        self.traffic.despawn_behind(ego_z - TRAFFIC_EVICT_DISTANCE)